@@ -0,0 +1,631 @@
+import ipaddress
+import socket
+import struct
+from array import array
+from collections import Counter
+from collections.abc import Mapping
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Any,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+LEVEL_TOP = 0
+LEVEL_REGION = 1
+LEVEL_BU = 2
+LEVEL_ENV = 3
+# Placeholder "Default" business unit used when environments sit directly
+# under a regional pool
+LEVEL_DEFAULT_BU = 4
+
+IPV4_MAX_PREFIXLEN = 32
+IPV6_MAX_PREFIXLEN = 128
+
+# Keys of the per-level statistics, matching the resource_names levels
+LEVEL_KEYS = {
+    LEVEL_TOP: "top",
+    LEVEL_REGION: "regional",
+    LEVEL_BU: "business_units",
+    LEVEL_ENV: "environments",
+}
+
+# Cells of the per-level prefix length histograms
+_HISTOGRAM_STRIDE = IPV6_MAX_PREFIXLEN + 1
+_HISTOGRAM_SIZE = (LEVEL_DEFAULT_BU + 1) * _HISTOGRAM_STRIDE
+
+# Smallest unsigned typecode that can hold an IPv4 address
+_ADDRESS_TYPECODE = "I" if array("I").itemsize >= 4 else "L"
+_IPV4_PACK = struct.Struct("!I").pack
+
+
+class LevelStats(NamedTuple):
+    """Pool counts and sizes (in addresses) of one hierarchy level."""
+
+    count: int
+    total_addresses: int
+    min_size: int
+    max_size: int
+    average_size: int
+    reserved_count: int
+    reserved_addresses: int
+
+
+class AllocationPlan:
+    """
+    Compact, array-backed representation of a calculated IPAM hierarchy.
+
+    Pools are stored in depth-first order in parallel integer arrays, so a
+    pool's subtree is always contiguous and costs a few dozen bytes instead
+    of a nest of dicts, lists and CIDR strings. Pool names are interned, and
+    CIDR strings are only formatted when they are read.
+    """
+
+    __slots__ = (
+        "top_cidr",
+        "include_bu_level",
+        "include_env_level",
+        "address_family",
+        "max_prefix_len",
+        "unique_names",
+        "base",
+        "prefix_len",
+        "reserved_base",
+        "reserved_prefix_len",
+        "parent",
+        "level",
+        "name_id",
+        "subtree_size",
+        "prefix_counts",
+        "reserved_counts",
+        "names",
+        "_name_ids",
+        "_child_index",
+        "_format_cidr",
+        # Lets caches keyed by plan (e.g. hierarchy tables) let go of it
+        "__weakref__",
+    )
+
+    def __init__(
+        self,
+        top_cidr: str,
+        include_bu_level: bool = True,
+        include_env_level: bool = True,
+        address_family: str = "ipv4",
+    ):
+        """
+        Create an empty plan.
+
+        Args:
+            top_cidr: The top-level CIDR block as entered by the user
+            include_bu_level: Whether the hierarchy includes the business unit level
+            include_env_level: Whether the hierarchy includes the environment level
+            address_family: "ipv4" or "ipv6"
+        """
+        self.top_cidr = top_cidr
+        self.include_bu_level = include_bu_level
+        self.include_env_level = include_env_level
+        self.address_family = address_family
+        # Cleared when a level repeats a name; the mapping view then reports
+        # each name once with the last allocation, like repeated dict keys
+        self.unique_names = True
+        if address_family == "ipv6":
+            # 128-bit addresses do not fit a typed array; plain lists of ints
+            # support the same operations
+            self.max_prefix_len = IPV6_MAX_PREFIXLEN
+            self.base = []
+            self.reserved_base = []
+            self._format_cidr = format_ipv6_cidr
+        else:
+            self.max_prefix_len = IPV4_MAX_PREFIXLEN
+            self.base = array(_ADDRESS_TYPECODE)
+            self.reserved_base = array(_ADDRESS_TYPECODE)
+            self._format_cidr = format_cidr
+        self.prefix_len = array("B")
+        self.reserved_prefix_len = array("B")
+        self.parent = array("i")
+        self.level = array("B")
+        self.name_id = array("I")
+        self.subtree_size = array("I")
+        # Pools per (level, prefix length), kept up to date as pools are
+        # added so statistics never need another pass over the plan
+        self.prefix_counts = [0] * _HISTOGRAM_SIZE
+        self.reserved_counts = [0] * _HISTOGRAM_SIZE
+        self.names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self._child_index: Dict[int, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+    def add_pool(
+        self,
+        parent: int,
+        level: int,
+        name: str,
+        base: int,
+        prefix_len: int,
+        reserved_base: int = 0,
+        reserved_prefix_len: int = 0,
+    ) -> int:
+        """
+        Append a pool below an existing pool.
+
+        Pools must be added in depth-first order and closed with close_pool()
+        once all of their descendants have been added.
+
+        Args:
+            parent: Index of the parent pool (-1 for the top-level pool)
+            level: One of the LEVEL_* constants
+            name: Region code, business unit or environment name
+            base: Integer network address of the pool CIDR
+            prefix_len: Prefix length of the pool CIDR
+            reserved_base: Integer network address of the reserved CIDR
+            reserved_prefix_len: Prefix length of the reserved CIDR (0 for none)
+
+        Returns:
+            Index of the new pool
+        """
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+
+        index = len(self.base)
+        self.base.append(base)
+        self.prefix_len.append(prefix_len)
+        self.reserved_base.append(reserved_base)
+        self.reserved_prefix_len.append(reserved_prefix_len)
+        self.parent.append(parent)
+        self.level.append(level)
+        self.name_id.append(name_id)
+        self.subtree_size.append(1)
+        self.prefix_counts[level * _HISTOGRAM_STRIDE + prefix_len] += 1
+        if reserved_prefix_len:
+            self.reserved_counts[level * _HISTOGRAM_STRIDE + reserved_prefix_len] += 1
+        return index
+
+    def add_sibling_pools(
+        self,
+        parent: int,
+        level: int,
+        names: Sequence[str],
+        bases: Iterable[int],
+        prefix_len: int,
+        reserved_offset: int = 0,
+        reserved_prefix_len: int = 0,
+    ) -> None:
+        """
+        Append leaf pools of the same size below an existing pool.
+
+        Equivalent to calling add_pool() for each (name, base) pair, with the
+        reserved CIDR of each pool at the same offset from its base, but
+        updates the statistics histograms once for the whole group.
+
+        Args:
+            parent: Index of the parent pool
+            level: One of the LEVEL_* constants
+            names: Pool names
+            bases: Integer network address of each pool; extra bases are ignored
+            prefix_len: Prefix length of every pool
+            reserved_offset: Address of the reserved CIDR relative to the pool base
+            reserved_prefix_len: Prefix length of the reserved CIDRs (0 for none)
+        """
+        start = len(self.base)
+        name_ids = self._name_ids
+        for name, base in zip(names, bases):
+            name_id = name_ids.get(name)
+            if name_id is None:
+                name_id = self.intern(name)
+            self.base.append(base)
+            self.prefix_len.append(prefix_len)
+            self.reserved_base.append(base + reserved_offset)
+            self.reserved_prefix_len.append(reserved_prefix_len)
+            self.parent.append(parent)
+            self.level.append(level)
+            self.name_id.append(name_id)
+            self.subtree_size.append(1)
+        count = len(self.base) - start
+        self.prefix_counts[level * _HISTOGRAM_STRIDE + prefix_len] += count
+        if reserved_prefix_len:
+            self.reserved_counts[
+                level * _HISTOGRAM_STRIDE + reserved_prefix_len
+            ] += count
+
+    def intern(self, name: str) -> int:
+        """Return the name id for name, adding it to the name table if needed."""
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+    def extend_pools(
+        self,
+        base,
+        prefix_len,
+        reserved_base,
+        reserved_prefix_len,
+        parent,
+        level,
+        name_id,
+        subtree_size,
+    ) -> None:
+        """
+        Append many pools at once from contiguous column buffers.
+
+        Each buffer (e.g. a NumPy array) must hold items of the same type as
+        the corresponding column (see the columns' typecode attributes; IPv4
+        plans only, as IPv6 addresses are stored as Python ints), and
+        all buffers must have the same length. Pools must already be in
+        depth-first order with their final subtree sizes, and name ids must
+        come from intern().
+        """
+        columns = (
+            (self.base, base),
+            (self.prefix_len, prefix_len),
+            (self.reserved_base, reserved_base),
+            (self.reserved_prefix_len, reserved_prefix_len),
+            (self.parent, parent),
+            (self.level, level),
+            (self.name_id, name_id),
+            (self.subtree_size, subtree_size),
+        )
+        for column, values in columns:
+            column.frombytes(memoryview(values).cast("B"))
+
+        # Buffers come from the NumPy planner, so count them with NumPy too
+        import numpy as np
+
+        cells = np.asarray(level, dtype=np.intp) * _HISTOGRAM_STRIDE
+        prefix_lens = np.asarray(prefix_len, dtype=np.intp)
+        reserved_prefix_lens = np.asarray(reserved_prefix_len, dtype=np.intp)
+        for counts, added in (
+            (
+                self.prefix_counts,
+                np.bincount(cells + prefix_lens, minlength=_HISTOGRAM_SIZE),
+            ),
+            (
+                self.reserved_counts,
+                np.bincount(
+                    (cells + reserved_prefix_lens)[reserved_prefix_lens > 0],
+                    minlength=_HISTOGRAM_SIZE,
+                ),
+            ),
+        ):
+            for cell in np.flatnonzero(added):
+                counts[cell] += int(added[cell])
+
+    def close_pool(self, index: int) -> None:
+        """Record that every descendant of the pool at index has been added."""
+        self.subtree_size[index] = len(self.base) - index
+
+    def name(self, index: int) -> str:
+        """Return the name of the pool at index."""
+        return self.names[self.name_id[index]]
+
+    def cidr(self, index: int) -> str:
+        """Return the CIDR string of the pool at index."""
+        if index == 0:
+            return self.top_cidr
+        return self._format_cidr(self.base[index], self.prefix_len[index])
+
+    def reserved_cidr(self, index: int) -> str:
+        """Return the reserved CIDR string of the pool at index, or "" if none."""
+        if not self.reserved_prefix_len[index]:
+            return ""
+        return self._format_cidr(
+            self.reserved_base[index], self.reserved_prefix_len[index]
+        )
+
+    def children(self, index: int) -> Iterator[int]:
+        """Iterate over the indexes of the direct children of a pool."""
+        child = index + 1
+        end = index + self.subtree_size[index]
+        subtree_size = self.subtree_size
+        while child < end:
+            yield child
+            child += subtree_size[child]
+
+    def child(self, index: int, name: str) -> int:
+        """
+        Look up a direct child of a pool by name.
+
+        Args:
+            index: Index of the parent pool
+            name: Name of the child pool
+
+        Returns:
+            Index of the child pool
+
+        Raises:
+            KeyError: If the pool has no child with that name
+        """
+        lookup = self._child_index.get(index)
+        if lookup is None:
+            lookup = self._child_index[index] = {
+                self.names[self.name_id[child]]: child for child in self.children(index)
+            }
+        return lookup[name]
+
+    def path(self, index: int) -> Tuple[str, ...]:
+        """Return the names from the regional pool down to the pool at index."""
+        names = []
+        while index > 0:
+            names.append(self.names[self.name_id[index]])
+            index = self.parent[index]
+        return tuple(reversed(names))
+
+    def adopt_names(self, source: "AllocationPlan") -> None:
+        """
+        Start this (empty) plan with the interned names of another plan.
+
+        Sharing the name table lets copy_subtree() copy name ids verbatim.
+        """
+        self.names.extend(source.names)
+        self._name_ids.update(source._name_ids)
+
+    def copy_subtree(
+        self,
+        source: "AllocationPlan",
+        index: int,
+        parent: int,
+        offset: int = 0,
+    ) -> int:
+        """
+        Append a copy of a pool and all of its descendants from another plan.
+
+        The source plan's names must have been adopted with adopt_names().
+
+        Args:
+            source: Plan to copy from
+            index: Index of the pool to copy in the source plan
+            parent: Index of the new parent pool in this plan
+            offset: Amount to add to every network and reserved address
+
+        Returns:
+            Index of the copied pool in this plan
+        """
+        end = index + source.subtree_size[index]
+        new_index = len(self.base)
+        shift = new_index - index
+
+        if offset:
+            self.base.extend(base + offset for base in source.base[index:end])
+            self.reserved_base.extend(
+                base + offset if prefix_len else 0
+                for base, prefix_len in zip(
+                    source.reserved_base[index:end],
+                    source.reserved_prefix_len[index:end],
+                )
+            )
+        else:
+            self.base.extend(source.base[index:end])
+            self.reserved_base.extend(source.reserved_base[index:end])
+        self.prefix_len.extend(source.prefix_len[index:end])
+        self.reserved_prefix_len.extend(source.reserved_prefix_len[index:end])
+        self.level.extend(source.level[index:end])
+        self.name_id.extend(source.name_id[index:end])
+        self.subtree_size.extend(source.subtree_size[index:end])
+        self.parent.append(parent)
+        self.parent.extend(
+            source_parent + shift for source_parent in source.parent[index + 1 : end]
+        )
+
+        levels = source.level[index:end]
+        for (level, prefix_len), count in Counter(
+            zip(levels, source.prefix_len[index:end])
+        ).items():
+            self.prefix_counts[level * _HISTOGRAM_STRIDE + prefix_len] += count
+        for (level, prefix_len), count in Counter(
+            zip(levels, source.reserved_prefix_len[index:end])
+        ).items():
+            if prefix_len:
+                self.reserved_counts[level * _HISTOGRAM_STRIDE + prefix_len] += count
+        return new_index
+
+    def stats(self) -> Dict[str, LevelStats]:
+        """
+        Return per-level pool statistics from the histograms kept while planning.
+
+        This costs O(levels x prefix lengths), whatever the size of the plan.
+        Placeholder BUs are not reported.
+
+        Returns:
+            LevelStats keyed by "top", "regional", "business_units" and
+            "environments", for the levels that have pools
+        """
+        stats = {}
+        for level, key in LEVEL_KEYS.items():
+            offset = level * _HISTOGRAM_STRIDE
+            count = total = reserved_count = reserved_total = 0
+            min_size = max_size = 0
+            for prefix_len in range(self.max_prefix_len + 1):
+                pools = self.prefix_counts[offset + prefix_len]
+                if pools:
+                    size = 1 << (self.max_prefix_len - prefix_len)
+                    # Walking from short to long prefixes, sizes only shrink
+                    max_size = max_size or size
+                    min_size = size
+                    count += pools
+                    total += pools * size
+                reserved = self.reserved_counts[offset + prefix_len]
+                if reserved:
+                    reserved_count += reserved
+                    reserved_total += reserved << (self.max_prefix_len - prefix_len)
+            if count:
+                stats[key] = LevelStats(
+                    count,
+                    total,
+                    min_size,
+                    max_size,
+                    total // count,
+                    reserved_count,
+                    reserved_total,
+                )
+        return stats
+
+    def as_mapping(self) -> "PlanMapping":
+        """Return a read-only view shaped like the calculate_cidr_allocations dict."""
+        return PlanMapping(self)
+
+
+class PlanMapping(Mapping):
+    """
+    Read-only mapping view over an AllocationPlan.
+
+    Behaves like the nested dict historically returned by
+    calculate_cidr_allocations ({"top_cidr": [...], "regional_cidrs": {...},
+    "bu_cidrs": {...}, "env_cidrs": {...}}), building the small per-pool
+    dicts on access.
+    """
+
+    __slots__ = ("plan", "_keys")
+
+    def __init__(self, plan: AllocationPlan):
+        self.plan = plan
+        keys = ["top_cidr", "regional_cidrs"]
+        if plan.include_bu_level:
+            keys.append("bu_cidrs")
+        if plan.include_env_level:
+            keys.append("env_cidrs")
+        self._keys = tuple(keys)
+
+    def __getitem__(self, key: str) -> Any:
+        plan = self.plan
+        if key == "top_cidr":
+            return [plan.top_cidr]
+        if key == "regional_cidrs":
+            return _PoolMapping(plan, 0, 1)
+        if key == "bu_cidrs" and plan.include_bu_level:
+            return _PoolMapping(plan, 0, 2, LEVEL_BU)
+        if key == "env_cidrs" and plan.include_env_level:
+            return _PoolMapping(plan, 0, 3, LEVEL_ENV)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize the view as plain nested dicts (e.g. for JSON serialization)."""
+        return _to_dict(self)
+
+
+class _PoolMapping(Mapping):
+    """Mapping of child pool names to either nested mappings or pool entries."""
+
+    __slots__ = ("plan", "index", "depth", "leaf_level")
+
+    def __init__(
+        self,
+        plan: AllocationPlan,
+        index: int,
+        depth: int,
+        leaf_level: Optional[int] = None,
+    ):
+        self.plan = plan
+        self.index = index
+        self.depth = depth
+        # Only parents whose subtree reaches this level are listed, which keeps
+        # placeholder BUs out of "bu_cidrs" and env-less BUs out of "env_cidrs"
+        self.leaf_level = leaf_level
+
+    def _has_leaf(self, child: int) -> bool:
+        plan = self.plan
+        if self.leaf_level is None:
+            return True
+        if self.depth == 1:
+            return plan.level[child] == self.leaf_level
+        end = child + plan.subtree_size[child]
+        return any(plan.level[i] == self.leaf_level for i in range(child + 1, end))
+
+    def _value(self, child: int) -> Any:
+        if self.depth > 1:
+            return _PoolMapping(self.plan, child, self.depth - 1, self.leaf_level)
+        return _pool_entry(self.plan, child)
+
+    def __getitem__(self, name: str) -> Any:
+        child = self.plan.child(self.index, name)
+        if not self._has_leaf(child):
+            raise KeyError(name)
+        return self._value(child)
+
+    def _children(self) -> Iterator[int]:
+        plan = self.plan
+        if plan.unique_names:
+            children = plan.children(self.index)
+        else:
+            seen = set()
+            children = []
+            for child in plan.children(self.index):
+                name = plan.name(child)
+                if name not in seen:
+                    seen.add(name)
+                    children.append(plan.child(self.index, name))
+        for child in children:
+            if self._has_leaf(child):
+                yield child
+
+    def __iter__(self) -> Iterator[str]:
+        plan = self.plan
+        for child in self._children():
+            yield plan.names[plan.name_id[child]]
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._children())
+
+    def items(self):
+        plan = self.plan
+        for child in self._children():
+            yield plan.names[plan.name_id[child]], self._value(child)
+
+    def values(self):
+        for _, value in self.items():
+            yield value
+
+    def __repr__(self) -> str:
+        return repr(_to_dict(self))
+
+
+def _pool_entry(plan: AllocationPlan, index: int) -> Dict[str, Any]:
+    """Build the dict historically stored for a single pool."""
+    level = plan.level[index]
+    entry = {"cidr": [plan.cidr(index)]}
+    if level == LEVEL_REGION:
+        entry["locale"] = plan.name(index)
+    elif level == LEVEL_ENV:
+        entry["reserved_cidr"] = plan.reserved_cidr(index)
+    return entry
+
+
+def _to_dict(value: Any) -> Any:
+    """Recursively convert plan mappings into plain dicts."""
+    if isinstance(value, Mapping):
+        return {key: _to_dict(item) for key, item in value.items()}
+    return value
+
+
+def format_cidr(base: int, prefix_len: int) -> str:
+    """Format an integer IPv4 network address and prefix length as a CIDR string."""
+    return f"{format_address(base)}/{prefix_len}"
+
+
+def format_address(address: int) -> str:
+    """Format an integer IPv4 address in dotted-quad notation."""
+    return socket.inet_ntoa(_IPV4_PACK(address))
+
+
+def format_ipv6_cidr(base: int, prefix_len: int) -> str:
+    """Format an integer IPv6 network address and prefix length as a CIDR string."""
+    return f"{ipaddress.IPv6Address(base)}/{prefix_len}"
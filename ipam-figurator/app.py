@@ -1,15 +1,84 @@
+import contextlib
+import io
+
 import streamlit as st
-import ipaddress
 from typing import List, Dict, Any
-import time
-import plotly.express as px
 
 # Import local modules
+import instrumentation
 import ipam_logic
+import plan_verifier
+import tfvars_import
 import utils
 
 
+# Recorded as a stage of its own so cache hits show up in the Performance panel
+@instrumentation.timed("cached_configuration")
+@st.cache_resource(max_entries=ipam_logic.PLAN_CACHE_SIZE, show_spinner=False)
+def cached_ipam_configuration(
+    key: ipam_logic.PlanKey,
+) -> ipam_logic.IpamConfiguration:
+    """Share calculated configurations across reruns and sessions (read-only)."""
+    configuration = ipam_logic.build_ipam_configuration(key)
+    # Never show or offer tfvars for a plan the Terraform module would reject
+    plan_verifier.ensure_valid(configuration.cidr_allocations)
+    return configuration
+
+
+@instrumentation.timed("replanned_configuration")
+def replanned_ipam_configuration(
+    key: ipam_logic.PlanKey,
+) -> ipam_logic.IpamConfiguration:
+    """
+    Build the configuration of an edited key from this session's current plan.
+
+    Only the subtrees invalidated by the edits are recalculated (see
+    ipam_logic.replan_configuration()); without a previous plan, or when the
+    key did not change, the shared cache is used instead.
+    """
+    previous_key = st.session_state.get("plan_key")
+    previous_plan = getattr(st.session_state.cidr_allocations, "plan", None)
+    if previous_key is None or previous_plan is None or previous_key == key:
+        return cached_ipam_configuration(key)
+    configuration = ipam_logic.replan_configuration(previous_key, previous_plan, key)
+    plan_verifier.ensure_valid(configuration.cidr_allocations)
+    return configuration
+
+
+def uploaded_tfvars(uploaded_file) -> tfvars_import.TfvarsPlan:
+    """Parse an uploaded tfvars file once per upload and keep it for reruns."""
+    cached = st.session_state.get("uploaded_tfvars")
+    if cached is None or cached[0] != uploaded_file.file_id:
+        uploaded_file.seek(0)
+        stream = io.TextIOWrapper(uploaded_file, encoding="utf-8")
+        try:
+            plan = tfvars_import.read_tfvars(stream)
+        finally:
+            # Leave the upload open for Streamlit
+            stream.detach()
+        st.session_state.uploaded_tfvars = (uploaded_file.file_id, plan)
+    return st.session_state.uploaded_tfvars[1]
+
+
 def main():
+    # Stage timings are recorded for the whole run when switched on in the
+    # Performance expander
+    recorder = None
+    if st.session_state.get("record_performance"):
+        recorder = instrumentation.Recorder(
+            memory=bool(st.session_state.get("record_memory"))
+        )
+    with recorder or contextlib.nullcontext():
+        render_pages()
+    utils.display_performance_panel(recorder)
+
+    # Footer
+    st.markdown("---")
+    st.markdown("AWS IPAM Configurator - Sample Code")
+
+
+def render_pages():
+    """Render the app header and its four tabs."""
     # Set page config
     st.set_page_config(
         page_title="AWS IPAM Configurator", page_icon="🌐", layout="wide"
@@ -28,6 +97,9 @@ def main():
     # Initialize session state variables if they don't exist
     if "cidr_allocations" not in st.session_state:
         st.session_state.cidr_allocations = None
+    if "plan_key" not in st.session_state:
+        # PlanKey of the plan in cidr_allocations, for incremental re-planning
+        st.session_state.plan_key = None
     if "resource_names" not in st.session_state:
         st.session_state.resource_names = None
     if "terraform_output" not in st.session_state:
@@ -36,6 +108,9 @@ def main():
         st.session_state.terraform_module_modifications = None
     if "calculation_complete" not in st.session_state:
         st.session_state.calculation_complete = False
+    if "sunburst_focus" not in st.session_state:
+        # (pool path, offset) the Visualization tab's Sunburst is focused on
+        st.session_state.sunburst_focus = ((), 0)
     if "show_advanced" not in st.session_state:
         st.session_state.show_advanced = False
     if "selected_regions" not in st.session_state:
@@ -56,6 +131,8 @@ def main():
         st.session_state.reserved_percentage = 25
     if "env_prefix_target" not in st.session_state:
         st.session_state.env_prefix_target = 18
+    if "env_prefix_target_v6" not in st.session_state:
+        st.session_state.env_prefix_target_v6 = 56
 
     # Create tabs
     tab1, tab2, tab3, tab4 = st.tabs(
@@ -94,16 +171,21 @@ def main():
             top_cidr = st.text_input(
                 "Top-Level CIDR Block",
                 value="10.192.0.0/12",
-                help="The top-level CIDR block for your entire IPAM hierarchy (e.g., 10.0.0.0/8)",
+                help="The top-level CIDR block for your entire IPAM hierarchy (e.g., 10.0.0.0/8 or fd00:1::/48)",
             )
 
         with top_cidr_col2:
             # Add a quick CIDR validator that shows info about the entered CIDR
             if top_cidr:
                 try:
-                    network = ipaddress.IPv4Network(top_cidr)
+                    network = ipam_logic.parse_network(top_cidr)
                     st.metric("Total IPs", utils.format_ip_count(network.num_addresses))
-                    if not network.is_private:
+                    if network.version == 6:
+                        if network.is_multicast or network.is_link_local:
+                            st.error("⚠️ Not a unicast IPv6 range")
+                        else:
+                            st.success("✅ Valid IPv6 CIDR")
+                    elif not network.is_private:
                         st.error("⚠️ Not a private IP range")
                     else:
                         st.success("✅ Valid private CIDR")
@@ -158,9 +240,7 @@ def main():
             selected_regions.append(primary_region)
 
             st.write("**North America & South America Regions**")
-            americas_regions = [
-                r for r in ipam_regions if r["code"].startswith(("us-", "ca-", "sa-"))
-            ]
+            americas_regions = utils.get_regions_by_geography("americas")
             for region in americas_regions:
                 if region["code"] != primary_region and st.checkbox(
                     f"{region['name']} ({region['code']})",
@@ -170,9 +250,7 @@ def main():
 
         with region_col2:
             st.write("**Europe, Middle East & Africa Regions**")
-            emea_regions = [
-                r for r in ipam_regions if r["code"].startswith(("eu-", "me-", "af-"))
-            ]
+            emea_regions = utils.get_regions_by_geography("emea")
             for region in emea_regions:
                 if region["code"] != primary_region and st.checkbox(
                     f"{region['name']} ({region['code']})",
@@ -181,7 +259,7 @@ def main():
                     selected_regions.append(region["code"])
 
             st.write("**Asia Pacific Regions**")
-            apac_regions = [r for r in ipam_regions if r["code"].startswith("ap-")]
+            apac_regions = utils.get_regions_by_geography("apac")
             for region in apac_regions:
                 if region["code"] != primary_region and st.checkbox(
                     f"{region['name']} ({region['code']})",
@@ -278,7 +356,12 @@ def main():
         st.session_state.show_advanced = show_advanced
 
         # Default values
-        env_prefix_target = st.session_state.env_prefix_target
+        is_ipv6 = ipam_logic.address_family(top_cidr) == "ipv6"
+        env_prefix_target = (
+            st.session_state.env_prefix_target_v6
+            if is_ipv6
+            else st.session_state.env_prefix_target
+        )
         reserved_strategy = st.session_state.reserved_strategy
         reserved_percentage = st.session_state.reserved_percentage
 
@@ -287,14 +370,25 @@ def main():
 
             with adv_col1:
                 st.write("**Target Environment Prefix Length**")
-                env_prefix_target = st.slider(
-                    "Target prefix length for smallest subnet (environment)",
-                    min_value=16,
-                    max_value=24,
-                    value=st.session_state.env_prefix_target,
-                    help="Higher values create smaller subnets. /18 is recommended.",
-                )
-                st.session_state.env_prefix_target = env_prefix_target
+                if is_ipv6:
+                    env_prefix_target = st.slider(
+                        "Target prefix length for smallest subnet (environment)",
+                        min_value=44,
+                        max_value=64,
+                        step=4,
+                        value=st.session_state.env_prefix_target_v6,
+                        help="Higher values create smaller subnets. /56 is recommended.",
+                    )
+                    st.session_state.env_prefix_target_v6 = env_prefix_target
+                else:
+                    env_prefix_target = st.slider(
+                        "Target prefix length for smallest subnet (environment)",
+                        min_value=16,
+                        max_value=24,
+                        value=st.session_state.env_prefix_target,
+                        help="Higher values create smaller subnets. /18 is recommended.",
+                    )
+                    st.session_state.env_prefix_target = env_prefix_target
 
             with adv_col2:
                 st.write("**Reserved Space Strategy**")
@@ -355,60 +449,37 @@ def main():
                     else:
                         # Show calculation in progress
                         with st.spinner("Calculating IPAM configuration..."):
-                            # Add a small delay to show the spinner
-                            time.sleep(1)
-
                             try:
-                                # Calculate CIDR allocations
-                                cidr_allocations = (
-                                    ipam_logic.calculate_cidr_allocations(
-                                        top_cidr,
-                                        selected_regions,
-                                        business_units if include_bu_level else None,
-                                        environments if include_env_level else None,
-                                        include_bu_level,
-                                        include_env_level,
-                                        primary_region,
-                                        region_order=None,
-                                        bu_order=None,
-                                        env_order=None,
-                                        environment_prefix_target=env_prefix_target,
-                                        reserved_strategy=reserved_strategy,
-                                        reserved_percentage=reserved_percentage,
-                                    )
-                                )
-
-                                # Generate resource names
-                                resource_names = ipam_logic.generate_resource_names(
+                                key = ipam_logic.plan_key(
                                     top_cidr,
                                     selected_regions,
                                     business_units if include_bu_level else None,
                                     environments if include_env_level else None,
                                     include_bu_level,
                                     include_env_level,
+                                    primary_region,
+                                    region_order=None,
+                                    bu_order=None,
+                                    env_order=None,
+                                    environment_prefix_target=env_prefix_target,
+                                    reserved_strategy=reserved_strategy,
+                                    reserved_percentage=reserved_percentage,
                                 )
+                                configuration = cached_ipam_configuration(key)
 
-                                # Generate Terraform output
-                                terraform_output = ipam_logic.generate_terraform_output(
-                                    cidr_allocations,
-                                    resource_names,
-                                    include_bu_level,
-                                    include_env_level,
+                                # Store results in session state
+                                st.session_state.plan_key = key
+                                st.session_state.cidr_allocations = (
+                                    configuration.cidr_allocations
                                 )
-
-                                # Generate Terraform module modifications if needed
-                                terraform_module_modifications = (
-                                    ipam_logic.get_modified_terraform_module(
-                                        include_bu_level, include_env_level
-                                    )
+                                st.session_state.resource_names = (
+                                    configuration.resource_names
+                                )
+                                st.session_state.terraform_output = (
+                                    configuration.terraform_output
                                 )
-
-                                # Store results in session state
-                                st.session_state.cidr_allocations = cidr_allocations
-                                st.session_state.resource_names = resource_names
-                                st.session_state.terraform_output = terraform_output
                                 st.session_state.terraform_module_modifications = (
-                                    terraform_module_modifications
+                                    configuration.terraform_module_modifications
                                 )
                                 st.session_state.calculation_complete = True
 
@@ -440,12 +511,6 @@ def main():
             """
             )
 
-            # Region order
-            st.subheader("Region Order")
-            st.write(
-                "Organize Regions in accordance with desired CIDR allocation strategy."
-            )
-
             regions = st.session_state.selected_regions
 
             # Initialize region order if needed
@@ -462,48 +527,7 @@ def main():
                 r for r in st.session_state.region_order if r in regions
             ]
 
-            # Create columns for the regions
-            region_cols = st.columns(min(len(regions), 4))
-
-            # Create interface for region reorganization
-            for i, region in enumerate(st.session_state.region_order):
-                with region_cols[i % len(region_cols)]:
-                    display_name = utils.get_region_display_name(region)
-                    st.write(f"**{i+1}. {display_name}**")
-
-                    if i > 0:
-                        if st.button(f"↑ {region}", key=f"region_{region}_up"):
-                            # Move region up
-                            idx = st.session_state.region_order.index(region)
-                            (
-                                st.session_state.region_order[idx],
-                                st.session_state.region_order[idx - 1],
-                            ) = (
-                                st.session_state.region_order[idx - 1],
-                                st.session_state.region_order[idx],
-                            )
-                            st.rerun()
-
-                    if i < len(st.session_state.region_order) - 1:
-                        if st.button(f"↓ {region}", key=f"region_{region}_down"):
-                            # Move region down
-                            idx = st.session_state.region_order.index(region)
-                            (
-                                st.session_state.region_order[idx],
-                                st.session_state.region_order[idx + 1],
-                            ) = (
-                                st.session_state.region_order[idx + 1],
-                                st.session_state.region_order[idx],
-                            )
-                            st.rerun()
-
-            # Business Unit order (if BU level is included)
             if st.session_state.include_bu_level:
-                st.subheader("Business Unit Order")
-                st.write(
-                    "Organize Business Units in accordance with desired CIDR allocation strategy (strategy repeats in each Regional Pool)."
-                )
-
                 business_units = st.session_state.business_units
 
                 # Initialize BU order if needed
@@ -520,47 +544,7 @@ def main():
                     bu for bu in st.session_state.bu_order if bu in business_units
                 ]
 
-                # Create columns for the BUs
-                bu_cols = st.columns(min(len(business_units), 4))
-
-                # Create interface for BU reorganization
-                for i, bu in enumerate(st.session_state.bu_order):
-                    with bu_cols[i % len(bu_cols)]:
-                        st.write(f"**{i+1}. {bu}**")
-
-                        if i > 0:
-                            if st.button(f"↑ {bu}", key=f"bu_{bu}_up"):
-                                # Move BU up
-                                idx = st.session_state.bu_order.index(bu)
-                                (
-                                    st.session_state.bu_order[idx],
-                                    st.session_state.bu_order[idx - 1],
-                                ) = (
-                                    st.session_state.bu_order[idx - 1],
-                                    st.session_state.bu_order[idx],
-                                )
-                                st.rerun()
-
-                        if i < len(st.session_state.bu_order) - 1:
-                            if st.button(f"↓ {bu}", key=f"bu_{bu}_down"):
-                                # Move BU down
-                                idx = st.session_state.bu_order.index(bu)
-                                (
-                                    st.session_state.bu_order[idx],
-                                    st.session_state.bu_order[idx + 1],
-                                ) = (
-                                    st.session_state.bu_order[idx + 1],
-                                    st.session_state.bu_order[idx],
-                                )
-                                st.rerun()
-
-            # Environment order (if environment level is included)
             if st.session_state.include_env_level:
-                st.subheader("Environment Order")
-                st.write(
-                    "Organize Environments in accordance with desired CIDR allocation strategy (strategy repeats in each BU Pool)."
-                )
-
                 environments = st.session_state.environments
 
                 # Initialize environment order if needed
@@ -577,46 +561,60 @@ def main():
                     env for env in st.session_state.env_order if env in environments
                 ]
 
-                # Create columns for the environments
-                env_cols = st.columns(min(len(environments), 4))
-
-                # Create interface for environment reorganization
-                for i, env in enumerate(st.session_state.env_order):
-                    with env_cols[i % len(env_cols)]:
-                        st.write(f"**{i+1}. {env}**")
-
-                        if i > 0:
-                            if st.button(f"↑ {env}", key=f"env_{env}_up"):
-                                # Move environment up
-                                idx = st.session_state.env_order.index(env)
-                                (
-                                    st.session_state.env_order[idx],
-                                    st.session_state.env_order[idx - 1],
-                                ) = (
-                                    st.session_state.env_order[idx - 1],
-                                    st.session_state.env_order[idx],
-                                )
-                                st.rerun()
-
-                        if i < len(st.session_state.env_order) - 1:
-                            if st.button(f"↓ {env}", key=f"env_{env}_down"):
-                                # Move environment down
-                                idx = st.session_state.env_order.index(env)
-                                (
-                                    st.session_state.env_order[idx],
-                                    st.session_state.env_order[idx + 1],
-                                ) = (
-                                    st.session_state.env_order[idx + 1],
-                                    st.session_state.env_order[idx],
-                                )
-                                st.rerun()
+            # Moves are staged in the grids below without rerunning the app,
+            # then applied together with a single recalculation
+            with st.form("reorder_form"):
+                st.caption(
+                    "Type new positions for as many rows as you like, then apply "
+                    "them all at once. An item moved to a position that is taken "
+                    "goes before the item already there."
+                )
 
-            # Recalculate button
-            if st.button("Recalculate with New Order"):
-                with st.spinner("Recalculating IPAM configuration..."):
-                    # Add a small delay to show the spinner
-                    time.sleep(1)
+                # Region order
+                st.subheader("Region Order")
+                st.write(
+                    "Organize Regions in accordance with desired CIDR allocation strategy."
+                )
+                new_region_order = utils.edit_order(
+                    st.session_state.region_order,
+                    "region",
+                    utils.get_region_display_name,
+                    column="Region",
+                )
 
+                # Business Unit order (if BU level is included)
+                new_bu_order = None
+                if st.session_state.include_bu_level:
+                    st.subheader("Business Unit Order")
+                    st.write(
+                        "Organize Business Units in accordance with desired CIDR allocation strategy (strategy repeats in each Regional Pool)."
+                    )
+                    new_bu_order = utils.edit_order(
+                        st.session_state.bu_order, "bu", column="Business Unit"
+                    )
+
+                # Environment order (if environment level is included)
+                new_env_order = None
+                if st.session_state.include_env_level:
+                    st.subheader("Environment Order")
+                    st.write(
+                        "Organize Environments in accordance with desired CIDR allocation strategy (strategy repeats in each BU Pool)."
+                    )
+                    new_env_order = utils.edit_order(
+                        st.session_state.env_order, "env", column="Environment"
+                    )
+
+                apply_order = st.form_submit_button("Apply Order and Recalculate")
+
+            # Recalculate with every staged move applied
+            if apply_order:
+                st.session_state.region_order = new_region_order
+                if new_bu_order is not None:
+                    st.session_state.bu_order = new_bu_order
+                if new_env_order is not None:
+                    st.session_state.env_order = new_env_order
+
+                with st.spinner("Recalculating IPAM configuration..."):
                     try:
                         # Get configuration parameters
                         top_cidr = st.session_state.cidr_allocations["top_cidr"][0]
@@ -636,7 +634,11 @@ def main():
                         include_env_level = st.session_state.include_env_level
                         reserved_strategy = st.session_state.reserved_strategy
                         reserved_percentage = st.session_state.reserved_percentage
-                        env_prefix_target = st.session_state.env_prefix_target
+                        env_prefix_target = (
+                            st.session_state.env_prefix_target_v6
+                            if ipam_logic.address_family(top_cidr) == "ipv6"
+                            else st.session_state.env_prefix_target
+                        )
 
                         # Get ordering
                         region_order = st.session_state.region_order
@@ -651,8 +653,8 @@ def main():
                             else environments
                         )
 
-                        # Calculate CIDR allocations with new order
-                        cidr_allocations = ipam_logic.calculate_cidr_allocations(
+                        # Re-plan only the subtrees the new order invalidates
+                        key = ipam_logic.plan_key(
                             top_cidr,
                             regions,
                             business_units if include_bu_level else None,
@@ -667,30 +669,18 @@ def main():
                             reserved_strategy=reserved_strategy,
                             reserved_percentage=reserved_percentage,
                         )
+                        configuration = replanned_ipam_configuration(key)
 
-                        # Generate resource names
-                        resource_names = ipam_logic.generate_resource_names(
-                            top_cidr,
-                            regions,
-                            business_units if include_bu_level else None,
-                            environments if include_env_level else None,
-                            include_bu_level,
-                            include_env_level,
+                        # Store results in session state
+                        st.session_state.plan_key = key
+                        st.session_state.cidr_allocations = (
+                            configuration.cidr_allocations
                         )
-
-                        # Generate Terraform output
-                        terraform_output = ipam_logic.generate_terraform_output(
-                            cidr_allocations,
-                            resource_names,
-                            include_bu_level,
-                            include_env_level,
+                        st.session_state.resource_names = configuration.resource_names
+                        st.session_state.terraform_output = (
+                            configuration.terraform_output
                         )
 
-                        # Store results in session state
-                        st.session_state.cidr_allocations = cidr_allocations
-                        st.session_state.resource_names = resource_names
-                        st.session_state.terraform_output = terraform_output
-
                         st.success("IPAM configuration recalculated successfully!")
                     except Exception as e:
                         st.error(f"Error recalculating IPAM configuration: {str(e)}")
@@ -699,7 +689,24 @@ def main():
         # Visualization of the calculated IPAM structure
         st.header("IPAM Visualization")
 
-        if not st.session_state.calculation_complete:
+        uploaded_file = st.file_uploader(
+            "Visualize an existing terraform.tfvars or terraform.tfvars.json instead",
+            type=["tfvars", "json"],
+        )
+        if uploaded_file is not None:
+            try:
+                imported = uploaded_tfvars(uploaded_file)
+            except (ValueError, UnicodeDecodeError) as e:
+                st.error(f"Could not read {uploaded_file.name}: {e}")
+            else:
+                issues = plan_verifier.verify_allocations(imported.cidr_allocations)
+                for issue in issues[:10]:
+                    st.warning(f"{'/'.join(issue.path) or 'top'}: {issue.message}")
+                if len(issues) > 10:
+                    st.warning(f"...and {len(issues) - 10:,} more issues")
+                utils.visualize_network_structure(imported.cidr_allocations)
+                utils.display_cidr_hierarchy(imported.cidr_allocations)
+        elif not st.session_state.calculation_complete:
             st.info(
                 "Please calculate the IPAM configuration in the 'Configuration' tab first."
             )
@@ -737,13 +744,12 @@ def main():
                 mime="text/plain",
             )
 
-            # Show Terraform module modifications if necessary
+            # Show notes on the Terraform module for this hierarchy, if any
             if st.session_state.terraform_module_modifications:
-                st.subheader("Required Terraform Module Modifications")
+                st.subheader("Terraform Module Notes")
                 st.markdown(
                     """
-                Due to the changes in hierarchy levels, you'll need to modify your Terraform module.
-                Below are the recommended modifications to your Terraform code:
+                Notes on using the Terraform module with the selected hierarchy levels:
                 """
                 )
 
@@ -758,10 +764,6 @@ def main():
 
             st.success("👆 Copy this configuration or download it as terraform.tfvars")
 
-    # Footer
-    st.markdown("---")
-    st.markdown("AWS IPAM Configurator - Sample Code")
-
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1 @@
+"""Benchmarks for the IPAM planner. Run from ipam-figurator/ with `python -m benchmarks.<name>`."""
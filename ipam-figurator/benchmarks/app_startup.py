@@ -0,0 +1,81 @@
+"""
+Startup profile for the Streamlit app.
+
+Imports app.py in fresh interpreters with `-X importtime` and reports the
+cumulative import time of the app module (the work every Streamlit worker
+does before the first page renders), the slowest modules it pulls in, and
+whether the visualization dependencies were loaded eagerly.
+
+Usage:
+    python -m benchmarks.app_startup [--runs 5] [--app-dir PATH] [--top 10]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VISUALIZATION_MODULES = ("pandas", "numpy", "plotly.express", "plotly.graph_objects")
+
+
+def profile_import(app_dir):
+    """
+    Import app.py once in a fresh interpreter.
+
+    Returns:
+        Tuple of (app cumulative import microseconds, {directly imported
+        module: cumulative us}, list of visualization modules that were imported)
+    """
+    probe = (
+        "import sys, app\n"
+        f"print(' '.join(m for m in {VISUALIZATION_MODULES!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=app_dir,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:") :].split("|")
+        # Nesting is shown by two spaces per level; keep the modules that
+        # app.py (or the interpreter itself) imports directly
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1:
+            cumulative[name.strip()] = int(cumulative_us)
+    return cumulative.get("app", 0), cumulative, result.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--app-dir", default=HERE, help="Directory containing app.py")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    args = parser.parse_args()
+
+    samples = []
+    for _ in range(args.runs):
+        app_us, cumulative, loaded = profile_import(args.app_dir)
+        samples.append(app_us)
+
+    print(
+        f"import app (median of {args.runs}): {statistics.median(samples) / 1000:.1f} ms"
+    )
+    print(
+        "Visualization modules loaded at startup: "
+        + (", ".join(loaded) if loaded else "none")
+    )
+    print("Slowest direct imports (last run):")
+    direct = {name: us for name, us in cumulative.items() if name != "app"}
+    for name, us in sorted(direct.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
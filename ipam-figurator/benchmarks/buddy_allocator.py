@@ -0,0 +1,91 @@
+"""
+Cost of buddy allocation: raw allocate/free throughput of one BuddyAllocator
+and the "buddy" allocation mode against the uniform split for thousands of
+business units per region.
+
+Usage:
+    python -m benchmarks.buddy_allocator [--allocations 1000 4000 16000]
+                                         [--regions N] [--bus N 1024 4096]
+"""
+
+import argparse
+import random
+import timeit
+
+import ipam_logic
+from buddy_allocator import BuddyAllocator
+
+
+def best_time(func, repeat):
+    """Return the fastest of repeat runs of a zero-argument callable, in seconds."""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def churn(allocations, seed=0):
+    """
+    Allocate mixed-size blocks in a /8, free every other one and refill them.
+
+    Returns:
+        Number of allocate and free operations performed
+    """
+    rng = random.Random(seed)
+    sizes = [rng.randint(22, 28) for _ in range(allocations)]
+    allocator = BuddyAllocator(10 << 24, 8)
+    blocks = [(allocator.allocate(size), size) for size in sizes]
+    for base, size in blocks[::2]:
+        allocator.free(base, size)
+    for _, size in blocks[::2]:
+        allocator.allocate(size)
+    return allocations + len(blocks[::2]) * 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--allocations", type=int, nargs="+", default=[1000, 4000, 16000]
+    )
+    parser.add_argument("--top-cidr", default="10.0.0.0/8")
+    parser.add_argument("--regions", type=int, default=4)
+    parser.add_argument("--bus", type=int, nargs="+", default=[1024, 4096])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'Allocations':>12}{'Operations':>12}{'Time (ms)':>11}{'us/op':>8}")
+    for allocations in args.allocations:
+        operations = churn(allocations)
+        elapsed = best_time(lambda: churn(allocations), args.repeat)
+        print(
+            f"{allocations:>12,}{operations:>12,}{elapsed * 1000:>11.1f}"
+            f"{elapsed / operations * 1e6:>8.2f}"
+        )
+
+    regions = [f"region-{i}" for i in range(args.regions)]
+    print(f"\n{'BUs/region':>11}{'Uniform (ms)':>14}{'Buddy (ms)':>12}{'Ratio':>8}")
+    for bu_count in args.bus:
+        bus = [f"bu{i}" for i in range(bu_count)]
+        # A quarter of the BUs ask for blocks twice the uniform size
+        required_bits = (len(regions) - 1).bit_length() + (bu_count - 1).bit_length()
+        bu_prefix_len = int(args.top_cidr.split("/")[1]) + required_bits
+        sizes = {bu: bu_prefix_len - 1 for bu in bus[: bu_count // 4]}
+        sizes.update({bu: bu_prefix_len + 1 for bu in bus[bu_count // 4 :]})
+
+        def build(mode):
+            return ipam_logic.build_allocation_plan(
+                args.top_cidr,
+                regions,
+                bus,
+                include_env_level=False,
+                allocation_mode=mode,
+                bu_prefix_lengths=sizes if mode == "buddy" else None,
+            )
+
+        uniform = best_time(lambda: build("uniform"), args.repeat)
+        buddy = best_time(lambda: build("buddy"), args.repeat)
+        print(
+            f"{bu_count:>11,}{uniform * 1000:>14.1f}{buddy * 1000:>12.1f}"
+            f"{buddy / uniform:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Cold-start time budget for the headless CLI.
+
+Runs `python cli.py` on the example configuration in fresh interpreters,
+subtracts the cost of starting a bare interpreter, and fails when the
+median overhead exceeds the budget or when a UI dependency gets imported.
+
+Usage:
+    python -m benchmarks.cli_startup [--budget-ms 50] [--runs 10]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UI_MODULES = ("streamlit", "plotly", "pandas", "numpy")
+
+
+def median_runtime(command, runs):
+    """Return the median wall-clock seconds of running command in a fresh process."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=HERE, check=True, stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def imported_ui_modules():
+    """Return the UI modules that end up in sys.modules after running the CLI."""
+    probe = (
+        "import sys, runpy\n"
+        "sys.argv = ['cli.py', '-c', 'ipam-config.example.json', '-o', "
+        f"{os.devnull!r}]\n"
+        "try:\n"
+        "    runpy.run_path('cli.py', run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print(' '.join(m for m in {UI_MODULES!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=HERE,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    bare = median_runtime([sys.executable, "-c", "pass"], args.runs)
+    cli = median_runtime(
+        [
+            sys.executable,
+            "cli.py",
+            "-c",
+            "ipam-config.example.json",
+            "-o",
+            os.devnull,
+        ],
+        args.runs,
+    )
+    overhead_ms = (cli - bare) * 1000
+
+    print(f"Bare interpreter: {bare * 1000:8.1f} ms")
+    print(f"CLI end-to-end:   {cli * 1000:8.1f} ms")
+    print(f"CLI overhead:     {overhead_ms:8.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failures = []
+    ui_modules = imported_ui_modules()
+    if ui_modules:
+        failures.append(f"UI dependencies imported: {', '.join(ui_modules)}")
+    if overhead_ms > args.budget_ms:
+        failures.append("CLI overhead exceeds the cold-start budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Cost of the CIDR hierarchy table: building the columnar table of a plan once,
+filtering it and formatting a single page of rows.
+
+Usage:
+    python -m benchmarks.hierarchy_table [--envs 16 64 256] [--regions N]
+                                         [--bus N] [--page-size N]
+"""
+
+import argparse
+import time
+
+import hierarchy_table
+import ipam_logic
+
+
+def timed(func):
+    """Return (result, seconds) of one call of a zero-argument callable."""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def format_page(table, rows):
+    """Format the displayed columns of some rows, as the app does per page."""
+    return [
+        (
+            table.path[row],
+            table.cidr(row),
+            table.address(table.first[row]),
+            table.address(table.last[row]),
+            table.reserved_cidr(row),
+        )
+        for row in rows
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top-cidr", default="10.0.0.0/8")
+    parser.add_argument("--regions", type=int, default=8)
+    parser.add_argument("--bus", type=int, default=16)
+    parser.add_argument("--envs", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    print(
+        f"{'Pools':>9}{'Build (ms)':>12}{'Cached (ms)':>13}{'Filter (ms)':>13}"
+        f"{'Page (ms)':>11}"
+    )
+    for env_count in args.envs:
+        cidr_allocations = ipam_logic.calculate_cidr_allocations(
+            args.top_cidr,
+            [f"region-{i}" for i in range(args.regions)],
+            [f"bu{i}" for i in range(args.bus)],
+            [f"env{i}" for i in range(env_count)],
+            environment_prefix_target=28,
+        )
+        table, build_time = timed(
+            lambda: hierarchy_table.hierarchy_table(cidr_allocations)
+        )
+        _, cached_time = timed(
+            lambda: hierarchy_table.hierarchy_table(cidr_allocations)
+        )
+        rows, filter_time = timed(lambda: table.filter(None, "bu3/env1"))
+        last_page = range(len(table) - args.page_size, len(table))
+        _, page_time = timed(lambda: format_page(table, last_page))
+        print(
+            f"{len(table):>9,}{build_time * 1000:>12.1f}{cached_time * 1000:>13.3f}"
+            f"{filter_time * 1000:>13.1f}{page_time * 1000:>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
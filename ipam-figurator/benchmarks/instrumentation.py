@@ -0,0 +1,76 @@
+"""
+Overhead of the stage instrumentation: the cost of a timed() call and a
+span() block with no recorder active, and the full pipeline run without a
+recorder, with timings and with timings plus peak memory.
+
+Usage:
+    python -m benchmarks.instrumentation [--regions N] [--bus N] [--envs N]
+"""
+
+import argparse
+import timeit
+
+import instrumentation
+import ipam_logic
+
+
+def best_time(func, repeat, number=1):
+    """Return the fastest of repeat runs of number calls, in seconds per call."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def noop():
+    """Function with nothing to do, to time the decorator alone."""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--regions", type=int, default=8)
+    parser.add_argument("--bus", type=int, default=16)
+    parser.add_argument("--envs", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    timed_noop = instrumentation.timed("noop")(noop)
+
+    def span_noop():
+        with instrumentation.span("noop"):
+            pass
+
+    calls = 100_000
+    plain = best_time(noop, args.repeat, calls)
+    print(f"Plain call:              {plain * 1e9:>10.0f} ns")
+    print(
+        "timed() call, idle:      "
+        f"{(best_time(timed_noop, args.repeat, calls) - plain) * 1e9:>10.0f} ns extra"
+    )
+    print(
+        "span() block, idle:      "
+        f"{(best_time(span_noop, args.repeat, calls) - plain) * 1e9:>10.0f} ns extra"
+    )
+
+    key = ipam_logic.plan_key(
+        "10.0.0.0/8",
+        [f"region-{i}" for i in range(args.regions)],
+        [f"bu{i}" for i in range(args.bus)],
+        [f"env{i}" for i in range(args.envs)],
+        environment_prefix_target=28,
+    )
+
+    def pipeline(memory=None):
+        if memory is None:
+            return ipam_logic.build_ipam_configuration(key)
+        with instrumentation.Recorder(memory=memory):
+            return ipam_logic.build_ipam_configuration(key)
+
+    pools = len(ipam_logic.plan_from_key(key))
+    print(f"\nPipeline ({pools:,} pools)")
+    off = best_time(pipeline, args.repeat)
+    print(f"  No recorder:           {off * 1000:>10.1f} ms")
+    for label, memory in (("Timings:", False), ("Timings and memory:", True)):
+        seconds = best_time(lambda: pipeline(memory), args.repeat)
+        print(f"  {label:<22}{seconds * 1000:>10.1f} ms ({seconds / off - 1:+.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Cost of checking plans against an inventory of in-use CIDRs: building the
+index, bulk-checking every leaf pool of a full plan and planning around the
+occupied blocks.
+
+Usage:
+    python -m benchmarks.inventory_check [--entries 50000] [--regions N]
+                                         [--bus N] [--envs N] [--plan-entries N]
+                                         [--environment-prefix-target N]
+"""
+
+import argparse
+import ipaddress
+import random
+import time
+
+import ipam_logic
+from cidr_index import CidrIndex, InventoryEntry
+
+
+def timed(func):
+    """Return (result, seconds) of one call of a zero-argument callable."""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def synthetic_inventory(top_cidr, count, seed=0):
+    """Return count random /24 to /28 blocks inside top_cidr."""
+    rng = random.Random(seed)
+    top = ipaddress.ip_network(top_cidr)
+    host_bits = top.max_prefixlen - top.prefixlen
+    return [
+        InventoryEntry(
+            str(
+                ipaddress.ip_network(
+                    (
+                        int(top.network_address) + rng.getrandbits(host_bits),
+                        rng.randint(24, 28),
+                    ),
+                    strict=False,
+                )
+            ),
+            f"vpc-{i:05d}",
+        )
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top-cidr", default="10.0.0.0/8")
+    parser.add_argument("--entries", type=int, default=50000)
+    parser.add_argument("--regions", type=int, default=20)
+    parser.add_argument("--bus", type=int, default=16)
+    parser.add_argument("--envs", type=int, default=16)
+    parser.add_argument("--environment-prefix-target", type=int, default=26)
+    parser.add_argument(
+        "--plan-entries",
+        type=int,
+        default=500,
+        help="In-use entries to plan around (a dense inventory leaves no free slots)",
+    )
+    args = parser.parse_args()
+
+    entries = synthetic_inventory(args.top_cidr, args.entries)
+    index, index_time = timed(lambda: CidrIndex(entries))
+
+    plan_args = (
+        args.top_cidr,
+        [f"region-{i}" for i in range(args.regions)],
+        [f"bu{i}" for i in range(args.bus)],
+        [f"env{i}" for i in range(args.envs)],
+    )
+    plan = ipam_logic.build_allocation_plan(
+        *plan_args, environment_prefix_target=args.environment_prefix_target
+    )
+    conflicts, check_time = timed(lambda: ipam_logic.find_plan_conflicts(plan, index))
+    plan_index = CidrIndex(entries[: args.plan_entries])
+    avoiding, plan_time = timed(
+        lambda: ipam_logic.build_allocation_plan(
+            *plan_args,
+            environment_prefix_target=args.environment_prefix_target,
+            in_use=plan_index,
+        )
+    )
+    if ipam_logic.find_plan_conflicts(avoiding, plan_index):
+        raise SystemExit("Planning with in_use left conflicts")
+
+    print(f"In-use entries:        {len(index):>10,}")
+    print(f"Plan pools:            {len(plan):>10,}")
+    print(f"Conflicting leaves:    {len(conflicts):>10,}")
+    print(f"Build index:           {index_time * 1000:>10.1f} ms")
+    print(f"Bulk check:            {check_time * 1000:>10.1f} ms")
+    print(
+        f"Plan around {len(plan_index):,} in-use:".ljust(23)
+        + f"{plan_time * 1000:>10.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Speed-up of process-pool planning (allocations, resource names and tfvars
+output) over the serial pipeline as the number of worker processes grows.
+
+Usage:
+    python -m benchmarks.parallel_planning [--workers 1 2 4 8] [--chunk-size N]
+"""
+
+import argparse
+import os
+import time
+
+import ipam_logic
+
+
+def best_time(func, repeat):
+    """Return (result, fastest seconds) over repeat runs of a zero-argument callable."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top-cidr", default="10.0.0.0/8")
+    parser.add_argument("--regions", type=int, default=20)
+    parser.add_argument("--bus", type=int, default=256)
+    parser.add_argument("--envs", type=int, default=16)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, cpus} | {n for n in (2, 4, 8, 16) if n < cpus}),
+    )
+    parser.add_argument("--chunk-size", type=int)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    key = ipam_logic.plan_key(
+        args.top_cidr,
+        [f"region-{i}" for i in range(args.regions)],
+        [f"bu{i}" for i in range(args.bus)],
+        [f"env{i}" for i in range(args.envs)],
+        environment_prefix_target=28,
+    )
+
+    serial, serial_time = best_time(
+        lambda: ipam_logic.build_ipam_configuration(key), args.repeat
+    )
+    pools = len(serial.cidr_allocations.plan)
+    print(f"Pools: {pools:,}   CPUs: {cpus}")
+    print(f"{'Workers':>8}{'Time (s)':>10}{'Speed-up':>10}")
+    print(f"{'serial':>8}{serial_time:>10.3f}{1:>9.2f}x")
+
+    for workers in args.workers:
+        parallel, elapsed = best_time(
+            lambda: ipam_logic.build_ipam_configuration_parallel(
+                key, workers, args.chunk_size
+            ),
+            args.repeat,
+        )
+        if parallel.terraform_output != serial.terraform_output:
+            raise SystemExit(f"Parallel output differs with {workers} workers")
+        print(f"{workers:>8}{elapsed:>10.3f}{serial_time / elapsed:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
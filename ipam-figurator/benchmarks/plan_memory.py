@@ -0,0 +1,59 @@
+"""
+Per-pool memory footprint of the compact AllocationPlan versus the nested
+dict representation that calculate_cidr_allocations used to return.
+
+Usage:
+    python -m benchmarks.plan_memory [--regions N] [--bus N] [--envs N]
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+import ipam_logic
+
+
+def measure(factory):
+    """Return (result, bytes allocated) for a zero-argument factory."""
+    gc.collect()
+    tracemalloc.start()
+    result = factory()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top-cidr", default="10.0.0.0/8")
+    parser.add_argument("--regions", type=int, default=16)
+    parser.add_argument("--bus", type=int, default=64)
+    parser.add_argument("--envs", type=int, default=16)
+    parser.add_argument("--env-prefix-target", type=int, default=28)
+    args = parser.parse_args()
+
+    regions = [f"region-{i}" for i in range(args.regions)]
+    bus = [f"bu{i}" for i in range(args.bus)]
+    envs = [f"env{i}" for i in range(args.envs)]
+
+    plan, plan_bytes = measure(
+        lambda: ipam_logic.build_allocation_plan(
+            args.top_cidr,
+            regions,
+            bus,
+            envs,
+            environment_prefix_target=args.env_prefix_target,
+        )
+    )
+    _, dict_bytes = measure(lambda: plan.as_mapping().to_dict())
+
+    pools = len(plan)
+    print(f"Pools: {pools:,}")
+    print(f"{'Representation':<16}{'Total':>14}{'Per pool':>12}")
+    print(f"{'nested dict':<16}{dict_bytes:>12,} B{dict_bytes / pools:>10.1f} B")
+    print(f"{'AllocationPlan':<16}{plan_bytes:>12,} B{plan_bytes / pools:>10.1f} B")
+    print(f"Reduction: {dict_bytes / plan_bytes:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
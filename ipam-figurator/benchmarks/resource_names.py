@@ -0,0 +1,81 @@
+"""
+Cost of naming a large hierarchy: building the lazy resource names, looking
+up every pool's name once and the region display-name lookups they rely on.
+
+Usage:
+    python -m benchmarks.resource_names [--regions N] [--bus N] [--envs N]
+"""
+
+import argparse
+import timeit
+
+import ipam_logic
+import naming
+from regions import get_ipam_regions, get_region_display_name
+
+
+def best_time(func, repeat):
+    """Return the fastest of repeat runs of a zero-argument callable, in seconds."""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def resolve_all(names):
+    """Look up the name and description of every pool; return the pool count."""
+    count = 1 + len(names["regional"])
+    for region_names in names["regional"].values():
+        region_names["name"]
+    for bus in names["business_units"].values():
+        for bu_names in bus.values():
+            bu_names["name"]
+            count += 1
+    for bus in names["environments"].values():
+        for envs in bus.values():
+            for env_names in envs.values():
+                env_names["description"]
+                count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    # 20 x 40 x 125 = 100,000 environment pools
+    parser.add_argument("--regions", type=int, default=20)
+    parser.add_argument("--bus", type=int, default=40)
+    parser.add_argument("--envs", type=int, default=125)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    catalog = [region["code"] for region in get_ipam_regions()]
+    regions = [catalog[i % len(catalog)] + f"-{i}" for i in range(args.regions)]
+    bus = [f"BU{i}" for i in range(args.bus)]
+    envs = [f"env{i}" for i in range(args.envs)]
+    templates = naming.name_templates_from_mapping(
+        {"env_name": "{env_lower:.8}-{bu_lower}-{region}"}
+    )
+
+    def build(name_templates=None):
+        return ipam_logic.generate_resource_names(
+            "10.0.0.0/8", regions, bus, envs, name_templates=name_templates
+        )
+
+    pools = resolve_all(build())
+    lookups = len(catalog) * 1000
+    print(f"Pools:                 {pools:>10,}")
+    print(f"Build names:           {best_time(build, args.repeat) * 1000:>10.2f} ms")
+    print(
+        "Build (custom):        "
+        f"{best_time(lambda: build(templates), args.repeat) * 1000:>10.2f} ms"
+    )
+    print(
+        "Resolve every pool:    "
+        f"{best_time(lambda: resolve_all(build()), args.repeat) * 1000:>10.2f} ms"
+    )
+    display_time = best_time(
+        lambda: [get_region_display_name(code) for code in catalog * 1000],
+        args.repeat,
+    )
+    print(f"Display name lookup:   {display_time / lookups * 1e9:>10.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
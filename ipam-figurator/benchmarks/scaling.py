@@ -0,0 +1,230 @@
+"""
+Scaling benchmark for the planning pipeline: time and peak memory of each
+stage for synthetic hierarchies, compared against a JSON baseline.
+
+Usage:
+    python -m benchmarks.scaling [--scenarios NAME ...] [--threshold 0.25]
+                                 [--baseline PATH] [--update-baseline]
+
+Exits with status 1 when a stage is slower or uses more memory than the
+baseline by more than the threshold, so it can gate CI jobs.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import NamedTuple
+
+import ipam_logic
+import utils
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "scaling_baseline.json")
+
+
+class Scenario(NamedTuple):
+    regions: int
+    bus: int
+    envs: int
+    top_cidr: str
+    environment_prefix_target: int
+
+
+SCENARIOS = {
+    "tiny": Scenario(1, 1, 1, "10.0.0.0/8", 18),
+    "small": Scenario(3, 4, 4, "10.0.0.0/16", 24),
+    "regions": Scenario(20, 4, 4, "10.0.0.0/8", 24),
+    "medium": Scenario(10, 32, 16, "10.0.0.0/8", 24),
+    "wide-bu": Scenario(4, 1024, 4, "10.0.0.0/8", 28),
+    "deep-env": Scenario(4, 16, 256, "10.0.0.0/8", 30),
+    "large": Scenario(20, 256, 16, "10.0.0.0/8", 28),
+    # Millions of pools down to /32 environments; run explicitly
+    "max": Scenario(20, 1024, 256, "10.0.0.0/8", 32),
+}
+DEFAULT_SCENARIOS = [name for name in SCENARIOS if name != "max"]
+
+
+def stages(scenario):
+    """Return the pipeline stages as (name, callable taking the previous results)."""
+    regions = [f"region-{i}" for i in range(scenario.regions)]
+    bus = [f"bu{i}" for i in range(scenario.bus)]
+    envs = [f"env{i}" for i in range(scenario.envs)]
+
+    return [
+        (
+            "allocations",
+            lambda results: ipam_logic.calculate_cidr_allocations(
+                scenario.top_cidr,
+                regions,
+                bus,
+                envs,
+                environment_prefix_target=scenario.environment_prefix_target,
+            ),
+        ),
+        (
+            "resource_names",
+            lambda results: ipam_logic.generate_resource_names(
+                scenario.top_cidr, regions, bus, envs
+            ),
+        ),
+        (
+            "terraform_output",
+            lambda results: ipam_logic.generate_terraform_output(
+                results["allocations"], results["resource_names"], True, True
+            ),
+        ),
+        (
+            "allocation_stats",
+            lambda results: utils.calculate_allocation_stats(results["allocations"]),
+        ),
+    ]
+
+
+def measure(func, results, repeat):
+    """Return (result, best seconds, peak traced bytes) for a stage."""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = func(results)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = func(results)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def run_scenario(scenario, repeat):
+    """Run every stage of a scenario and return {stage: {"seconds", "peak_bytes"}}."""
+    results = {}
+    metrics = {}
+    for name, func in stages(scenario):
+        results[name], seconds, peak = measure(func, results, repeat)
+        metrics[name] = {"seconds": seconds, "peak_bytes": peak}
+    return metrics
+
+
+def find_regressions(current, baseline, threshold, min_seconds):
+    """
+    Compare metrics with a baseline.
+
+    Args:
+        current: {scenario: {stage: metrics}} from this run
+        baseline: Same structure loaded from the baseline file
+        threshold: Allowed relative increase (0.25 = 25%)
+        min_seconds: Time differences below this are treated as noise
+
+    Returns:
+        List of human-readable regression descriptions
+    """
+    regressions = []
+    for scenario, stage_metrics in current.items():
+        for stage, metrics in stage_metrics.items():
+            reference = baseline.get(scenario, {}).get(stage)
+            if not reference:
+                continue
+            seconds, reference_seconds = metrics["seconds"], reference["seconds"]
+            if (
+                seconds > reference_seconds * (1 + threshold)
+                and seconds - reference_seconds > min_seconds
+            ):
+                regressions.append(
+                    f"{scenario}/{stage}: time {reference_seconds * 1000:.1f} ms"
+                    f" -> {seconds * 1000:.1f} ms"
+                )
+            peak, reference_peak = metrics["peak_bytes"], reference["peak_bytes"]
+            if peak > reference_peak * (1 + threshold):
+                regressions.append(
+                    f"{scenario}/{stage}: peak memory {reference_peak / 2**20:.2f} MiB"
+                    f" -> {peak / 2**20:.2f} MiB"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=sorted(SCENARIOS),
+        default=DEFAULT_SCENARIOS,
+        help="Scenarios to run (default: all but 'max')",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write this run's results to the baseline file instead of comparing",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown or memory growth (default: 0.25)",
+    )
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.002,
+        help="Ignore slowdowns smaller than this many seconds (default: 0.002)",
+    )
+    args = parser.parse_args()
+
+    current = {}
+    print(
+        f"{'Scenario':<10}{'Pools':>11}  {'Stage':<18}{'Time (ms)':>11}{'Peak (MiB)':>12}"
+    )
+    for name in args.scenarios:
+        scenario = SCENARIOS[name]
+        current[name] = run_scenario(scenario, args.repeat)
+        pools = 1 + scenario.regions * (1 + scenario.bus * (1 + scenario.envs))
+        for stage, metrics in current[name].items():
+            print(
+                f"{name:<10}{pools:>11,}  {stage:<18}{metrics['seconds'] * 1000:>11.1f}"
+                f"{metrics['peak_bytes'] / 2**20:>12.2f}"
+            )
+
+    if args.update_baseline:
+        baseline = {"results": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as handle:
+                baseline = json.load(handle)
+        baseline["python"] = platform.python_version()
+        baseline["platform"] = platform.platform()
+        baseline["results"].update(current)
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(baseline, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline first")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    regressions = find_regressions(
+        current, baseline["results"], args.threshold, args.min_seconds
+    )
+    if regressions:
+        print(f"\nRegressions beyond {args.threshold:.0%} of the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%} of the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
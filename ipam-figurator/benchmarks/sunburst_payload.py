@@ -0,0 +1,57 @@
+"""
+Size and build time of the hierarchy Sunburst: every pool drawn versus the
+level-of-detail view within a node budget.
+
+Usage:
+    python -m benchmarks.sunburst_payload [--envs 16 64 256] [--regions N]
+                                          [--bus N] [--node-budget N]
+"""
+
+import argparse
+import time
+
+import hierarchy_view
+import ipam_logic
+import utils
+
+
+def figure_stats(cidr_allocations, node_budget):
+    """Return (nodes, seconds to build the figure, JSON payload bytes)."""
+    start = time.perf_counter()
+    nodes = hierarchy_view.sunburst_nodes(cidr_allocations, node_budget=node_budget)
+    fig = utils.create_hierarchy_visualization(cidr_allocations, nodes)
+    elapsed = time.perf_counter() - start
+    return len(nodes.ids), elapsed, len(fig.to_json())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top-cidr", default="10.0.0.0/8")
+    parser.add_argument("--regions", type=int, default=8)
+    parser.add_argument("--bus", type=int, default=16)
+    parser.add_argument("--envs", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument(
+        "--node-budget", type=int, default=hierarchy_view.DEFAULT_NODE_BUDGET
+    )
+    args = parser.parse_args()
+
+    print(f"{'Pools':>9}{'View':>7}{'Nodes':>9}{'Build (ms)':>12}{'Payload (KiB)':>15}")
+    for env_count in args.envs:
+        cidr_allocations = ipam_logic.calculate_cidr_allocations(
+            args.top_cidr,
+            [f"region-{i}" for i in range(args.regions)],
+            [f"bu{i}" for i in range(args.bus)],
+            [f"env{i}" for i in range(env_count)],
+            environment_prefix_target=28,
+        )
+        pools = 1 + hierarchy_view.count_pools(cidr_allocations)
+        for view, node_budget in (("full", 0), ("lod", args.node_budget)):
+            nodes, elapsed, payload = figure_stats(cidr_allocations, node_budget)
+            print(
+                f"{pools:>9,}{view:>7}{nodes:>9,}{elapsed * 1000:>12.1f}"
+                f"{payload / 1024:>15,.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Time and peak memory of loading generated terraform.tfvars and
+terraform.tfvars.json files back with tfvars_import, for growing numbers of
+environment pools. Every loaded HCL plan is re-emitted and compared with the
+file it came from.
+
+Usage:
+    python -m benchmarks.tfvars_import [--sizes 16384 131072 262144]
+"""
+
+import argparse
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import ipam_logic
+import tfvars_import
+
+
+def write_files(directory, env_pools):
+    """Write HCL and JSON tfvars with about env_pools environments; return their paths."""
+    regions = [f"region-{i}" for i in range(16)]
+    envs = [f"env{i}" for i in range(min(256, max(1, env_pools // len(regions))))]
+    bus = [f"bu{i}" for i in range(max(1, env_pools // (len(regions) * len(envs))))]
+    allocations = ipam_logic.calculate_cidr_allocations(
+        "10.0.0.0/8", regions, bus, envs, environment_prefix_target=30
+    )
+    names = ipam_logic.generate_resource_names("10.0.0.0/8", regions, bus, envs)
+
+    hcl_path = os.path.join(directory, f"{env_pools}.tfvars")
+    with open(hcl_path, "w", encoding="utf-8") as stream:
+        ipam_logic.write_terraform_output(stream, allocations, names)
+    json_path = hcl_path + ".json"
+    with open(json_path, "w", encoding="utf-8") as stream:
+        # One attribute per line, as tools usually write it; the reader holds
+        # a whole line in memory, so a minified document is read at once
+        with open(hcl_path, encoding="utf-8") as hcl:
+            json.dump(tfvars_import.parse_tfvars(hcl), stream, indent=2)
+    return hcl_path, json_path, len(regions) * len(bus) * len(envs)
+
+
+def measure(func):
+    """
+    Return (result, seconds, peak traced bytes) for a zero-argument callable.
+
+    The callable runs twice, since tracing allocations slows it down several
+    times over.
+    """
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16384, 131072, 262144])
+    args = parser.parse_args()
+
+    print(
+        f"{'Env pools':>10}{'Format':>8}{'Size (MB)':>11}"
+        f"{'Time (s)':>10}{'MB/s':>8}{'Peak (MiB)':>12}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            hcl_path, json_path, env_pools = write_files(directory, size)
+            for label, path in (("hcl", hcl_path), ("json", json_path)):
+                megabytes = os.path.getsize(path) / 1e6
+                plan, elapsed, peak = measure(lambda: tfvars_import.load_tfvars(path))
+                print(
+                    f"{env_pools:>10,}{label:>8}{megabytes:>11.1f}{elapsed:>10.2f}"
+                    f"{megabytes / elapsed:>8.1f}{peak / 2**20:>12.1f}"
+                )
+
+                stream = io.StringIO()
+                ipam_logic.write_terraform_output(stream, *plan)
+                with open(hcl_path, encoding="utf-8") as original:
+                    if stream.getvalue() != original.read():
+                        raise SystemExit(f"{path} did not round-trip")
+                del plan, stream
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Size and generation time of terraform.tfvars (HCL) versus
+terraform.tfvars.json with each installed JSON backend, for growing numbers
+of environment pools.
+
+Usage:
+    python -m benchmarks.tfvars_json [--sizes 1024 16384 131072]
+"""
+
+import argparse
+import time
+
+import ipam_logic
+from benchmarks.tfvars_stream import build_inputs
+
+
+class _CountingSink:
+    """Text stream that only counts the bytes written to it."""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, text):
+        self.size += len(text.encode())
+
+
+def best_of(repeat, func):
+    """Return (seconds of the fastest run, result of the last run)."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 16384, 131072])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    formats = [("hcl", None)]
+    for backend in ipam_logic.JSON_BACKENDS:
+        try:
+            ipam_logic.json_encoder(backend)
+        except ValueError:
+            print(f"({backend} is not installed; skipped)")
+            continue
+        formats.append((f"json/{backend}", backend))
+
+    print(f"{'Env pools':>10}{'Format':>14}{'Size (MB)':>11}{'Time (s)':>10}")
+    for size in args.sizes:
+        allocations, names, env_pools = build_inputs(size)
+        for label, backend in formats:
+
+            def write():
+                sink = _CountingSink()
+                if backend is None:
+                    ipam_logic.write_terraform_output(sink, allocations, names)
+                else:
+                    ipam_logic.write_terraform_json(
+                        sink, allocations, names, json_backend=backend
+                    )
+                return sink.size
+
+            elapsed, written = best_of(args.repeat, write)
+            print(f"{env_pools:>10,}{label:>14}{written / 1e6:>11.2f}{elapsed:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
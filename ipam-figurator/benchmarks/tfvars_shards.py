@@ -0,0 +1,79 @@
+"""
+Largest Terraform state of a sharded deployment versus the single stack, and
+the time to write the shard files, for growing numbers of environment pools.
+
+Terraform refreshes and diffs every resource of a state on each plan, so the
+critical path of a pipeline that plans the shards concurrently is the base
+stack followed by the largest shard.
+
+Usage:
+    python -m benchmarks.tfvars_shards [--sizes 1024 16384 131072]
+"""
+
+import argparse
+import os
+import time
+
+import ipam_logic
+from benchmarks.tfvars_stream import build_inputs
+
+
+def count_resources(bu_cidrs, env_cidrs):
+    """Return the number of module resources behind BU and environment pools."""
+    count = 0
+    for bus in (bu_cidrs or {}).values():
+        # Pool and pool CIDR
+        count += 2 * len(bus)
+    for bus in (env_cidrs or {}).values():
+        for envs in bus.values():
+            for env_data in envs.values():
+                # Pool, pool CIDR, RAM share, principal and resource association
+                count += 5 + (1 if env_data["reserved_cidr"] else 0)
+    return count
+
+
+def shard_resources(allocations, shard):
+    """Return the number of module resources of one shard stack."""
+    bus = allocations["bu_cidrs"][shard.region]
+    envs = allocations["env_cidrs"][shard.region]
+    if shard.bu is not None:
+        bus = {shard.bu: bus[shard.bu]}
+        envs = {shard.bu: envs[shard.bu]}
+    return count_resources({shard.region: bus}, {shard.region: envs})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 16384, 131072])
+    args = parser.parse_args()
+
+    print(
+        f"{'Env pools':>10}{'Shard by':>10}{'Shards':>8}{'Single stack':>14}"
+        f"{'Base':>6}{'Largest shard':>15}{'Write (s)':>11}"
+    )
+    for size in args.sizes:
+        allocations, names, env_pools = build_inputs(size)
+        # IPAM, top-level pool and CIDR, regional pools and CIDRs
+        base = 3 + 2 * len(allocations["regional_cidrs"])
+        single = base + count_resources(
+            allocations["bu_cidrs"], allocations["env_cidrs"]
+        )
+        for shard_by in ipam_logic.SHARD_LEVELS:
+            shards = ipam_logic.terraform_shards(allocations, shard_by=shard_by)
+            start = time.perf_counter()
+            with open(os.devnull, "w") as stream:
+                stream.writelines(ipam_logic.iter_terraform_base(allocations, names))
+                for shard in shards:
+                    stream.writelines(
+                        ipam_logic.iter_terraform_shard(allocations, names, shard)
+                    )
+            elapsed = time.perf_counter() - start
+            largest = max(shard_resources(allocations, shard) for shard in shards)
+            print(
+                f"{env_pools:>10,}{shard_by:>10}{len(shards):>8,}{single:>14,}"
+                f"{base:>6,}{largest:>15,}{elapsed:>11.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Time and peak memory of streaming tfvars emission versus building the
+whole document as one string, for growing numbers of environment pools.
+
+Usage:
+    python -m benchmarks.tfvars_stream [--sizes 1024 16384 131072]
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+
+import ipam_logic
+
+
+def build_inputs(env_pools):
+    """Return (cidr_allocations, resource_names) with about env_pools environments."""
+    regions = [f"region-{i}" for i in range(4)]
+    bus = [f"bu{i}" for i in range(max(1, env_pools // (len(regions) * 128)))]
+    envs = [f"env{i}" for i in range(min(128, env_pools // len(regions)))]
+    allocations = ipam_logic.calculate_cidr_allocations(
+        "10.0.0.0/8", regions, bus, envs, environment_prefix_target=30
+    )
+    names = ipam_logic.generate_resource_names("10.0.0.0/8", regions, bus, envs)
+    return allocations, names, len(regions) * len(bus) * len(envs)
+
+
+def measure(func):
+    """Return (seconds, peak traced bytes) for a zero-argument callable."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1024, 16384, 131072])
+    args = parser.parse_args()
+
+    print(f"{'Env pools':>10}{'Mode':>10}{'Time (s)':>12}{'Peak (MiB)':>12}")
+    for size in args.sizes:
+        allocations, names, env_pools = build_inputs(size)
+
+        def write_stream():
+            with open(os.devnull, "w") as stream:
+                ipam_logic.write_terraform_output(stream, allocations, names)
+
+        def build_string():
+            ipam_logic.generate_terraform_output(allocations, names)
+
+        for mode, func in (("stream", write_stream), ("string", build_string)):
+            elapsed, peak = measure(func)
+            print(f"{env_pools:>10,}{mode:>10}{elapsed:>12.3f}{peak / 2**20:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Time to build an allocation plan with the scalar per-pool loop versus the
+NumPy-vectorized pass, for both reserved CIDR strategies.
+
+Usage:
+    python -m benchmarks.vectorized_plan [--regions N] [--bus N] [--envs N 4 16 64]
+"""
+
+import argparse
+import timeit
+
+import ipam_logic
+
+STRATEGIES = (("Half of subnet", None), ("Custom percentage", 10))
+
+
+def best_time(func, repeat):
+    """Return the fastest of repeat runs of a zero-argument callable, in seconds."""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top-cidr", default="10.0.0.0/8")
+    parser.add_argument("--regions", type=int, default=16)
+    parser.add_argument("--bus", type=int, default=64)
+    parser.add_argument("--envs", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    regions = [f"region-{i}" for i in range(args.regions)]
+    bus = [f"bu{i}" for i in range(args.bus)]
+
+    print(
+        f"{'Pools':>9}  {'Strategy':<18}{'Scalar (ms)':>12}"
+        f"{'Vectorized (ms)':>17}{'Speedup':>9}"
+    )
+    for env_count in args.envs:
+        envs = [f"env{i}" for i in range(env_count)]
+        for strategy, percentage in STRATEGIES:
+
+            def build(vectorized):
+                return ipam_logic.build_allocation_plan(
+                    args.top_cidr,
+                    regions,
+                    bus,
+                    envs,
+                    environment_prefix_target=28,
+                    reserved_strategy=strategy,
+                    reserved_percentage=percentage,
+                    vectorized=vectorized,
+                )
+
+            scalar_plan, vectorized_plan = build(False), build(True)
+            if vectorized_plan.as_mapping() != scalar_plan.as_mapping():
+                raise SystemExit(f"Vectorized plan differs for {env_count} envs")
+
+            scalar = best_time(lambda: build(False), args.repeat)
+            vectorized = best_time(lambda: build(True), args.repeat)
+            print(
+                f"{len(scalar_plan):>9,}  {strategy:<18}{scalar * 1000:>12.1f}"
+                f"{vectorized * 1000:>17.1f}{scalar / vectorized:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import heapq
+from typing import Dict, List, Optional, Set
+
+from allocation_plan import (
+    IPV4_MAX_PREFIXLEN,
+    IPV6_MAX_PREFIXLEN,
+    format_cidr,
+    format_ipv6_cidr,
+)
+
+
+class BuddyAllocator:
+    """
+    Buddy allocator for the power-of-two child blocks of one parent pool.
+
+    Free blocks are kept per prefix length, each as a set for membership
+    tests and a min-heap for the lowest address, plus a bitmask of the prefix
+    lengths that have free blocks. Allocation takes the smallest free block
+    that fits (the lowest address among those) and splits it; freeing merges
+    a block with its buddy for as long as the buddy is free. Both cost
+    O(log n) in the number of free blocks plus the number of halvings.
+    """
+
+    __slots__ = (
+        "base",
+        "prefix_len",
+        "max_prefix_len",
+        "allocated",
+        "_free",
+        "_heaps",
+        "_free_mask",
+    )
+
+    def __init__(
+        self, base: int, prefix_len: int, max_prefix_len: int = IPV4_MAX_PREFIXLEN
+    ):
+        """
+        Create an allocator with the whole parent pool free.
+
+        Args:
+            base: Integer network address of the parent pool
+            prefix_len: Prefix length of the parent pool
+            max_prefix_len: Address width (32 for IPv4, 128 for IPv6)
+        """
+        self.base = base
+        self.prefix_len = prefix_len
+        self.max_prefix_len = max_prefix_len
+        # Allocated block base -> prefix length
+        self.allocated: Dict[int, int] = {}
+        self._free: List[Set[int]] = [set() for _ in range(max_prefix_len + 1)]
+        # Heaps may hold stale entries for blocks that were split or merged;
+        # they are discarded when they reach the top
+        self._heaps: List[List[int]] = [[] for _ in range(max_prefix_len + 1)]
+        self._free_mask = 0
+        self._add_free(base, prefix_len)
+
+    def __repr__(self) -> str:
+        return f"BuddyAllocator({self._cidr(self.base, self.prefix_len)!r})"
+
+    def allocate(self, prefix_len: int) -> int:
+        """
+        Allocate a child block.
+
+        Args:
+            prefix_len: Prefix length of the requested block
+
+        Returns:
+            Integer network address of the allocated block
+
+        Raises:
+            ValueError: If the prefix length does not fit the parent pool or
+                no free block is large enough
+        """
+        block_prefix_len = self._fitting_prefix_len(prefix_len)
+        if block_prefix_len is None:
+            raise ValueError(
+                f"No free /{prefix_len} block left in"
+                f" {self._cidr(self.base, self.prefix_len)}"
+            )
+        block = self._lowest_free(block_prefix_len)
+        self._remove_free(block, block_prefix_len)
+
+        # Keep the lower half and free the upper half until the block is the
+        # requested size
+        while block_prefix_len < prefix_len:
+            block_prefix_len += 1
+            self._add_free(
+                block + (1 << (self.max_prefix_len - block_prefix_len)),
+                block_prefix_len,
+            )
+
+        self.allocated[block] = prefix_len
+        return block
+
+    def free(self, base: int, prefix_len: int) -> None:
+        """
+        Return an allocated block, merging it with free buddies.
+
+        Args:
+            base: Integer network address of the block
+            prefix_len: Prefix length the block was allocated with
+
+        Raises:
+            ValueError: If the block is not currently allocated
+        """
+        if self.allocated.get(base) != prefix_len:
+            raise ValueError(
+                f"{self._cidr(base, prefix_len)} is not allocated from"
+                f" {self._cidr(self.base, self.prefix_len)}"
+            )
+        del self.allocated[base]
+
+        while prefix_len > self.prefix_len:
+            buddy = self.base + (
+                (base - self.base) ^ (1 << (self.max_prefix_len - prefix_len))
+            )
+            if buddy not in self._free[prefix_len]:
+                break
+            self._remove_free(buddy, prefix_len)
+            base = min(base, buddy)
+            prefix_len -= 1
+        self._add_free(base, prefix_len)
+
+    def find_free(self, prefix_len: int) -> Optional[int]:
+        """
+        Find the block allocate() would return, without allocating it.
+
+        Args:
+            prefix_len: Prefix length of the requested block
+
+        Returns:
+            Integer network address, or None if no free block is large enough
+        """
+        block_prefix_len = self._fitting_prefix_len(prefix_len)
+        if block_prefix_len is None:
+            return None
+        return self._lowest_free(block_prefix_len)
+
+    @property
+    def free_addresses(self) -> int:
+        """Number of addresses not covered by an allocated block."""
+        return sum(
+            len(blocks) << (self.max_prefix_len - prefix_len)
+            for prefix_len, blocks in enumerate(self._free)
+            if blocks
+        )
+
+    def _fitting_prefix_len(self, prefix_len: int) -> Optional[int]:
+        """Return the longest free-block prefix length that can hold prefix_len."""
+        if not self.prefix_len <= prefix_len <= self.max_prefix_len:
+            raise ValueError(
+                f"A /{prefix_len} block cannot be allocated from"
+                f" {self._cidr(self.base, self.prefix_len)}"
+            )
+        candidates = self._free_mask & ((2 << prefix_len) - 1)
+        if not candidates:
+            return None
+        return candidates.bit_length() - 1
+
+    def _lowest_free(self, prefix_len: int) -> int:
+        heap = self._heaps[prefix_len]
+        blocks = self._free[prefix_len]
+        while heap[0] not in blocks:
+            heapq.heappop(heap)
+        return heap[0]
+
+    def _add_free(self, base: int, prefix_len: int) -> None:
+        self._free[prefix_len].add(base)
+        heapq.heappush(self._heaps[prefix_len], base)
+        self._free_mask |= 1 << prefix_len
+
+    def _remove_free(self, base: int, prefix_len: int) -> None:
+        blocks = self._free[prefix_len]
+        blocks.discard(base)
+        if not blocks:
+            self._free_mask &= ~(1 << prefix_len)
+            self._heaps[prefix_len].clear()
+
+    def _cidr(self, base: int, prefix_len: int) -> str:
+        if self.max_prefix_len == IPV6_MAX_PREFIXLEN:
+            return format_ipv6_cidr(base, prefix_len)
+        return format_cidr(base, prefix_len)
@@ -0,0 +1,337 @@
+"""
+Index of CIDR blocks that are already in use (existing VPCs, on-premises
+ranges, ...), loaded from CSV or JSON inventories, for checking plans
+against them.
+"""
+
+import csv
+import ipaddress
+import json
+import re
+import socket
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+from allocation_plan import IPV4_MAX_PREFIXLEN, IPV6_MAX_PREFIXLEN
+
+# Column or key names accepted for the CIDR and the label of an entry
+CIDR_FIELDS = ("cidr", "cidr_block", "CidrBlock", "Ipv6CidrBlock")
+NAME_FIELDS = ("name", "Name", "description", "VpcId")
+
+_OCTET = r"(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)"
+_IPV4_CIDR = re.compile(rf"{_OCTET}\.{_OCTET}\.{_OCTET}\.{_OCTET}/(?:3[0-2]|[12]?\d)")
+
+
+class InventoryEntry(NamedTuple):
+    """An in-use CIDR block and the label it was imported with."""
+
+    cidr: str
+    name: str = ""
+
+
+class _FamilyIndex:
+    """Blocks of one address family, hashed per prefix length and sorted by address."""
+
+    __slots__ = (
+        "max_prefix_len",
+        "blocks",
+        "prefix_mask",
+        "starts",
+        "keys",
+        "merged_starts",
+        "merged_ends",
+    )
+
+    def __init__(
+        self,
+        max_prefix_len: int,
+        blocks: Dict[Tuple[int, int], List[InventoryEntry]],
+    ):
+        self.max_prefix_len = max_prefix_len
+        # (base, prefix_len) -> entries with that exact block
+        self.blocks = blocks
+        # Bit p is set when some block has prefix length p
+        self.prefix_mask = 0
+        for _, prefix_len in blocks:
+            self.prefix_mask |= 1 << prefix_len
+
+        self.keys = sorted(blocks)
+        self.starts = [base for base, _ in self.keys]
+
+        # Union of all blocks as disjoint sorted intervals, for overlap tests
+        self.merged_starts: List[int] = []
+        self.merged_ends: List[int] = []
+        for base, prefix_len in self.keys:
+            end = base + (1 << (max_prefix_len - prefix_len)) - 1
+            if self.merged_ends and base <= self.merged_ends[-1] + 1:
+                self.merged_ends[-1] = max(self.merged_ends[-1], end)
+            else:
+                self.merged_starts.append(base)
+                self.merged_ends.append(end)
+
+
+class CidrIndex:
+    """
+    Overlap and containment queries against a set of in-use CIDR blocks.
+
+    Two CIDR blocks are either nested or disjoint, so every query is
+    answered from two structures per address family: the union of all
+    blocks as sorted disjoint intervals (a binary search tells whether a
+    block overlaps anything) and the blocks sorted by address plus a hash
+    table keyed by (network address, prefix length), which find the blocks
+    inside a query block and, one lookup per prefix length in use, the blocks
+    containing it. Queries take integer addresses so plans can be checked
+    without formatting CIDR strings.
+    """
+
+    __slots__ = ("_families", "_size")
+
+    def __init__(self, entries: Iterable[InventoryEntry] = ()):
+        """
+        Build the index.
+
+        Args:
+            entries: In-use blocks; host bits set in a CIDR are ignored
+
+        Raises:
+            ValueError: If an entry is not a valid CIDR block
+        """
+        blocks: Dict[int, Dict[Tuple[int, int], List[InventoryEntry]]] = {
+            IPV4_MAX_PREFIXLEN: {},
+            IPV6_MAX_PREFIXLEN: {},
+        }
+        self._size = 0
+        for entry in entries:
+            try:
+                max_prefix_len, base, prefix_len = parse_block(entry.cidr)
+            except ValueError as e:
+                raise ValueError(f"Invalid in-use CIDR {entry.cidr!r}") from e
+            blocks[max_prefix_len].setdefault((base, prefix_len), []).append(entry)
+            self._size += 1
+        self._families = {
+            max_prefix_len: _FamilyIndex(max_prefix_len, family_blocks)
+            for max_prefix_len, family_blocks in blocks.items()
+        }
+
+    def __len__(self) -> int:
+        return self._size
+
+    def overlaps(
+        self, base: int, prefix_len: int, max_prefix_len: int = IPV4_MAX_PREFIXLEN
+    ) -> bool:
+        """
+        Return whether a block shares any address with an in-use block.
+
+        Args:
+            base: Integer network address of the block
+            prefix_len: Prefix length of the block
+            max_prefix_len: Address width (32 for IPv4, 128 for IPv6)
+        """
+        family = self._families[max_prefix_len]
+        end = base + (1 << (max_prefix_len - prefix_len)) - 1
+        i = bisect_right(family.merged_starts, end) - 1
+        return i >= 0 and family.merged_ends[i] >= base
+
+    def first_free(
+        self, base: int, prefix_len: int, max_prefix_len: int = IPV4_MAX_PREFIXLEN
+    ) -> int:
+        """
+        Find the first block of a given size at or after an address that
+        does not overlap an in-use block.
+
+        Args:
+            base: Integer address to start from, aligned to the block size
+            prefix_len: Prefix length of the block
+            max_prefix_len: Address width (32 for IPv4, 128 for IPv6)
+
+        Returns:
+            Integer network address of the free block
+        """
+        family = self._families[max_prefix_len]
+        size = 1 << (max_prefix_len - prefix_len)
+        while True:
+            i = bisect_right(family.merged_starts, base + size - 1) - 1
+            if i < 0 or family.merged_ends[i] < base:
+                return base
+            # Jump past the whole occupied interval in one step
+            base = (family.merged_ends[i] + size) // size * size
+
+    def covering(
+        self, base: int, prefix_len: int, max_prefix_len: int = IPV4_MAX_PREFIXLEN
+    ) -> List[InventoryEntry]:
+        """
+        Return the in-use entries whose block contains (or equals) a block.
+
+        Args:
+            base: Integer network address of the block
+            prefix_len: Prefix length of the block
+            max_prefix_len: Address width (32 for IPv4, 128 for IPv6)
+        """
+        return self._covering(base, max_prefix_len, (2 << prefix_len) - 1)
+
+    def _covering(
+        self, base: int, max_prefix_len: int, prefix_mask: int
+    ) -> List[InventoryEntry]:
+        """Return the entries containing base whose prefix length is in prefix_mask."""
+        family = self._families[max_prefix_len]
+        entries = []
+        candidates = family.prefix_mask & prefix_mask
+        while candidates:
+            candidate_prefix_len = (candidates & -candidates).bit_length() - 1
+            candidates &= candidates - 1
+            host_bits = max_prefix_len - candidate_prefix_len
+            key = (base >> host_bits << host_bits, candidate_prefix_len)
+            entries.extend(family.blocks.get(key, ()))
+        return entries
+
+    def within(
+        self, base: int, prefix_len: int, max_prefix_len: int = IPV4_MAX_PREFIXLEN
+    ) -> List[InventoryEntry]:
+        """
+        Return the in-use entries whose block lies inside (or equals) a block.
+
+        Args:
+            base: Integer network address of the block
+            prefix_len: Prefix length of the block
+            max_prefix_len: Address width (32 for IPv4, 128 for IPv6)
+        """
+        family = self._families[max_prefix_len]
+        end = base + (1 << (max_prefix_len - prefix_len)) - 1
+        entries = []
+        for key in family.keys[
+            bisect_left(family.starts, base) : bisect_right(family.starts, end)
+        ]:
+            # A shorter prefix starting at the same address contains the block
+            if key[1] >= prefix_len:
+                entries.extend(family.blocks[key])
+        return entries
+
+    def overlapping(
+        self, base: int, prefix_len: int, max_prefix_len: int = IPV4_MAX_PREFIXLEN
+    ) -> List[InventoryEntry]:
+        """
+        Return every in-use entry that shares an address with a block.
+
+        Args:
+            base: Integer network address of the block
+            prefix_len: Prefix length of the block
+            max_prefix_len: Address width (32 for IPv4, 128 for IPv6)
+        """
+        if not self.overlaps(base, prefix_len, max_prefix_len):
+            return []
+        # Blocks equal to the query are reported by within()
+        return self._covering(
+            base, max_prefix_len, (1 << prefix_len) - 1
+        ) + self.within(base, prefix_len, max_prefix_len)
+
+
+def parse_block(cidr: str) -> Tuple[int, int, int]:
+    """
+    Parse a CIDR block, ignoring host bits.
+
+    Args:
+        cidr: IPv4 or IPv6 CIDR string (a bare address is a single host)
+
+    Returns:
+        Tuple of (address width, integer network address, prefix length)
+
+    Raises:
+        ValueError: If the string is not a valid CIDR block
+    """
+    # Plain dotted quads skip the much slower ipaddress parser; anything
+    # else (IPv6, leading zeros, errors) goes through it
+    if _IPV4_CIDR.fullmatch(cidr):
+        address, _, prefix = cidr.partition("/")
+        prefix_len = int(prefix)
+        host_bits = IPV4_MAX_PREFIXLEN - prefix_len
+        base = int.from_bytes(socket.inet_aton(address), "big")
+        return IPV4_MAX_PREFIXLEN, base >> host_bits << host_bits, prefix_len
+
+    try:
+        network = ipaddress.ip_network(cidr.strip(), strict=False)
+    except ValueError as e:
+        raise ValueError(f"Invalid CIDR {cidr!r}: {e}") from e
+    return network.max_prefixlen, int(network.network_address), network.prefixlen
+
+
+def load_inventory(path: str) -> CidrIndex:
+    """
+    Load in-use CIDR blocks from a CSV or JSON file.
+
+    CSV files need a header row with a "cidr" (or "cidr_block") column and
+    may have a "name" or "description" column. JSON files may hold a list
+    of CIDR strings, a list of objects with a "cidr" key, or the output of
+    `aws ec2 describe-vpcs` (every IPv4 and IPv6 association is imported).
+
+    Args:
+        path: Path to a .csv or .json file
+
+    Returns:
+        CidrIndex of the imported blocks
+
+    Raises:
+        ValueError: If the file format is not recognized or a CIDR is invalid
+    """
+    with open(path, encoding="utf-8", newline="") as handle:
+        if path.endswith(".csv"):
+            entries = _csv_entries(csv.DictReader(handle), path)
+        else:
+            try:
+                entries = _json_entries(json.load(handle), path)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON in {path}: {e}") from e
+        return CidrIndex(entries)
+
+
+def _csv_entries(reader: csv.DictReader, path: str) -> List[InventoryEntry]:
+    fields = reader.fieldnames or []
+    cidr_field = next((field for field in CIDR_FIELDS if field in fields), None)
+    if cidr_field is None:
+        raise ValueError(f"{path} needs a 'cidr' column")
+    name_field = next((field for field in NAME_FIELDS if field in fields), None)
+    return [
+        InventoryEntry(row[cidr_field].strip(), (row.get(name_field) or "").strip())
+        for row in reader
+        if row[cidr_field] and row[cidr_field].strip()
+    ]
+
+
+def _json_entries(data: Any, path: str) -> List[InventoryEntry]:
+    if isinstance(data, dict) and "Vpcs" in data:
+        entries = []
+        for vpc in data["Vpcs"]:
+            name = next(
+                (tag["Value"] for tag in vpc.get("Tags", ()) if tag["Key"] == "Name"),
+                vpc.get("VpcId", ""),
+            )
+            cidrs = {
+                association["CidrBlock"]
+                for association in vpc.get("CidrBlockAssociationSet", ())
+            }
+            cidrs.update(
+                association["Ipv6CidrBlock"]
+                for association in vpc.get("Ipv6CidrBlockAssociationSet", ())
+            )
+            if vpc.get("CidrBlock"):
+                cidrs.add(vpc["CidrBlock"])
+            entries.extend(InventoryEntry(cidr, name) for cidr in sorted(cidrs))
+        return entries
+
+    if isinstance(data, dict):
+        data = data.get("cidrs")
+    if not isinstance(data, list):
+        raise ValueError(
+            f"{path} must contain a list of CIDRs, a 'cidrs' list or describe-vpcs output"
+        )
+
+    entries = []
+    for item in data:
+        if isinstance(item, str):
+            entries.append(InventoryEntry(item))
+            continue
+        cidr = next((item[field] for field in CIDR_FIELDS if field in item), None)
+        if cidr is None:
+            raise ValueError(f"{path}: entry without a CIDR: {item!r}")
+        name = next((item[field] for field in NAME_FIELDS if field in item), "")
+        entries.append(InventoryEntry(cidr, str(name)))
+    return entries
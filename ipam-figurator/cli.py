@@ -0,0 +1,612 @@
+"""
+Headless command-line entry point for the AWS IPAM Configurator.
+
+Reads a JSON or YAML configuration file and writes the generated
+terraform.tfvars without importing Streamlit, Plotly or pandas, so it can
+run in CI pipelines. Example:
+
+    python cli.py --config ipam-config.example.json --output terraform.tfvars
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, List, Optional, TextIO
+
+import instrumentation
+import ipam_logic
+import naming
+import plan_verifier
+import tfvars_import
+from cidr_index import load_inventory
+
+# Configuration keys and their defaults (matching the Streamlit app)
+DEFAULT_CONFIG = {
+    "top_cidr": None,
+    "regions": [],
+    "primary_region": None,
+    "business_units": [],
+    "environments": [],
+    "include_bu_level": True,
+    "include_env_level": True,
+    "region_order": None,
+    "bu_order": None,
+    "env_order": None,
+    # None picks the family default (/18 for IPv4, /56 for IPv6)
+    "environment_prefix_target": None,
+    "reserved_strategy": "Half of subnet",
+    "reserved_percentage": 25,
+    # Overrides of naming.NameTemplates fields, e.g. {"env_name": "..."}
+    "name_templates": None,
+    # With --allocation-mode buddy: prefix length requested per BU, e.g.
+    # {"Payments": 17}
+    "bu_prefix_lengths": None,
+}
+
+
+class ConfigError(ValueError):
+    """Raised when the configuration file cannot be used."""
+
+
+def load_config(path: str) -> Dict[str, Any]:
+    """
+    Load a planner configuration from a JSON or YAML file.
+
+    Args:
+        path: Path to a .json, .yaml or .yml file
+
+    Returns:
+        Configuration dictionary with defaults applied
+
+    Raises:
+        ConfigError: If the file cannot be parsed or contains unknown keys
+    """
+    with open(path, encoding="utf-8") as handle:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ConfigError(
+                    "PyYAML is required for YAML configuration files (pip install pyyaml)"
+                ) from e
+            try:
+                raw = yaml.safe_load(handle)
+            except yaml.YAMLError as e:
+                raise ConfigError(f"Invalid YAML in {path}: {e}") from e
+        else:
+            try:
+                raw = json.load(handle)
+            except json.JSONDecodeError as e:
+                raise ConfigError(f"Invalid JSON in {path}: {e}") from e
+
+    if not isinstance(raw, dict):
+        raise ConfigError(f"{path} must contain a mapping of configuration keys")
+
+    unknown = sorted(set(raw) - set(DEFAULT_CONFIG))
+    if unknown:
+        raise ConfigError(f"Unknown configuration keys: {', '.join(unknown)}")
+    if not raw.get("top_cidr"):
+        raise ConfigError("top_cidr is required")
+
+    config = dict(DEFAULT_CONFIG)
+    config.update(raw)
+    return config
+
+
+def ordered_regions(config: Dict[str, Any]) -> List[str]:
+    """Return the selected regions with the primary region first, as the app does."""
+    regions = list(config["regions"])
+    primary_region = config["primary_region"]
+    if primary_region and primary_region not in regions:
+        regions.insert(0, primary_region)
+    return regions
+
+
+def run(
+    config: Dict[str, Any],
+    output: Optional[str] = None,
+    module_output: Optional[str] = None,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    in_use: Optional[str] = None,
+    stats_output: Optional[str] = None,
+    baseline: Optional[str] = None,
+    output_format: Optional[str] = None,
+    shard_dir: Optional[str] = None,
+    shard_by: str = "region",
+    layout: str = "nested",
+    allocation_mode: str = "uniform",
+) -> None:
+    """
+    Validate the configuration, calculate allocations and emit terraform.tfvars.
+
+    Args:
+        config: Configuration dictionary as returned by load_config()
+        output: Path of the tfvars file to write (stdout if None or "-")
+        module_output: Optional path for the Terraform module notes (only
+            written for hierarchies without an environment level)
+        workers: Plan regions in this many worker processes (serial if None)
+        chunk_size: Regions per worker task when planning in parallel
+        in_use: CSV or JSON inventory of existing CIDRs the environments must
+            not overlap
+        stats_output: Optional path for per-level pool statistics as JSON
+        baseline: Optional path of the deployed terraform.tfvars; its CIDRs
+            are kept wherever they still fit, and the Terraform changes are
+            reported on stderr
+        output_format: "hcl" or "json" (terraform.tfvars.json); defaults to
+            json when the output file name ends in .json
+        shard_dir: Optional directory to write a base stack and one stack per
+            shard to, instead of a single tfvars file (see write_shards())
+        shard_by: Split the shards per "region" or per "bu" (region x BU)
+        layout: "nested" BU and environment maps, or "flat" maps keyed by the
+            Terraform module's pool ids with explicit parent keys
+        allocation_mode: "uniform" or "buddy"; in buddy mode each BU may
+            request its own block size through config["bu_prefix_lengths"]
+
+    Raises:
+        ConfigError: If the configuration fails validation
+        PlanVerificationError: If the calculated plan breaks a containment or
+            overlap invariant (nothing is written)
+    """
+    include_bu_level = config["include_bu_level"]
+    include_env_level = config["include_env_level"]
+    regions = ordered_regions(config)
+    business_units = config["business_units"] if include_bu_level else ["Default"]
+    environments = config["environments"] if include_env_level else ["Default"]
+    environment_prefix_target = config["environment_prefix_target"]
+    if environment_prefix_target is None:
+        environment_prefix_target = ipam_logic.DEFAULT_ENVIRONMENT_PREFIX_TARGETS[
+            ipam_logic.address_family(config["top_cidr"])
+        ]
+
+    is_valid, error_message = ipam_logic.validate_inputs(
+        config["top_cidr"],
+        regions,
+        business_units,
+        environments,
+        include_bu_level,
+        include_env_level,
+    )
+    if not is_valid:
+        raise ConfigError(error_message)
+
+    plan_args = (
+        config["top_cidr"],
+        regions,
+        business_units if include_bu_level else None,
+        environments if include_env_level else None,
+        include_bu_level,
+        include_env_level,
+        config["primary_region"],
+    )
+    if in_use and workers:
+        raise ConfigError("--in-use cannot be combined with --workers")
+    if baseline and (in_use or workers):
+        raise ConfigError("--baseline cannot be combined with --in-use or --workers")
+    bu_prefix_lengths = config["bu_prefix_lengths"]
+    if allocation_mode == "buddy" and (workers or baseline):
+        raise ConfigError(
+            "--allocation-mode buddy cannot be combined with --workers or --baseline"
+        )
+    try:
+        ipam_logic.check_bu_prefix_lengths(
+            allocation_mode,
+            bu_prefix_lengths,
+            business_units if include_bu_level else None,
+        )
+    except ValueError as e:
+        raise ConfigError(str(e)) from e
+    if shard_dir and output not in (None, "-"):
+        raise ConfigError("--shard-dir cannot be combined with --output")
+    if shard_dir:
+        try:
+            ipam_logic.terraform_shards(
+                {}, include_bu_level, include_env_level, shard_by
+            )
+        except ValueError as e:
+            raise ConfigError(str(e)) from e
+
+    name_templates = None
+    if config["name_templates"] is not None:
+        if not isinstance(config["name_templates"], dict):
+            raise ConfigError("name_templates must be a mapping of templates")
+        try:
+            name_templates = naming.name_templates_from_mapping(
+                config["name_templates"]
+            )
+        except ValueError as e:
+            raise ConfigError(str(e)) from e
+
+    plan_kwargs = {
+        "region_order": config["region_order"],
+        "bu_order": config["bu_order"],
+        "env_order": config["env_order"],
+        "environment_prefix_target": environment_prefix_target,
+        "reserved_strategy": config["reserved_strategy"],
+        "reserved_percentage": config["reserved_percentage"],
+    }
+
+    if workers:
+        configuration = ipam_logic.build_ipam_configuration_parallel(
+            ipam_logic.plan_key(
+                *plan_args, **plan_kwargs, name_templates=name_templates
+            ),
+            workers,
+            chunk_size,
+        )
+        cidr_allocations = configuration.cidr_allocations
+        plan_verifier.ensure_valid(cidr_allocations)
+        resource_names = configuration.resource_names
+        terraform_output = configuration.terraform_output
+
+    else:
+        if in_use:
+            try:
+                with instrumentation.span("inventory"):
+                    plan_kwargs["in_use"] = load_inventory(in_use)
+            except ValueError as e:
+                raise ConfigError(str(e)) from e
+        if baseline:
+            try:
+                with instrumentation.span("baseline"):
+                    deployed = tfvars_import.load_tfvars(baseline)
+            except ValueError as e:
+                raise ConfigError(str(e)) from e
+            result = ipam_logic.plan_around_baseline(
+                ipam_logic.plan_key(*plan_args, **plan_kwargs),
+                deployed.cidr_allocations,
+            )
+            cidr_allocations = result.plan.as_mapping()
+        else:
+            cidr_allocations = ipam_logic.calculate_cidr_allocations(
+                *plan_args,
+                **plan_kwargs,
+                allocation_mode=allocation_mode,
+                bu_prefix_lengths=bu_prefix_lengths,
+            )
+        plan_verifier.ensure_valid(cidr_allocations)
+        resource_names = ipam_logic.generate_resource_names(
+            *plan_args[:6], name_templates
+        )
+        if baseline:
+            report_baseline_changes(
+                result,
+                ipam_logic.terraform_changes(
+                    deployed.cidr_allocations,
+                    deployed.resource_names,
+                    cidr_allocations,
+                    resource_names,
+                ),
+            )
+
+    if output_format is None:
+        output_format = "json" if output and output.endswith(".json") else "hcl"
+    if output_format == "json":
+
+        def emit(stream: TextIO) -> None:
+            ipam_logic.write_terraform_json(
+                stream,
+                cidr_allocations,
+                resource_names,
+                include_bu_level,
+                include_env_level,
+                layout=layout,
+            )
+
+    elif workers and layout == "nested":
+
+        def emit(stream: TextIO) -> None:
+            stream.write(terraform_output)
+
+    else:
+
+        def emit(stream: TextIO) -> None:
+            ipam_logic.write_terraform_output(
+                stream,
+                cidr_allocations,
+                resource_names,
+                include_bu_level,
+                include_env_level,
+                layout,
+            )
+
+    if shard_dir:
+        with instrumentation.span("shards"):
+            write_shards(
+                shard_dir,
+                cidr_allocations,
+                resource_names,
+                include_bu_level,
+                include_env_level,
+                shard_by,
+                output_format,
+                layout,
+            )
+    elif output in (None, "-"):
+        emit(sys.stdout)
+        sys.stdout.write("\n")
+    else:
+        with open(output, "w", encoding="utf-8") as stream:
+            emit(stream)
+
+    if stats_output:
+        with open(stats_output, "w", encoding="utf-8") as stream:
+            json.dump(
+                {
+                    level: stats._asdict()
+                    for level, stats in ipam_logic.allocation_stats(
+                        cidr_allocations
+                    ).items()
+                },
+                stream,
+                indent=2,
+            )
+            stream.write("\n")
+
+    if module_output:
+        modifications = ipam_logic.get_modified_terraform_module(
+            include_bu_level, include_env_level
+        )
+        if modifications:
+            with open(module_output, "w", encoding="utf-8") as stream:
+                stream.write(modifications)
+
+
+def write_shards(
+    directory: str,
+    cidr_allocations: Dict[str, Any],
+    resource_names: Dict[str, Any],
+    include_bu_level: bool,
+    include_env_level: bool,
+    shard_by: str = "region",
+    output_format: str = "hcl",
+    layout: str = "nested",
+) -> List[Dict[str, Any]]:
+    """
+    Write the plan as a base stack and independent shard stacks.
+
+    The directory receives base.tfvars (for terraform/stacks/base), one
+    shards/<name>.tfvars per shard (for terraform/stacks/shard) and a
+    shards.json manifest listing them with the Terraform workspace each one
+    should use. Shard files of earlier runs that are no longer part of the
+    plan are left in place and reported on stderr, since their stacks still
+    have to be destroyed.
+
+    Args:
+        directory: Directory to write to (created if missing)
+        cidr_allocations: Mapping with calculated CIDR allocations
+        resource_names: Dictionary with resource names and descriptions
+        include_bu_level: Whether to include business unit level
+        include_env_level: Whether to include environment level
+        shard_by: One of ipam_logic.SHARD_LEVELS
+        output_format: One of ipam_logic.TFVARS_FORMATS
+        layout: One of ipam_logic.TFVARS_LAYOUTS
+
+    Returns:
+        The manifest entries of the shards
+
+    Raises:
+        ConfigError: If two shards map to the same file name
+    """
+    suffix = ".tfvars.json" if output_format == "json" else ".tfvars"
+    shard_directory = os.path.join(directory, "shards")
+    os.makedirs(shard_directory, exist_ok=True)
+
+    workspaces: Dict[str, ipam_logic.TerraformShard] = {}
+    for shard in ipam_logic.terraform_shards(
+        cidr_allocations, include_bu_level, include_env_level, shard_by
+    ):
+        # Workspace and file names may only use a few punctuation characters
+        workspace = re.sub(r"[^A-Za-z0-9_.-]+", "_", shard.name)
+        if workspace in workspaces:
+            raise ConfigError(
+                f"Shards {workspaces[workspace].name!r} and {shard.name!r} "
+                f"would both be written to {workspace}{suffix}"
+            )
+        workspaces[workspace] = shard
+
+    entries: List[Dict[str, Any]] = []
+    for workspace, shard in workspaces.items():
+        path = os.path.join("shards", workspace + suffix)
+        with open(os.path.join(directory, path), "w", encoding="utf-8") as stream:
+            stream.writelines(
+                ipam_logic.iter_terraform_shard(
+                    cidr_allocations,
+                    resource_names,
+                    shard,
+                    include_bu_level,
+                    include_env_level,
+                    output_format,
+                    layout=layout,
+                )
+            )
+        entries.append(
+            {
+                "name": shard.name,
+                "region": shard.region,
+                "bu": shard.bu,
+                "workspace": workspace,
+                "tfvars": path.replace(os.sep, "/"),
+            }
+        )
+
+    base_path = "base" + suffix
+    with open(os.path.join(directory, base_path), "w", encoding="utf-8") as stream:
+        stream.writelines(
+            ipam_logic.iter_terraform_base(
+                cidr_allocations, resource_names, output_format
+            )
+        )
+    with open(os.path.join(directory, "shards.json"), "w", encoding="utf-8") as stream:
+        json.dump(
+            {
+                "shard_by": shard_by,
+                "base": {"tfvars": base_path},
+                "shards": entries,
+            },
+            stream,
+            indent=2,
+        )
+        stream.write("\n")
+
+    current = {workspace + suffix for workspace in workspaces}
+    for name in sorted(os.listdir(shard_directory)):
+        if name.endswith((".tfvars", ".tfvars.json")) and name not in current:
+            print(
+                f"Shard {os.path.join(shard_directory, name)} is no longer part of "
+                "the plan; destroy its stack before deleting it",
+                file=sys.stderr,
+            )
+    return entries
+
+
+def report_baseline_changes(
+    result: ipam_logic.BaselinePlanResult, changes: ipam_logic.TerraformChanges
+) -> None:
+    """Print what planning around a baseline kept and changed to stderr."""
+    print(
+        f"Baseline: {len(result.kept)} pools kept, {len(result.placed)} added, "
+        f"{len(result.moved)} moved, {len(result.removed)} removed",
+        file=sys.stderr,
+    )
+    print(f"Terraform: {changes.summary()}", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point. Returns the process exit code."""
+    parser = argparse.ArgumentParser(
+        description="Generate terraform.tfvars for hierarchical AWS IPAM pools."
+    )
+    parser.add_argument(
+        "-c", "--config", required=True, help="JSON or YAML configuration file"
+    )
+    parser.add_argument(
+        "-o", "--output", default="-", help="tfvars file to write (default: stdout)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=ipam_logic.TFVARS_FORMATS,
+        help="Write terraform.tfvars (hcl) or terraform.tfvars.json (json); "
+        "defaults to json when --output ends in .json",
+    )
+    parser.add_argument(
+        "--layout",
+        choices=ipam_logic.TFVARS_LAYOUTS,
+        default="nested",
+        help="Write BU and environment pools as nested maps, or as flat maps keyed by "
+        "the module's pool ids with parent keys (faster terraform plan on large plans)",
+    )
+    parser.add_argument(
+        "--allocation-mode",
+        choices=ipam_logic.ALLOCATION_MODES,
+        default="uniform",
+        help="Give every BU in a region the same block (uniform), or allocate BUs one "
+        "by one so each can request its own size through bu_prefix_lengths and new "
+        "BUs leave existing ones in place (buddy)",
+    )
+    parser.add_argument(
+        "--shard-dir",
+        metavar="DIR",
+        help="Instead of one tfvars file, write a base stack and one stack per shard "
+        "to DIR, so Terraform can plan the shards concurrently",
+    )
+    parser.add_argument(
+        "--shard-by",
+        choices=ipam_logic.SHARD_LEVELS,
+        default="region",
+        help="With --shard-dir, shard per region or per region and BU (default: region)",
+    )
+    parser.add_argument(
+        "--module-output",
+        help="File to write notes on the Terraform module to, for hierarchies without "
+        "an environment level (the module handles every hierarchy unchanged)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Plan regions in parallel across this many processes (large plans only)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        help="Regions per worker task with --workers (default: an even split)",
+    )
+    parser.add_argument(
+        "--in-use",
+        metavar="FILE",
+        help="CSV or JSON inventory of existing CIDRs (e.g. describe-vpcs output) to plan around",
+    )
+    parser.add_argument(
+        "--baseline",
+        metavar="FILE",
+        help="Deployed terraform.tfvars whose CIDRs to keep; only new pools are placed, "
+        "and the Terraform changes are reported",
+    )
+    parser.add_argument(
+        "--stats-output",
+        metavar="FILE",
+        help="File to write per-level pool counts, sizes and reserved space to, as JSON",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="File to write the time of each stage to, as JSON lines ('-' for stderr)",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="With --profile, also record each stage's peak memory (slower)",
+    )
+    args = parser.parse_args(argv)
+
+    recorder = None
+    if args.profile:
+        recorder = instrumentation.Recorder(memory=args.profile_memory)
+    try:
+        with recorder or contextlib.nullcontext():
+            with instrumentation.span("load_config"):
+                config = load_config(args.config)
+            run(
+                config,
+                args.output,
+                args.module_output,
+                args.workers,
+                args.chunk_size,
+                args.in_use,
+                args.stats_output,
+                args.baseline,
+                args.format,
+                args.shard_dir,
+                args.shard_by,
+                args.layout,
+                args.allocation_mode,
+            )
+    except (ConfigError, OSError) as e:
+        print(f"Configuration Error: {e}", file=sys.stderr)
+        return 1
+    except ValueError as e:
+        print(f"Error generating IPAM configuration: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if recorder is not None:
+            write_profile(recorder, args.profile)
+    return 0
+
+
+def write_profile(recorder: instrumentation.Recorder, path: str) -> None:
+    """Write the recorded stages as JSON lines to a file, or stderr for "-"."""
+    if path == "-":
+        recorder.write_json_lines(sys.stderr)
+        return
+    try:
+        with open(path, "w", encoding="utf-8") as stream:
+            recorder.write_json_lines(stream)
+    except OSError as e:
+        print(f"Could not write profile {path}: {e}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
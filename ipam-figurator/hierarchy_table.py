@@ -0,0 +1,313 @@
+"""
+Columnar table of every pool in a calculated hierarchy, for filtering and
+paging through plans far larger than a browser table can show at once.
+"""
+
+import ipaddress
+import threading
+import weakref
+from array import array
+from collections import OrderedDict
+from typing import (
+    Any,
+    Dict,
+    List,
+    Mapping,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from allocation_plan import (
+    IPV4_MAX_PREFIXLEN,
+    IPV6_MAX_PREFIXLEN,
+    LEVEL_BU,
+    LEVEL_DEFAULT_BU,
+    LEVEL_ENV,
+    LEVEL_REGION,
+    LEVEL_TOP,
+    AllocationPlan,
+    format_address,
+)
+from cidr_index import parse_block
+from instrumentation import timed
+
+LEVEL_NAMES = {
+    LEVEL_TOP: "Top",
+    LEVEL_REGION: "Region",
+    LEVEL_BU: "Business Unit",
+    LEVEL_ENV: "Environment",
+}
+
+# Tables kept for the most recently displayed allocations that are not
+# backed by an AllocationPlan (e.g. an uploaded terraform.tfvars)
+TABLE_CACHE_SIZE = 4
+
+# Filter results kept per table
+FILTER_CACHE_SIZE = 8
+
+# Every Streamlit session runs its script in its own thread and shares these
+_TABLE_CACHE_LOCK = threading.Lock()
+# Tables of calculated plans live exactly as long as the plan itself, which
+# the app's plan cache holds per PlanKey
+_PLAN_TABLES: "weakref.WeakKeyDictionary[AllocationPlan, HierarchyTable]" = (
+    weakref.WeakKeyDictionary()
+)
+_TABLE_CACHE: "OrderedDict[int, Tuple[Mapping[str, Any], HierarchyTable]]" = (
+    OrderedDict()
+)
+
+
+class HierarchyTable:
+    """
+    One row per pool in depth-first order, stored as parallel columns.
+
+    Addresses, sizes and prefix lengths are integer columns (arrays for IPv4,
+    lists of Python ints for IPv6), so CIDR and address strings are only
+    formatted for the rows on the page being shown.
+    """
+
+    __slots__ = (
+        "max_prefix_len",
+        "level",
+        "path",
+        "first",
+        "last",
+        "size",
+        "prefix_len",
+        "reserved_first",
+        "reserved_prefix_len",
+        "_filters",
+        "_filters_lock",
+    )
+
+    def __init__(self, max_prefix_len: int = IPV4_MAX_PREFIXLEN):
+        self.max_prefix_len = max_prefix_len
+        self.level = array("B")
+        # Pool names joined with "/", e.g. "us-east-1/abc/prod" ("" for top)
+        self.path: List[str] = []
+        self.first: MutableSequence[int] = _int_column(max_prefix_len)
+        self.last: MutableSequence[int] = _int_column(max_prefix_len)
+        self.size: MutableSequence[int] = _int_column(max_prefix_len + 1)
+        self.prefix_len = array("B")
+        # 0 prefix length when the pool has no reserved CIDR
+        self.reserved_first: MutableSequence[int] = _int_column(max_prefix_len)
+        self.reserved_prefix_len = array("B")
+        self._filters: "OrderedDict[Tuple, Sequence[int]]" = OrderedDict()
+        # Tables are shared between sessions, which filter them concurrently
+        self._filters_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.level)
+
+    def append(
+        self,
+        level: int,
+        path: str,
+        base: int,
+        prefix_len: int,
+        reserved_base: int = 0,
+        reserved_prefix_len: int = 0,
+    ) -> None:
+        """Add a row for a pool."""
+        size = 1 << (self.max_prefix_len - prefix_len)
+        self.level.append(level)
+        self.path.append(path)
+        self.first.append(base)
+        self.last.append(base + size - 1)
+        self.size.append(size)
+        self.prefix_len.append(prefix_len)
+        self.reserved_first.append(reserved_base)
+        self.reserved_prefix_len.append(reserved_prefix_len)
+
+    @timed("table_filter")
+    def filter(
+        self, levels: Optional[Sequence[int]] = None, query: str = ""
+    ) -> Sequence[int]:
+        """
+        Return the indexes of the rows matching a filter, in table order.
+
+        Args:
+            levels: LEVEL_* codes to keep (every level if None)
+            query: An address or CIDR keeps the rows whose block overlaps it;
+                any other text keeps the rows whose path contains it
+                (case-insensitive)
+
+        Returns:
+            Row indexes; recent results are cached
+        """
+        query = query.strip()
+        key = (tuple(sorted(levels)) if levels is not None else None, query)
+        with self._filters_lock:
+            rows = self._filters.get(key)
+            if rows is not None:
+                self._filters.move_to_end(key)
+                return rows
+
+        rows = range(len(self))
+        if query:
+            rows = self._match(query)
+        if levels is not None and set(levels) != set(LEVEL_NAMES):
+            wanted = set(levels)
+            level = self.level
+            rows = [row for row in rows if level[row] in wanted]
+
+        with self._filters_lock:
+            self._filters[key] = rows
+            if len(self._filters) > FILTER_CACHE_SIZE:
+                self._filters.popitem(last=False)
+        return rows
+
+    def _match(self, query: str) -> List[int]:
+        try:
+            width, start, prefix_len = parse_block(query)
+        except ValueError:
+            needle = query.casefold()
+            return [
+                row for row, path in enumerate(self.path) if needle in path.casefold()
+            ]
+        if width != self.max_prefix_len:
+            return []
+        end = start + (1 << (width - prefix_len)) - 1
+        first, last = self.first, self.last
+        return [
+            row for row in range(len(self)) if first[row] <= end and last[row] >= start
+        ]
+
+    def cidr(self, row: int) -> str:
+        """Return the CIDR string of a row."""
+        return f"{self.address(self.first[row])}/{self.prefix_len[row]}"
+
+    def reserved_cidr(self, row: int) -> str:
+        """Return the reserved CIDR string of a row, or "" if it has none."""
+        if not self.reserved_prefix_len[row]:
+            return ""
+        return (
+            f"{self.address(self.reserved_first[row])}/{self.reserved_prefix_len[row]}"
+        )
+
+    def address(self, address: int) -> str:
+        """Format an integer address of the table's family."""
+        if self.max_prefix_len == IPV6_MAX_PREFIXLEN:
+            return str(ipaddress.IPv6Address(address))
+        return format_address(address)
+
+
+@timed("table_index")
+def hierarchy_table(cidr_allocations: Mapping[str, Any]) -> HierarchyTable:
+    """
+    Build (or reuse) the table of an allocations mapping.
+
+    Tables of plan-backed mappings are kept for as long as their
+    AllocationPlan exists; other mappings keep their table among the
+    TABLE_CACHE_SIZE most recent, by identity. Either way reruns that display
+    the same plan reuse its table and filter results. Safe to call from
+    several threads.
+
+    Args:
+        cidr_allocations: Allocations mapping shaped like the tfvars output
+
+    Returns:
+        HierarchyTable
+    """
+    plan = getattr(cidr_allocations, "plan", None)
+    if isinstance(plan, AllocationPlan):
+        with _TABLE_CACHE_LOCK:
+            table = _PLAN_TABLES.get(plan)
+        if table is None:
+            # Built outside the lock; concurrent builds of one plan are
+            # identical, and the first one stored wins
+            table = _plan_table(plan)
+            with _TABLE_CACHE_LOCK:
+                table = _PLAN_TABLES.setdefault(plan, table)
+        return table
+
+    key = id(cidr_allocations)
+    with _TABLE_CACHE_LOCK:
+        cached = _TABLE_CACHE.get(key)
+        if cached is not None and cached[0] is cidr_allocations:
+            _TABLE_CACHE.move_to_end(key)
+            return cached[1]
+
+    table = _mapping_table(cidr_allocations)
+    with _TABLE_CACHE_LOCK:
+        _TABLE_CACHE[key] = (cidr_allocations, table)
+        _TABLE_CACHE.move_to_end(key)
+        while len(_TABLE_CACHE) > TABLE_CACHE_SIZE:
+            _TABLE_CACHE.popitem(last=False)
+    return table
+
+
+def _plan_table(plan: AllocationPlan) -> HierarchyTable:
+    """Build a table straight from a plan's integer columns in one pass."""
+    table = HierarchyTable(plan.max_prefix_len)
+    base, prefix_len, parent, level = (
+        plan.base,
+        plan.prefix_len,
+        plan.parent,
+        plan.level,
+    )
+    reserved_base, reserved_prefix_len = plan.reserved_base, plan.reserved_prefix_len
+    paths = [""] * len(plan)
+    for index in range(len(plan)):
+        pool_level = level[index]
+        if index:
+            parent_path = paths[parent[index]]
+            # Placeholder BUs are not listed; their environments sit under
+            # the region
+            if pool_level == LEVEL_DEFAULT_BU:
+                paths[index] = parent_path
+                continue
+            name = plan.name(index)
+            paths[index] = f"{parent_path}/{name}" if parent_path else name
+        table.append(
+            pool_level,
+            paths[index],
+            base[index],
+            prefix_len[index],
+            reserved_base[index],
+            reserved_prefix_len[index] if pool_level == LEVEL_ENV else 0,
+        )
+    return table
+
+
+def _mapping_table(cidr_allocations: Mapping[str, Any]) -> HierarchyTable:
+    """Build a table from a plain allocations mapping, parsing each CIDR once."""
+    max_prefix_len, top_base, top_prefix_len = parse_block(
+        cidr_allocations["top_cidr"][0]
+    )
+    table = HierarchyTable(max_prefix_len)
+    table.append(LEVEL_TOP, "", top_base, top_prefix_len)
+
+    def add(level: int, path: str, pool: Dict[str, Any]) -> None:
+        _, base, prefix_len = parse_block(pool["cidr"][0])
+        reserved_base = reserved_prefix_len = 0
+        if pool.get("reserved_cidr"):
+            _, reserved_base, reserved_prefix_len = parse_block(pool["reserved_cidr"])
+        table.append(level, path, base, prefix_len, reserved_base, reserved_prefix_len)
+
+    bu_cidrs = cidr_allocations.get("bu_cidrs") or {}
+    env_cidrs = cidr_allocations.get("env_cidrs") or {}
+    for region, regional in (cidr_allocations.get("regional_cidrs") or {}).items():
+        add(LEVEL_REGION, region, regional)
+        env_groups = env_cidrs.get(region, {})
+        if bu_cidrs:
+            for bu, bu_pool in bu_cidrs.get(region, {}).items():
+                add(LEVEL_BU, f"{region}/{bu}", bu_pool)
+                for env, env_pool in env_groups.get(bu, {}).items():
+                    add(LEVEL_ENV, f"{region}/{bu}/{env}", env_pool)
+        else:
+            for envs in env_groups.values():
+                for env, env_pool in envs.items():
+                    add(LEVEL_ENV, f"{region}/{env}", env_pool)
+    return table
+
+
+def _int_column(bits: int) -> MutableSequence[int]:
+    """Return an empty column for unsigned integers of up to bits bits."""
+    if bits <= IPV4_MAX_PREFIXLEN:
+        return array("L" if array("I").itemsize < 4 else "I")
+    if bits <= 64:
+        return array("Q")
+    return []
@@ -0,0 +1,290 @@
+"""
+Level-of-detail node lists for drawing a CIDR hierarchy as a Sunburst chart.
+
+Very large plans have far more pools than a browser can draw, so the chart
+shows one focused subtree at a time, level by level, until a node budget is
+spent; the remaining children of a pool are folded into a single "N more"
+node. Nodes are identified by compact numeric ids rather than by repeating
+their labels as parent keys. Only the pools that end up in the chart (plus
+the sizes of the folded ones) are read; AllocationPlan-backed allocations
+are walked through their integer columns without formatting CIDR strings.
+"""
+
+from typing import Any, List, Mapping, NamedTuple, Sequence, Tuple, Union
+
+from allocation_plan import LEVEL_DEFAULT_BU, AllocationPlan
+from instrumentation import timed
+
+# Nodes drawn by default, root and "N more" nodes included
+DEFAULT_NODE_BUDGET = 2000
+
+# (pool path, CIDR list) of a pool of a plain allocations mapping
+_MappingPool = Tuple[Tuple[str, ...], Sequence[str]]
+
+
+class SunburstNodes(NamedTuple):
+    """
+    Parallel node columns of a Sunburst chart.
+
+    Attributes:
+        ids: Compact node ids ("0" is the focused pool)
+        parents: Parent node id of each node ("" for the focused pool)
+        labels: Pool name, or "N more" for folded children
+        values: Number of addresses
+        cidrs: First CIDR of the pool ("" for folded children)
+        paths: Pool path of each node; folded children carry their parent's path
+        offsets: Index of the first folded child for "N more" nodes, else -1
+        total_pools: Pools below the focused pool, drawn or not
+        folded_pools: Pools below the focused pool that are not drawn
+            (folded into "N more" nodes, paged past or deeper than the
+            budget reaches)
+    """
+
+    ids: List[str]
+    parents: List[str]
+    labels: List[str]
+    values: List[int]
+    cidrs: List[str]
+    paths: List[Tuple[str, ...]]
+    offsets: List[int]
+    total_pools: int
+    folded_pools: int
+
+
+@timed("sunburst_nodes")
+def sunburst_nodes(
+    cidr_allocations: Mapping[str, Any],
+    focus: Tuple[str, ...] = (),
+    offset: int = 0,
+    node_budget: int = DEFAULT_NODE_BUDGET,
+) -> SunburstNodes:
+    """
+    Build the nodes of a Sunburst chart of one subtree within a node budget.
+
+    The subtree is expanded breadth first. A level whose pools all fit in
+    what is left of the budget is drawn in full; otherwise the budget is
+    shared evenly between the parents and each parent shows its first
+    children followed by one "N more" node, and deeper levels are only
+    drawn while budget remains.
+
+    Args:
+        cidr_allocations: Allocations mapping shaped like the tfvars output
+        focus: Path of the pool at the centre: () for the top-level pool,
+            (region,) or (region, bu)
+        offset: Skip this many of the focused pool's children (to page
+            through the pools behind an "N more" node)
+        node_budget: Maximum number of nodes; 0 draws every pool
+
+    Returns:
+        SunburstNodes
+
+    Raises:
+        KeyError: If the focused pool does not exist
+    """
+    tree = _tree(cidr_allocations)
+    root = tree.pool(focus)
+    nodes = SunburstNodes(
+        ids=["0"],
+        parents=[""],
+        labels=[focus[-1] if focus else "Top"],
+        values=[tree.size(root)],
+        cidrs=[tree.cidr(root)],
+        paths=[focus],
+        offsets=[-1],
+        total_pools=tree.count(root),
+        folded_pools=0,
+    )
+    drawn = 0
+    remaining = node_budget - 1 if node_budget else None
+
+    # (node index, pool path, children still to draw, children skipped) of
+    # the pools drawn last
+    frontier = [(0, focus, tree.children(root)[offset:], offset)]
+    frontier = [entry for entry in frontier if entry[2]]
+    while frontier and (remaining is None or remaining > 0):
+        total = sum(len(children) for _, _, children, _ in frontier)
+        cap = None
+        if remaining is not None and total > remaining:
+            cap = remaining // len(frontier)
+            if cap < 1:
+                break
+
+        next_frontier = []
+        for parent_node, parent_path, children, skipped in frontier:
+            shown = children
+            if cap is not None and len(children) > cap:
+                shown = children[: cap - 1]
+            for name, pool in shown:
+                path = parent_path + (name,)
+                node = _add_node(
+                    nodes, parent_node, name, tree.size(pool), tree.cidr(pool), path
+                )
+                grandchildren = tree.children(pool)
+                if grandchildren:
+                    next_frontier.append((node, path, grandchildren, 0))
+            if len(shown) < len(children):
+                hidden = children[len(shown) :]
+                _add_node(
+                    nodes,
+                    parent_node,
+                    f"{len(hidden):,} more",
+                    sum(tree.size(pool) for _, pool in hidden),
+                    "",
+                    parent_path,
+                    skipped + len(shown),
+                )
+            drawn += len(shown)
+            if remaining is not None:
+                remaining -= len(shown) + (len(shown) < len(children))
+        frontier = next_frontier
+
+    return nodes._replace(folded_pools=nodes.total_pools - drawn)
+
+
+def count_pools(cidr_allocations: Mapping[str, Any], path: Tuple[str, ...] = ()) -> int:
+    """
+    Count the pools below a pool.
+
+    Args:
+        cidr_allocations: Allocations mapping shaped like the tfvars output
+        path: Pool path: () for the top-level pool, (region,) or (region, bu)
+
+    Returns:
+        Number of descendant pools (0 for a pool that cannot be drawn as a
+        parent, such as an environment)
+    """
+    tree = _tree(cidr_allocations)
+    try:
+        return tree.count(tree.pool(path))
+    except KeyError:
+        return 0
+
+
+def _add_node(
+    nodes: SunburstNodes,
+    parent: int,
+    label: str,
+    value: int,
+    cidr: str,
+    path: Tuple[str, ...],
+    offset: int = -1,
+) -> int:
+    """Append a node and return its index."""
+    index = len(nodes.ids)
+    nodes.ids.append(str(index))
+    nodes.parents.append(str(parent))
+    nodes.labels.append(label)
+    nodes.values.append(value)
+    nodes.cidrs.append(cidr)
+    nodes.paths.append(path)
+    nodes.offsets.append(offset)
+    return index
+
+
+def _tree(cidr_allocations: Mapping[str, Any]) -> Union["_PlanTree", "_MappingTree"]:
+    plan = getattr(cidr_allocations, "plan", None)
+    if isinstance(plan, AllocationPlan):
+        return _PlanTree(plan)
+    return _MappingTree(cidr_allocations)
+
+
+class _PlanTree:
+    """Pools of an AllocationPlan, read from its integer columns by index."""
+
+    __slots__ = ("plan",)
+
+    def __init__(self, plan: AllocationPlan):
+        self.plan = plan
+
+    def pool(self, path: Tuple[str, ...]) -> int:
+        index = 0
+        for depth, name in enumerate(path):
+            # Environments are leaves, and only regions and BUs can be focused
+            if depth > 1:
+                raise KeyError(path)
+            matches = [
+                child
+                for child_name, child in self.children(index)
+                if child_name == name
+            ]
+            if not matches or not self.children(matches[0]):
+                raise KeyError(path)
+            index = matches[0]
+        return index
+
+    def children(self, index: int) -> List[Tuple[str, int]]:
+        plan = self.plan
+        children = []
+        for child in plan.children(index):
+            # Placeholder BUs are skipped; their environments belong to the region
+            if plan.level[child] == LEVEL_DEFAULT_BU:
+                children.extend((plan.name(env), env) for env in plan.children(child))
+            else:
+                children.append((plan.name(child), child))
+        return children
+
+    def size(self, index: int) -> int:
+        plan = self.plan
+        return 1 << (plan.max_prefix_len - plan.prefix_len[index])
+
+    def cidr(self, index: int) -> str:
+        return self.plan.cidr(index)
+
+    def count(self, index: int) -> int:
+        plan = self.plan
+        end = index + plan.subtree_size[index]
+        return end - index - 1 - plan.level[index + 1 : end].count(LEVEL_DEFAULT_BU)
+
+
+class _MappingTree:
+    """Pools of an allocations mapping; a pool is its (path, CIDR list)."""
+
+    __slots__ = ("cidr_allocations", "width")
+
+    def __init__(self, cidr_allocations: Mapping[str, Any]):
+        self.cidr_allocations = cidr_allocations
+        self.width = 128 if ":" in cidr_allocations["top_cidr"][0] else 32
+
+    def pool(self, path: Tuple[str, ...]) -> _MappingPool:
+        cidr_allocations = self.cidr_allocations
+        if not path:
+            return (), cidr_allocations["top_cidr"]
+        if len(path) == 1:
+            return path, cidr_allocations["regional_cidrs"][path[0]]["cidr"]
+        if len(path) == 2 and cidr_allocations.get("bu_cidrs"):
+            return path, cidr_allocations["bu_cidrs"][path[0]][path[1]]["cidr"]
+        raise KeyError(path)
+
+    def children(self, pool: _MappingPool) -> List[Tuple[str, _MappingPool]]:
+        cidr_allocations = self.cidr_allocations
+        path = pool[0]
+        bu_cidrs = cidr_allocations.get("bu_cidrs")
+        env_cidrs = cidr_allocations.get("env_cidrs")
+        if not path:
+            groups = [cidr_allocations.get("regional_cidrs") or {}]
+        elif len(path) == 1 and bu_cidrs:
+            groups = [bu_cidrs.get(path[0], {})]
+        elif len(path) == 1 and env_cidrs:
+            # Without a BU level, environments sit under a placeholder BU and
+            # belong to the region
+            groups = list(env_cidrs.get(path[0], {}).values())
+        elif len(path) == 2 and bu_cidrs and env_cidrs:
+            groups = [env_cidrs.get(path[0], {}).get(path[1], {})]
+        else:
+            return []
+        return [
+            (name, (path + (name,), entry["cidr"]))
+            for group in groups
+            for name, entry in group.items()
+        ]
+
+    def size(self, pool: _MappingPool) -> int:
+        # Sizes come from the prefix lengths, without parsing addresses
+        return sum(1 << (self.width - int(cidr.rpartition("/")[2])) for cidr in pool[1])
+
+    def cidr(self, pool: _MappingPool) -> str:
+        return pool[1][0] if pool[1] else ""
+
+    def count(self, pool: _MappingPool) -> int:
+        children = self.children(pool)
+        return len(children) + sum(self.count(child) for _, child in children)
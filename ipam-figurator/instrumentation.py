@@ -0,0 +1,234 @@
+"""
+Lightweight timing (and optional peak memory) of the planning stages.
+
+Stages are marked with span() blocks or the timed() decorator. They are only
+measured inside an active Recorder; otherwise a span costs one context
+variable lookup, so the instrumentation can stay in place permanently:
+
+    with Recorder(memory=True) as recorder:
+        configuration = ipam_logic.build_ipam_configuration(key)
+    for span in recorder.spans:
+        print(span.name, span.seconds)
+
+Recorders are bound to the current thread (each Streamlit session runs its
+script in its own thread), and stages that run in worker processes are not
+recorded.
+"""
+
+import contextlib
+import functools
+import json
+import time
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    TextIO,
+)
+
+
+class Span(NamedTuple):
+    """
+    One measured stage.
+
+    Attributes:
+        name: Stage name, e.g. "allocation"
+        depth: Nesting depth (0 for stages not inside another recorded stage)
+        parent: Name of the enclosing stage ("" at depth 0)
+        seconds: Wall-clock duration
+        peak_bytes: Peak of the memory traced while the stage ran, above what
+            was allocated when it started (None unless memory is recorded)
+    """
+
+    name: str
+    depth: int
+    parent: str
+    seconds: float
+    peak_bytes: Optional[int] = None
+
+
+class _Frame:
+    """Bookkeeping of a stage that is still running."""
+
+    __slots__ = ("name", "index", "start", "start_memory", "peak_memory")
+
+    def __init__(self, name: str, index: int):
+        self.name = name
+        # Position of the span in Recorder.spans, filled in on exit so spans
+        # are listed in the order their stages started
+        self.index = index
+        self.start = 0.0
+        self.start_memory = 0
+        self.peak_memory = 0
+
+
+_RECORDER: ContextVar[Optional["Recorder"]] = ContextVar("recorder", default=None)
+
+
+class Recorder:
+    """
+    Collect the spans of the stages run while it is active.
+
+    Use as a context manager; recorders can be nested, in which case the
+    innermost one receives the spans.
+    """
+
+    def __init__(self, memory: bool = False):
+        """
+        Args:
+            memory: Also record each stage's peak memory with tracemalloc
+                (slows allocation-heavy stages down noticeably)
+        """
+        self.memory = memory
+        self.spans: List[Span] = []
+        self._stack: List[_Frame] = []
+        self._token = None
+        self._started_tracing = False
+
+    def __enter__(self) -> "Recorder":
+        if self.memory:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+        self._token = _RECORDER.set(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        _RECORDER.reset(self._token)
+        self._token = None
+        if self._started_tracing:
+            import tracemalloc
+
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def total_seconds(self) -> float:
+        """Return the time spent in top-level stages."""
+        return sum(span.seconds for span in self.spans if span.depth == 0)
+
+    def as_dicts(self) -> List[Dict[str, Any]]:
+        """Return the spans as JSON-serializable dictionaries."""
+        return [
+            {
+                "stage": span.name,
+                "depth": span.depth,
+                "parent": span.parent,
+                "seconds": round(span.seconds, 6),
+                "peak_bytes": span.peak_bytes,
+            }
+            for span in self.spans
+        ]
+
+    def write_json_lines(self, stream: TextIO) -> None:
+        """Write one JSON object per span."""
+        for span in self.as_dicts():
+            stream.write(json.dumps(span))
+            stream.write("\n")
+
+    def _enter(self, name: str) -> _Frame:
+        frame = _Frame(name, len(self.spans))
+        # Reserve the slot so nested stages are listed after their parent
+        self.spans.append(None)
+        if self.memory:
+            import tracemalloc
+
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                parent = self._stack[-1]
+                parent.peak_memory = max(parent.peak_memory, peak)
+            tracemalloc.reset_peak()
+            frame.start_memory = frame.peak_memory = current
+        self._stack.append(frame)
+        frame.start = time.perf_counter()
+        return frame
+
+    def _exit(self, frame: _Frame) -> None:
+        seconds = time.perf_counter() - frame.start
+        self._stack.pop()
+        peak_bytes = None
+        if self.memory:
+            import tracemalloc
+
+            frame.peak_memory = max(
+                frame.peak_memory, tracemalloc.get_traced_memory()[1]
+            )
+            peak_bytes = frame.peak_memory - frame.start_memory
+            if self._stack:
+                parent = self._stack[-1]
+                parent.peak_memory = max(parent.peak_memory, frame.peak_memory)
+        self.spans[frame.index] = Span(
+            frame.name,
+            len(self._stack),
+            self._stack[-1].name if self._stack else "",
+            seconds,
+            peak_bytes,
+        )
+
+
+def span(name: str) -> ContextManager[None]:
+    """
+    Return a context manager measuring one stage in the active Recorder, if any.
+
+    Example:
+        with span("hierarchy_table"):
+            table = hierarchy_table.hierarchy_table(cidr_allocations)
+    """
+    recorder = _RECORDER.get()
+    if recorder is None:
+        return _IDLE_SPAN
+    return _SpanContext(recorder, name)
+
+
+class _SpanContext:
+    __slots__ = ("recorder", "name", "_frame")
+
+    def __init__(self, recorder: Recorder, name: str):
+        self.recorder = recorder
+        self.name = name
+        self._frame = None
+
+    def __enter__(self) -> None:
+        self._frame = self.recorder._enter(self.name)
+
+    def __exit__(self, *exc_info) -> None:
+        self.recorder._exit(self._frame)
+
+
+# Shared by every span() opened while nothing is recording
+_IDLE_SPAN = contextlib.nullcontext()
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator measuring every call of a function as a stage.
+
+    Args:
+        name: Stage name
+
+    Returns:
+        Decorator; the wrapped function keeps its name, docstring and
+        signature, and can still be pickled by reference
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _RECORDER.get()
+            if recorder is None:
+                return func(*args, **kwargs)
+            frame = recorder._enter(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                recorder._exit(frame)
+
+        return wrapper
+
+    return decorator
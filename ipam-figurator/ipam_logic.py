@@ -1,8 +1,77 @@
 import ipaddress
-from typing import Dict, List, Any, Tuple, Optional, Set
-from utils import get_region_display_name
+import itertools
+import json
+import os
+from functools import lru_cache
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Any,
+    Mapping,
+    NamedTuple,
+    Tuple,
+    Optional,
+    Sequence,
+    Set,
+    TextIO,
+    Union,
+)
+from allocation_plan import (
+    LEVEL_BU,
+    LEVEL_DEFAULT_BU,
+    LEVEL_ENV,
+    LEVEL_REGION,
+    LEVEL_TOP,
+    IPV4_MAX_PREFIXLEN,
+    IPV6_MAX_PREFIXLEN,
+    LEVEL_KEYS,
+    AllocationPlan,
+    LevelStats,
+    format_cidr,
+    format_ipv6_cidr,
+)
+from buddy_allocator import BuddyAllocator
+from cidr_index import CidrIndex, InventoryEntry, parse_block
+from instrumentation import timed
+import naming
+from naming import DEFAULT_NAME_TEMPLATES, NameTemplates
+
+# Smallest environment CIDR validate_inputs plans for, per address family
+DEFAULT_ENVIRONMENT_PREFIX_TARGETS = {"ipv4": 18, "ipv6": 56}
+
+# How sibling business units share a regional pool: "uniform" gives every BU
+# the same power-of-two block, "buddy" allocates per-BU sizes with a
+# BuddyAllocator
+ALLOCATION_MODES = ("uniform", "buddy")
+
+
+def parse_network(cidr: str) -> Union[ipaddress.IPv4Network, ipaddress.IPv6Network]:
+    """
+    Parse an IPv4 or IPv6 CIDR block.
+
+    Args:
+        cidr: CIDR string such as "10.0.0.0/8" or "fd00:1::/48"
+
+    Returns:
+        IPv4Network or IPv6Network
+
+    Raises:
+        ValueError: If the string is not a valid CIDR block
+    """
+    if ":" in cidr:
+        return ipaddress.IPv6Network(cidr)
+    return ipaddress.IPv4Network(cidr)
+
 
+def address_family(cidr: str) -> str:
+    """Return the Terraform address_family ("ipv4" or "ipv6") of a CIDR string."""
+    return "ipv6" if ":" in cidr else "ipv4"
 
+
+@timed("validation")
 def validate_inputs(
     top_cidr: str,
     regions: List[str],
@@ -27,14 +96,24 @@ def validate_inputs(
     """
     try:
         # Validate CIDR format
-        network = ipaddress.IPv4Network(top_cidr)
+        network = parse_network(top_cidr)
 
-        # Check if CIDR is private
-        if not network.is_private:
+        # Check if CIDR is private (IPv4) or unicast (IPv6)
+        if network.version == 4 and not network.is_private:
             return (
                 False,
                 f"Top CIDR {top_cidr} should be in private IP space (10.0.0.0/8, 172.16.0.0/12, or 192.168.0.0/16)",
             )
+        if network.version == 6 and (
+            network.is_multicast
+            or network.is_link_local
+            or network.is_loopback
+            or network.is_unspecified
+        ):
+            return (
+                False,
+                f"Top CIDR {top_cidr} should be a unique local (fd00::/8) or global unicast IPv6 range",
+            )
 
         # Make sure we have at least one region
         if not regions:
@@ -58,8 +137,8 @@ def validate_inputs(
 
         required_prefix = min_prefix + region_bits + bu_bits + env_bits
 
-        # We'll target /18 as the smallest environment CIDR
-        target_prefix = 18
+        # We'll target /18 (IPv4) or /56 (IPv6) as the smallest environment CIDR
+        target_prefix = DEFAULT_ENVIRONMENT_PREFIX_TARGETS[address_family(top_cidr)]
         if required_prefix > target_prefix:
             return (
                 False,
@@ -86,7 +165,11 @@ def calculate_cidr_allocations(
     environment_prefix_target: int = 18,
     reserved_strategy: str = "Half of subnet",
     reserved_percentage: Optional[int] = None,
-) -> Dict[str, Any]:
+    vectorized: bool = False,
+    allocation_mode: str = "uniform",
+    bu_prefix_lengths: Optional[Mapping[str, int]] = None,
+    in_use: Optional[CidrIndex] = None,
+) -> Mapping[str, Any]:
     """
     Calculate CIDR allocations for the entire IPAM hierarchy with flexible levels.
 
@@ -104,9 +187,487 @@ def calculate_cidr_allocations(
         environment_prefix_target: Target prefix length for environment CIDRs
         reserved_strategy: Strategy for calculating reserved CIDRs ("Half of subnet" or "Custom percentage")
         reserved_percentage: If reserved_strategy is "Custom percentage", the percentage to reserve
+        vectorized: Compute all pools with NumPy array arithmetic in one pass
+            (faster for large hierarchies, identical results)
+        allocation_mode: "uniform" (every BU in a region gets the same block)
+            or "buddy" (BUs are allocated one by one from a BuddyAllocator,
+            so each can request its own size)
+        bu_prefix_lengths: In "buddy" mode, prefix length requested per BU
+            name; other BUs get a block that holds their environments at
+            environment_prefix_target (or that size itself without an
+            environment level), so adding BUs leaves existing ones in place
+        in_use: Existing CIDR blocks to stay clear of; the leaf pools
+            (environments, or the lowest included level) skip every block
+            that overlaps one. Environments then get blocks of exactly
+            environment_prefix_target, so the rest of their parent leaves
+            room to skip
+
+    Returns:
+        Read-only mapping with all CIDR allocations, shaped like
+        {"top_cidr": [...], "regional_cidrs": {...}, "bu_cidrs": {...}, "env_cidrs": {...}}
+    """
+    return build_allocation_plan(
+        top_cidr,
+        regions,
+        bus,
+        envs,
+        include_bu_level,
+        include_env_level,
+        primary_region,
+        region_order,
+        bu_order,
+        env_order,
+        environment_prefix_target,
+        reserved_strategy,
+        reserved_percentage,
+        vectorized,
+        allocation_mode,
+        bu_prefix_lengths,
+        in_use,
+    ).as_mapping()
+
+
+@timed("allocation")
+def build_allocation_plan(
+    top_cidr: str,
+    regions: List[str],
+    bus: List[str] = None,
+    envs: List[str] = None,
+    include_bu_level: bool = True,
+    include_env_level: bool = True,
+    primary_region: Optional[str] = None,
+    region_order: Optional[List[str]] = None,
+    bu_order: Optional[List[str]] = None,
+    env_order: Optional[List[str]] = None,
+    environment_prefix_target: int = 18,
+    reserved_strategy: str = "Half of subnet",
+    reserved_percentage: Optional[int] = None,
+    vectorized: bool = False,
+    allocation_mode: str = "uniform",
+    bu_prefix_lengths: Optional[Mapping[str, int]] = None,
+    in_use: Optional[CidrIndex] = None,
+) -> AllocationPlan:
+    """
+    Calculate the compact allocation plan behind calculate_cidr_allocations.
+
+    Args:
+        top_cidr: The top-level CIDR block
+        regions: List of AWS regions
+        bus: List of business unit names (can be None if include_bu_level is False)
+        envs: List of environment names (can be None if include_env_level is False)
+        include_bu_level: Whether to include business unit level
+        include_env_level: Whether to include environment level
+        primary_region: The primary region for IPAM (defaults to first region)
+        region_order: The order of regions for CIDR allocation
+        bu_order: The order of business units for CIDR allocation
+        env_order: The order of environments for CIDR allocation
+        environment_prefix_target: Target prefix length for environment CIDRs
+        reserved_strategy: Strategy for calculating reserved CIDRs ("Half of subnet" or "Custom percentage")
+        reserved_percentage: If reserved_strategy is "Custom percentage", the percentage to reserve
+        vectorized: Compute all pools with NumPy array arithmetic in one pass
+            (faster for large hierarchies, identical results)
+        allocation_mode: "uniform" (every BU in a region gets the same block)
+            or "buddy" (BUs are allocated one by one from a BuddyAllocator,
+            so each can request its own size)
+        bu_prefix_lengths: In "buddy" mode, prefix length requested per BU
+            name; other BUs get a block that holds their environments at
+            environment_prefix_target (or that size itself without an
+            environment level), so adding BUs leaves existing ones in place
+        in_use: Existing CIDR blocks to stay clear of; the leaf pools
+            (environments, or the lowest included level) skip every block
+            that overlaps one. Environments then get blocks of exactly
+            environment_prefix_target, so the rest of their parent leaves
+            room to skip
+
+    Returns:
+        AllocationPlan with all CIDR allocations
+
+    Raises:
+        ValueError: If the hierarchy does not fit the top-level CIDR, a BU's
+            block cannot hold its environments, or the allocation mode or
+            bu_prefix_lengths are invalid (see check_bu_prefix_lengths())
+    """
+    regions, bus, envs = _resolve_order(
+        regions,
+        bus,
+        envs,
+        include_bu_level,
+        include_env_level,
+        primary_region,
+        region_order,
+        bu_order,
+        env_order,
+    )
+    check_bu_prefix_lengths(
+        allocation_mode, bu_prefix_lengths, bus if include_bu_level else None
+    )
+
+    # Parse the top-level CIDR
+    top_network = parse_network(top_cidr)
+    top_base = int(top_network.network_address)
+    top_prefix_len = top_network.prefixlen
+
+    plan = AllocationPlan(
+        top_cidr, include_bu_level, include_env_level, address_family(top_cidr)
+    )
+    top_pool = plan.add_pool(-1, LEVEL_TOP, top_cidr, top_base, top_prefix_len)
+    plan.unique_names = (
+        len(set(regions)) == len(regions)
+        and len(set(bus or ())) == len(bus or ())
+        and len(set(envs or ())) == len(envs or ())
+    )
+
+    # The vectorized pass relies on every BU having the same size and every
+    # pool sitting at its index
+    if vectorized and allocation_mode == "uniform" and in_use is None:
+        key = PlanKey(
+            top_cidr,
+            tuple(regions),
+            tuple(bus or ()) if include_bu_level else (),
+            tuple(envs or ()) if include_env_level else (),
+            include_bu_level,
+            include_env_level,
+            environment_prefix_target,
+            reserved_strategy,
+            reserved_percentage,
+        )
+        if _allocate_vectorized(plan, key, top_base, top_prefix_len):
+            plan.close_pool(top_pool)
+            return plan
+        # IPv6, or the hierarchy does not fit (the scalar pass raises the
+        # precise error)
+
+    _allocate_regions(
+        plan,
+        top_pool,
+        top_base,
+        top_prefix_len,
+        regions,
+        bus,
+        envs,
+        include_bu_level,
+        include_env_level,
+        environment_prefix_target,
+        reserved_strategy,
+        reserved_percentage,
+        bu_prefix_lengths=(
+            bu_prefix_lengths or {} if allocation_mode == "buddy" else None
+        ),
+        in_use=in_use,
+    )
+
+    plan.close_pool(top_pool)
+    return plan
+
+
+def check_bu_prefix_lengths(
+    allocation_mode: str,
+    bu_prefix_lengths: Optional[Mapping[str, int]],
+    bus: Optional[List[str]],
+) -> None:
+    """
+    Check an allocation mode and the per-BU block sizes requested with it.
+
+    Args:
+        allocation_mode: One of ALLOCATION_MODES
+        bu_prefix_lengths: Prefix length requested per BU name, or None
+        bus: Business units of the plan (None without a BU level)
+
+    Raises:
+        ValueError: If the mode is unknown, sizes are requested outside
+            "buddy" mode, or a size is not an integer or names an unknown BU
+    """
+    if allocation_mode not in ALLOCATION_MODES:
+        raise ValueError(f"Unknown allocation mode: {allocation_mode}")
+    if not bu_prefix_lengths:
+        return
+    if allocation_mode != "buddy":
+        raise ValueError('bu_prefix_lengths requires allocation_mode "buddy"')
+    if not isinstance(bu_prefix_lengths, Mapping):
+        raise ValueError(
+            "bu_prefix_lengths must be a mapping of BU names to prefix lengths"
+        )
+    unknown = sorted(set(bu_prefix_lengths) - set(bus or ()))
+    if unknown:
+        raise ValueError(f"bu_prefix_lengths names unknown BUs: {', '.join(unknown)}")
+    for bu, prefix_len in bu_prefix_lengths.items():
+        if isinstance(prefix_len, bool) or not isinstance(prefix_len, int):
+            raise ValueError(
+                f"bu_prefix_lengths[{bu!r}] must be an integer prefix length"
+            )
+
+
+def _allocate_regions(
+    plan: AllocationPlan,
+    top_pool: int,
+    top_base: int,
+    top_prefix_len: int,
+    regions: List[str],
+    bus: Optional[List[str]],
+    envs: Optional[List[str]],
+    include_bu_level: bool,
+    include_env_level: bool,
+    environment_prefix_target: int,
+    reserved_strategy: str,
+    reserved_percentage: Optional[int],
+    start: int = 0,
+    stop: Optional[int] = None,
+    bu_prefix_lengths: Optional[Mapping[str, int]] = None,
+    in_use: Optional[CidrIndex] = None,
+) -> None:
+    """
+    Allocate the subtrees of regions[start:stop] below the top-level pool.
+
+    Each region's position, and therefore its CIDR, only depends on its index
+    in the full region list, so any slice can be allocated on its own.
+
+    Args:
+        plan: Allocation plan holding the top-level pool
+        top_pool: Index of the top-level pool in the plan
+        top_base: Integer network address of the top-level CIDR
+        top_prefix_len: Prefix length of the top-level CIDR
+        regions: Complete ordered list of regions
+        bus: Ordered list of business units
+        envs: Ordered list of environments
+        include_bu_level: Whether to include business unit level
+        include_env_level: Whether to include environment level
+        environment_prefix_target: Target prefix length for environment CIDRs
+        reserved_strategy: Strategy for calculating reserved CIDRs
+        reserved_percentage: Percentage to reserve for "Custom percentage"
+        start: Index of the first region to allocate
+        stop: Index after the last region to allocate (defaults to all)
+        bu_prefix_lengths: Allocate BUs from a BuddyAllocator with these
+            requested prefix lengths instead of the uniform split; other BUs
+            are sized from environment_prefix_target
+        in_use: Existing CIDR blocks the leaf pools must not overlap
+    """
+    # Calculate required regional prefix length
+    # Each region needs a subnet that can accommodate all BUs/Envs
+    max_prefix_len = plan.max_prefix_len
+    required_regional_bits = max(0, (len(regions) - 1).bit_length())
+    regional_prefix_len = _child_prefix_len(
+        top_base,
+        top_prefix_len,
+        top_prefix_len + required_regional_bits,
+        max_prefix_len,
+    )
+    has_bus = include_bu_level and bool(bus)
+    has_envs = include_env_level and bool(envs)
+    required_env_bits = max(0, (len(envs) - 1).bit_length()) if has_envs else 0
+    if bu_prefix_lengths is not None:
+        # BUs without a requested size get a block that holds every
+        # environment at the target size (or, as leaves, the target size
+        # itself), which does not depend on how many BUs share the region
+        default_bu_prefix_len = min(
+            max(regional_prefix_len, environment_prefix_target - required_env_bits),
+            max_prefix_len,
+        )
+    region_bases = None
+    if in_use is not None and not has_bus and not has_envs:
+        region_bases = _free_child_bases(
+            in_use,
+            top_base,
+            top_prefix_len,
+            regional_prefix_len,
+            len(regions),
+            max_prefix_len,
+        )
+
+    # Process each region
+    for i in range(start, len(regions) if stop is None else stop):
+        region = regions[i]
+        if region_bases is not None:
+            if i >= len(region_bases):
+                raise ValueError(f"Not enough subnet space for region {region}")
+            regional_base = region_bases[i]
+        elif i >= 1 << (regional_prefix_len - top_prefix_len):
+            raise ValueError(f"Not enough subnet space for region {region}")
+        else:
+            regional_base = _nth_subnet(
+                top_base, regional_prefix_len, i, max_prefix_len
+            )
+        regional_pool = plan.add_pool(
+            top_pool, LEVEL_REGION, region, regional_base, regional_prefix_len
+        )
+
+        # If we include BU level
+        if has_bus:
+            # Calculate BU prefix length
+            required_bu_bits = max(0, (len(bus) - 1).bit_length())
+            bu_prefix_len = _child_prefix_len(
+                regional_base,
+                regional_prefix_len,
+                regional_prefix_len + required_bu_bits,
+                max_prefix_len,
+            )
+
+            # BUs are the leaf pools when there is no environment level
+            bu_in_use = None if has_envs else in_use
+            allocator = bu_bases = None
+            if bu_prefix_lengths is not None:
+                allocator = BuddyAllocator(
+                    regional_base, regional_prefix_len, max_prefix_len
+                )
+            elif bu_in_use is not None:
+                bu_bases = _free_child_bases(
+                    bu_in_use,
+                    regional_base,
+                    regional_prefix_len,
+                    bu_prefix_len,
+                    len(bus),
+                    max_prefix_len,
+                )
+
+            # Process each BU
+            for bu_idx, bu in enumerate(bus):
+                if allocator is not None:
+                    bu_block_prefix_len = bu_prefix_lengths.get(
+                        bu, default_bu_prefix_len
+                    )
+                    if not regional_prefix_len <= bu_block_prefix_len <= max_prefix_len:
+                        raise ValueError(
+                            f"BU {bu} requests a /{bu_block_prefix_len} block,"
+                            f" which does not fit region {region}"
+                            f" (/{regional_prefix_len})"
+                        )
+                    # Environments are at least environment_prefix_target in
+                    # size, so the block must hold that many of them
+                    if (
+                        has_envs
+                        and bu_block_prefix_len + required_env_bits
+                        > environment_prefix_target
+                    ):
+                        raise ValueError(
+                            f"The /{bu_block_prefix_len} block of BU {bu} in region"
+                            f" {region} cannot hold its {len(envs)} environments"
+                            f" at /{environment_prefix_target} or larger"
+                        )
+                    while True:
+                        if allocator.find_free(bu_block_prefix_len) is None:
+                            raise ValueError(
+                                f"Not enough subnet space for BU {bu} in region {region}"
+                            )
+                        # Blocks overlapping an in-use CIDR stay allocated, so
+                        # they are never handed out
+                        bu_base = allocator.allocate(bu_block_prefix_len)
+                        if bu_in_use is None or not bu_in_use.overlaps(
+                            bu_base, bu_block_prefix_len, max_prefix_len
+                        ):
+                            break
+                elif bu_bases is not None:
+                    if bu_idx >= len(bu_bases):
+                        raise ValueError(
+                            f"Not enough subnet space for BU {bu} in region {region}"
+                        )
+                    bu_block_prefix_len = bu_prefix_len
+                    bu_base = bu_bases[bu_idx]
+                else:
+                    if bu_idx >= 1 << (bu_prefix_len - regional_prefix_len):
+                        raise ValueError(
+                            f"Not enough subnet space for BU {bu} in region {region}"
+                        )
+                    bu_block_prefix_len = bu_prefix_len
+                    bu_base = _nth_subnet(
+                        regional_base, bu_prefix_len, bu_idx, max_prefix_len
+                    )
+                bu_pool = plan.add_pool(
+                    regional_pool, LEVEL_BU, bu, bu_base, bu_block_prefix_len
+                )
+
+                # If we include environment level
+                if has_envs:
+                    _allocate_env_cidrs(
+                        plan,
+                        bu_pool,
+                        bu_base,
+                        bu_block_prefix_len,
+                        envs,
+                        environment_prefix_target,
+                        reserved_strategy,
+                        reserved_percentage,
+                        f"BU {bu}, region {region}",
+                        in_use,
+                    )
+                plan.close_pool(bu_pool)
+        # If we skip BU level but include environment level
+        elif has_envs:
+            # Use a placeholder BU name for consistency
+            placeholder_bu = "Default"
+            placeholder_pool = plan.add_pool(
+                regional_pool,
+                LEVEL_DEFAULT_BU,
+                placeholder_bu,
+                regional_base,
+                regional_prefix_len,
+            )
+            _allocate_env_cidrs(
+                plan,
+                placeholder_pool,
+                regional_base,
+                regional_prefix_len,
+                envs,
+                environment_prefix_target,
+                reserved_strategy,
+                reserved_percentage,
+                f"region {region}",
+                in_use,
+            )
+            plan.close_pool(placeholder_pool)
+
+        plan.close_pool(regional_pool)
+
+
+def reorder_items(
+    order: Sequence[str], positions: Sequence[Optional[float]]
+) -> List[str]:
+    """
+    Apply several moves to an ordered list at once.
+
+    Each item is given a (1-based) target position; items are sorted by it,
+    so moving one item to position 1 shifts the others down. An item whose
+    position was changed goes before an unmoved item asking for the same
+    position, and ties otherwise keep the current order.
+
+    Args:
+        order: Current order
+        positions: Requested position of each item of order, or None to
+            leave it where it is; out-of-range positions are clamped
+
+    Returns:
+        New order
+
+    Raises:
+        ValueError: If the lengths of order and positions differ
+    """
+    if len(positions) != len(order):
+        raise ValueError("Expected one position per item")
+    last = len(order)
+    keys = []
+    for index, position in enumerate(positions):
+        current = index + 1
+        if position is None or position != position:  # None or NaN
+            position = current
+        position = min(max(position, 1), last)
+        keys.append((position, position == current, index))
+    return [order[index] for _, _, index in sorted(keys)]
+
+
+def _resolve_order(
+    regions: List[str],
+    bus: Optional[List[str]],
+    envs: Optional[List[str]],
+    include_bu_level: bool,
+    include_env_level: bool,
+    primary_region: Optional[str],
+    region_order: Optional[List[str]],
+    bu_order: Optional[List[str]],
+    env_order: Optional[List[str]],
+) -> Tuple[List[str], Optional[List[str]], Optional[List[str]]]:
+    """
+    Apply the user-defined ordering and primary region to the hierarchy lists.
 
     Returns:
-        Dictionary with all CIDR allocations
+        Tuple of (regions, bus, envs) in allocation order
     """
     # Apply ordering if provided
     if region_order:
@@ -131,197 +692,445 @@ def calculate_cidr_allocations(
     if primary_region and primary_region in regions:
         regions = [primary_region] + [r for r in regions if r != primary_region]
 
-    # Parse the top-level CIDR
-    top_network = ipaddress.IPv4Network(top_cidr)
-    top_prefix_len = top_network.prefixlen
-
-    # Calculate required regional prefix length
-    # Each region needs a subnet that can accommodate all BUs/Envs
-    required_regional_bits = max(0, (len(regions) - 1).bit_length())
-    regional_prefix_len = top_prefix_len + required_regional_bits
-
-    # Calculate regional CIDRs
-    regional_subnets = list(top_network.subnets(new_prefix=regional_prefix_len))
-
-    # Create results dictionary
-    results = {"top_cidr": [top_cidr], "regional_cidrs": {}}
-
-    # Add BU and ENV dictionaries if needed
-    if include_bu_level:
-        results["bu_cidrs"] = {}
-
-    if include_env_level:
-        results["env_cidrs"] = {}
+    return regions, bus, envs
 
-    # Process each region
-    for i, region in enumerate(regions):
-        if i >= len(regional_subnets):
-            raise ValueError(f"Not enough subnet space for region {region}")
 
-        regional_cidr = str(regional_subnets[i])
-        regional_network = ipaddress.IPv4Network(regional_cidr)
+def _allocate_env_cidrs(
+    plan: AllocationPlan,
+    parent_pool: int,
+    parent_base: int,
+    parent_prefix_len: int,
+    envs: List[str],
+    environment_prefix_target: int,
+    reserved_strategy: str,
+    reserved_percentage: Optional[int],
+    location: str,
+    in_use: Optional[CidrIndex] = None,
+) -> None:
+    """
+    Allocate environment CIDRs and their reserved CIDRs inside a parent pool.
 
-        results["regional_cidrs"][region] = {"cidr": [regional_cidr], "locale": region}
+    Args:
+        plan: Allocation plan to append the environment pools to
+        parent_pool: Index of the parent pool in the plan
+        parent_base: Integer network address of the parent pool
+        parent_prefix_len: Prefix length of the parent pool
+        envs: Ordered list of environment names
+        environment_prefix_target: Target prefix length for environment CIDRs
+        reserved_strategy: Strategy for calculating reserved CIDRs
+        reserved_percentage: Percentage to reserve for "Custom percentage"
+        location: Human-readable parent location used in error messages
+        in_use: Existing CIDR blocks to skip when placing environments;
+            environments are then sized to environment_prefix_target
+    """
+    # Calculate environment prefix length
+    required_env_bits = max(0, (len(envs) - 1).bit_length())
+    env_prefix_len = parent_prefix_len + required_env_bits
+
+    # Make sure the environment prefix isn't too long. Around in-use blocks,
+    # environments take target-sized blocks so the even split's leftover
+    # space can absorb the skipped ones
+    if env_prefix_len > environment_prefix_target or in_use is not None:
+        env_prefix_len = environment_prefix_target
+    max_prefix_len = plan.max_prefix_len
+    env_prefix_len = _child_prefix_len(
+        parent_base, parent_prefix_len, env_prefix_len, max_prefix_len
+    )
+
+    # Every environment has the same size, so the reserved block sits at the
+    # same offset inside each of them
+    env_count = 1 << (env_prefix_len - parent_prefix_len)
+    reserved_offset, reserved_prefix_len = _reserved_block(
+        parent_base,
+        env_prefix_len,
+        reserved_strategy,
+        reserved_percentage,
+        max_prefix_len,
+    )
+    env_size = 1 << (max_prefix_len - env_prefix_len)
+
+    if in_use is None:
+        env_bases = range(parent_base, parent_base + len(envs) * env_size, env_size)
+    else:
+        env_bases = _free_child_bases(
+            in_use,
+            parent_base,
+            parent_prefix_len,
+            env_prefix_len,
+            len(envs),
+            max_prefix_len,
+        )
+    if len(envs) > min(env_count, len(env_bases)):
+        env = envs[min(env_count, len(env_bases))]
+        raise ValueError(f"Not enough subnet space for environment {env} in {location}")
+
+    plan.add_sibling_pools(
+        parent_pool,
+        LEVEL_ENV,
+        envs,
+        env_bases,
+        env_prefix_len,
+        reserved_offset,
+        reserved_prefix_len,
+    )
+
+
+def _allocate_vectorized(
+    plan: AllocationPlan, key: "PlanKey", top_base: int, top_prefix_len: int
+) -> bool:
+    """
+    Append every region, BU and environment pool to a plan in one NumPy pass.
 
-        # If we include BU level
-        if include_bu_level and bus:
-            # Calculate BU prefix length
-            required_bu_bits = max(0, (len(bus) - 1).bit_length())
-            bu_prefix_len = regional_network.prefixlen + required_bu_bits
+    All pools of a level share one prefix length, so each region subtree has
+    the same shape: the pools are laid out as a (region x slot) grid of
+    integer columns, where a slot's address is the region base plus a fixed
+    offset. Names are attached by id and CIDR strings are only formatted when
+    the plan is read.
 
-            # Calculate BU CIDRs
-            bu_subnets = list(regional_network.subnets(new_prefix=bu_prefix_len))
+    Args:
+        plan: Allocation plan holding only the top-level pool
+        key: PlanKey with the ordered regions, BUs and environments
+        top_base: Integer network address of the top-level CIDR
+        top_prefix_len: Prefix length of the top-level CIDR
 
-            results["bu_cidrs"][region] = {}
+    Returns:
+        True if the pools were added, False (with the plan untouched) if the
+        hierarchy does not fit and the scalar pass must report the error
+    """
+    if plan.address_family != "ipv4":
+        # 128-bit addresses do not fit NumPy integer columns
+        return False
 
-            # Process each BU
-            for bu_idx, bu in enumerate(bus):
-                if bu_idx >= len(bu_subnets):
-                    raise ValueError(
-                        f"Not enough subnet space for BU {bu} in region {region}"
-                    )
+    import numpy as np
 
-                bu_cidr = str(bu_subnets[bu_idx])
-                bu_network = ipaddress.IPv4Network(bu_cidr)
+    try:
+        layout = _plan_layout(key, top_base, top_prefix_len)
+    except ValueError:
+        return False
+    regional_prefix_len, bu_prefix_len, env_prefix_len = layout[:3]
+    reserved_offset, reserved_prefix_len = layout[3:]
+
+    env_count = len(key.envs) if env_prefix_len is not None else 0
+    if bu_prefix_len is not None:
+        group_names, group_level, group_prefix_len = key.bus, LEVEL_BU, bu_prefix_len
+    elif env_count:
+        group_names, group_level = ("Default",), LEVEL_DEFAULT_BU
+        group_prefix_len = regional_prefix_len
+    else:
+        group_names, group_level, group_prefix_len = (), LEVEL_BU, regional_prefix_len
 
-                results["bu_cidrs"][region][bu] = {"cidr": [bu_cidr]}
+    if (
+        len(key.regions) > 1 << (regional_prefix_len - top_prefix_len)
+        or len(group_names) > 1 << (group_prefix_len - regional_prefix_len)
+        or (env_count and env_count > 1 << (env_prefix_len - group_prefix_len))
+    ):
+        return False
+
+    # Slot 0 of a region subtree is the regional pool, followed by each BU
+    # (or placeholder) pool and its environments
+    group_span = 1 + env_count
+    region_span = 1 + len(group_names) * group_span
+    slot = np.arange(region_span - 1, dtype=np.int64)
+    group, member = np.divmod(slot, group_span)
+    is_env = member > 0
+    env_idx = member - 1
+
+    offset = group << (IPV4_MAX_PREFIXLEN - group_prefix_len)
+    if env_count:
+        offset += np.where(is_env, env_idx << (IPV4_MAX_PREFIXLEN - env_prefix_len), 0)
+    group_ids = np.array([plan.intern(name) for name in group_names], dtype=np.int64)
+    env_ids = np.array(
+        [plan.intern(name) for name in key.envs[:env_count]], dtype=np.int64
+    )
+    slot_name_id = np.where(
+        is_env,
+        env_ids[env_idx] if env_count else 0,
+        group_ids[group] if len(group_ids) else 0,
+    )
+
+    region_count = len(key.regions)
+    region_index = np.arange(region_count, dtype=np.int64)
+    region_base = top_base + (
+        region_index << (IPV4_MAX_PREFIXLEN - regional_prefix_len)
+    )
+    region_start = 1 + region_index * region_span
+    region_ids = np.array([plan.intern(name) for name in key.regions], dtype=np.int64)
+
+    def grid(region_column, slot_columns):
+        values = np.empty((region_count, region_span), dtype=np.int64)
+        values[:, 0] = region_column
+        values[:, 1:] = slot_columns
+        return values
+
+    base = grid(region_base, region_base[:, None] + offset)
+    reserved_base = np.where(grid(False, is_env), base + reserved_offset, 0)
+    columns = {
+        "base": base,
+        "prefix_len": grid(
+            regional_prefix_len, np.where(is_env, env_prefix_len or 0, group_prefix_len)
+        ),
+        "reserved_base": reserved_base,
+        "reserved_prefix_len": grid(0, np.where(is_env, reserved_prefix_len, 0)),
+        "parent": grid(
+            0, region_start[:, None] + np.where(is_env, 1 + group * group_span, 0)
+        ),
+        "level": grid(LEVEL_REGION, np.where(is_env, LEVEL_ENV, group_level)),
+        "name_id": grid(region_ids, slot_name_id),
+        "subtree_size": grid(region_span, np.where(is_env, 1, group_span)),
+    }
+    plan.extend_pools(
+        **{
+            name: np.ascontiguousarray(
+                values.ravel(), dtype=getattr(plan, name).typecode
+            )
+            for name, values in columns.items()
+        }
+    )
+    return True
 
-                # If we include environment level
-                if include_env_level and envs:
-                    # Calculate environment prefix length
-                    required_env_bits = max(0, (len(envs) - 1).bit_length())
-                    env_prefix_len = bu_network.prefixlen + required_env_bits
 
-                    # Make sure the environment prefix isn't too long
-                    if env_prefix_len > environment_prefix_target:
-                        env_prefix_len = environment_prefix_target
+def _reserved_block(
+    env_base: int,
+    env_prefix_len: int,
+    reserved_strategy: str,
+    reserved_percentage: Optional[int],
+    max_prefix_len: int = IPV4_MAX_PREFIXLEN,
+) -> Tuple[int, int]:
+    """
+    Locate the reserved block inside an environment CIDR.
 
-                    # Calculate environment CIDRs
-                    env_subnets = list(bu_network.subnets(new_prefix=env_prefix_len))
+    Args:
+        env_base: Integer network address of an environment CIDR of this size
+        env_prefix_len: Prefix length of the environment CIDR
+        reserved_strategy: Strategy for calculating reserved CIDRs ("Half of subnet" or "Custom percentage")
+        reserved_percentage: If reserved_strategy is "Custom percentage", the percentage to reserve
+        max_prefix_len: Address width (32 for IPv4, 128 for IPv6)
 
-                    if region not in results["env_cidrs"]:
-                        results["env_cidrs"][region] = {}
+    Returns:
+        Tuple of (offset from the environment network address, reserved prefix length)
+    """
+    if reserved_strategy == "Half of subnet":
+        # Use the second half of the environment CIDR
+        if env_prefix_len == max_prefix_len:
+            raise ValueError(
+                f"A /{max_prefix_len} environment CIDR cannot be split in half"
+            )
+        reserved_prefix_len = env_prefix_len + 1
+        return 1 << (max_prefix_len - reserved_prefix_len), reserved_prefix_len
+
+    # "Custom percentage"
+    percentage = reserved_percentage or 25  # Default to 25% if not specified
+
+    # Calculate how many subnets to create based on percentage
+    subnet_count = int(100 / percentage)
+    if subnet_count < 2:
+        subnet_count = 2  # Minimum is 2 subnets (50%)
+    if subnet_count > 10:
+        subnet_count = 10  # Maximum is 10 subnets (10%)
+
+    # Use the last subnet as the reserved one
+    reserved_prefix_len = _child_prefix_len(
+        env_base,
+        env_prefix_len,
+        env_prefix_len + max(1, (subnet_count - 1).bit_length()),
+        max_prefix_len,
+    )
+    env_size = 1 << (max_prefix_len - env_prefix_len)
+    reserved_size = 1 << (max_prefix_len - reserved_prefix_len)
+    return env_size - reserved_size, reserved_prefix_len
+
+
+def _nth_subnet(
+    parent_base: int,
+    new_prefix_len: int,
+    index: int,
+    max_prefix_len: int = IPV4_MAX_PREFIXLEN,
+) -> int:
+    """Return the integer network address of the index-th child of a given prefix length."""
+    return parent_base + (index << (max_prefix_len - new_prefix_len))
+
+
+def _child_prefix_len(
+    base: int,
+    prefix_len: int,
+    new_prefix_len: int,
+    max_prefix_len: int = IPV4_MAX_PREFIXLEN,
+) -> int:
+    """
+    Resolve the prefix length ipaddress.IPv4Network.subnets() would produce.
 
-                    results["env_cidrs"][region][bu] = {}
+    Only prefix lengths are compared, so no sibling networks are enumerated
+    even for IPv6 blocks with 2**64 children.
 
-                    # Process each environment
-                    for env_idx, env in enumerate(envs):
-                        if env_idx >= len(env_subnets):
-                            raise ValueError(
-                                f"Not enough subnet space for environment {env} in BU {bu}, region {region}"
-                            )
+    Args:
+        base: Integer network address of the parent block
+        prefix_len: Prefix length of the parent block
+        new_prefix_len: Requested child prefix length
+        max_prefix_len: Address width (32 for IPv4, 128 for IPv6)
 
-                        env_cidr = str(env_subnets[env_idx])
-                        env_network = ipaddress.IPv4Network(env_cidr)
+    Returns:
+        Effective child prefix length (a /32 or /128 only ever yields itself)
 
-                        # Calculate reserved CIDR based on strategy
-                        if reserved_strategy == "Half of subnet":
-                            # Calculate reserved CIDR (half of the environment CIDR)
-                            reserved_prefix_len = env_network.prefixlen + 1
-                            reserved_subnets = list(
-                                env_network.subnets(new_prefix=reserved_prefix_len)
-                            )
-                            reserved_cidr = str(
-                                reserved_subnets[1]
-                            )  # Use the second half
-                        else:  # "Custom percentage"
-                            # Calculate reserved CIDR based on the specified percentage
-                            percentage = (
-                                reserved_percentage or 25
-                            )  # Default to 25% if not specified
-
-                            # Calculate how many subnets to create based on percentage
-                            subnet_count = int(100 / percentage)
-                            if subnet_count < 2:
-                                subnet_count = 2  # Minimum is 2 subnets (50%)
-                            if subnet_count > 10:
-                                subnet_count = 10  # Maximum is 10 subnets (10%)
-
-                            # Calculate the prefix length for the subnets
-                            reserved_prefix_len = env_network.prefixlen + max(
-                                1, (subnet_count - 1).bit_length()
-                            )
-                            reserved_subnets = list(
-                                env_network.subnets(new_prefix=reserved_prefix_len)
-                            )
+    Raises:
+        ValueError: If the child prefix is shorter than the parent or exceeds
+            the address width
+    """
+    if prefix_len == max_prefix_len:
+        return prefix_len
+    if new_prefix_len < prefix_len:
+        raise ValueError("new prefix must be longer")
+    if new_prefix_len > max_prefix_len:
+        netblock = (
+            format_ipv6_cidr(base, prefix_len)
+            if max_prefix_len == IPV6_MAX_PREFIXLEN
+            else format_cidr(base, prefix_len)
+        )
+        raise ValueError(
+            "prefix length diff %d is invalid for netblock %s"
+            % (new_prefix_len, netblock)
+        )
+    return new_prefix_len
 
-                            # Use the last subnet as the reserved one
-                            reserved_cidr = str(reserved_subnets[-1])
 
-                        results["env_cidrs"][region][bu][env] = {
-                            "cidr": [env_cidr],
-                            "reserved_cidr": reserved_cidr,
-                        }
-        # If we skip BU level but include environment level
-        elif include_env_level and envs:
-            # Calculate environment prefix length directly from regional level
-            required_env_bits = max(0, (len(envs) - 1).bit_length())
-            env_prefix_len = regional_network.prefixlen + required_env_bits
+def _free_child_bases(
+    in_use: CidrIndex,
+    parent_base: int,
+    parent_prefix_len: int,
+    child_prefix_len: int,
+    count: int,
+    max_prefix_len: int = IPV4_MAX_PREFIXLEN,
+) -> List[int]:
+    """
+    Return the first count child blocks of a parent that overlap no in-use CIDR.
 
-            # Make sure the environment prefix isn't too long
-            if env_prefix_len > environment_prefix_target:
-                env_prefix_len = environment_prefix_target
+    Args:
+        in_use: Index of existing CIDR blocks
+        parent_base: Integer network address of the parent block
+        parent_prefix_len: Prefix length of the parent block
+        child_prefix_len: Prefix length of the child blocks
+        count: Number of child blocks wanted
+        max_prefix_len: Address width (32 for IPv4, 128 for IPv6)
 
-            # Calculate environment CIDRs
-            env_subnets = list(regional_network.subnets(new_prefix=env_prefix_len))
+    Returns:
+        Integer network addresses in ascending order; fewer than count if the
+        parent runs out of free blocks
+    """
+    parent_end = parent_base + (1 << (max_prefix_len - parent_prefix_len))
+    child_size = 1 << (max_prefix_len - child_prefix_len)
+    bases = []
+    base = parent_base
+    while len(bases) < count:
+        base = in_use.first_free(base, child_prefix_len, max_prefix_len)
+        if base >= parent_end:
+            break
+        bases.append(base)
+        base += child_size
+    return bases
+
+
+@timed("statistics")
+def allocation_stats(cidr_allocations: Mapping[str, Any]) -> Dict[str, LevelStats]:
+    """
+    Return per-level pool counts, sizes and reserved totals of a plan.
 
-            if region not in results["env_cidrs"]:
-                results["env_cidrs"][region] = {}
+    Plans returned by calculate_cidr_allocations carry these statistics,
+    accumulated while they were planned, so this costs O(levels); other
+    mappings (for example read back from JSON) are walked once, parsing
+    each CIDR once.
 
-            # Use a placeholder BU name for consistency
-            placeholder_bu = "Default"
-            results["env_cidrs"][region][placeholder_bu] = {}
+    Args:
+        cidr_allocations: Mapping with "top_cidr", "regional_cidrs" and
+            optionally "bu_cidrs" and "env_cidrs"
 
-            # Process each environment
-            for env_idx, env in enumerate(envs):
-                if env_idx >= len(env_subnets):
-                    raise ValueError(
-                        f"Not enough subnet space for environment {env} in region {region}"
-                    )
+    Returns:
+        LevelStats keyed by "top", "regional", "business_units" and
+        "environments", for the levels that have pools
+    """
+    plan = getattr(cidr_allocations, "plan", None)
+    if isinstance(plan, AllocationPlan):
+        return plan.stats()
+
+    sizes: Dict[int, List[int]] = {level: [] for level in LEVEL_KEYS}
+    reserved_sizes: List[int] = []
+
+    def size(cidr: str) -> int:
+        width, _, prefix_len = parse_block(cidr)
+        return 1 << (width - prefix_len)
+
+    sizes[LEVEL_TOP].append(sum(map(size, cidr_allocations["top_cidr"])))
+    for regional in (cidr_allocations.get("regional_cidrs") or {}).values():
+        sizes[LEVEL_REGION].append(sum(map(size, regional["cidr"])))
+    for bus in (cidr_allocations.get("bu_cidrs") or {}).values():
+        for bu in bus.values():
+            sizes[LEVEL_BU].append(sum(map(size, bu["cidr"])))
+    for groups in (cidr_allocations.get("env_cidrs") or {}).values():
+        for envs in groups.values():
+            for env in envs.values():
+                sizes[LEVEL_ENV].append(sum(map(size, env["cidr"])))
+                if env.get("reserved_cidr"):
+                    reserved_sizes.append(size(env["reserved_cidr"]))
+
+    stats = {}
+    for level, key in LEVEL_KEYS.items():
+        level_sizes = sizes[level]
+        if level_sizes:
+            reserved = reserved_sizes if level == LEVEL_ENV else []
+            stats[key] = LevelStats(
+                len(level_sizes),
+                sum(level_sizes),
+                min(level_sizes),
+                max(level_sizes),
+                sum(level_sizes) // len(level_sizes),
+                len(reserved),
+                sum(reserved),
+            )
+    return stats
 
-                env_cidr = str(env_subnets[env_idx])
-                env_network = ipaddress.IPv4Network(env_cidr)
 
-                # Calculate reserved CIDR based on strategy
-                if reserved_strategy == "Half of subnet":
-                    # Calculate reserved CIDR (half of the environment CIDR)
-                    reserved_prefix_len = env_network.prefixlen + 1
-                    reserved_subnets = list(
-                        env_network.subnets(new_prefix=reserved_prefix_len)
-                    )
-                    reserved_cidr = str(reserved_subnets[1])  # Use the second half
-                else:  # "Custom percentage"
-                    # Calculate reserved CIDR based on the specified percentage
-                    percentage = (
-                        reserved_percentage or 25
-                    )  # Default to 25% if not specified
-
-                    # Calculate how many subnets to create based on percentage
-                    subnet_count = int(100 / percentage)
-                    if subnet_count < 2:
-                        subnet_count = 2  # Minimum is 2 subnets (50%)
-                    if subnet_count > 10:
-                        subnet_count = 10  # Maximum is 10 subnets (10%)
-
-                    # Calculate the prefix length for the subnets
-                    reserved_prefix_len = env_network.prefixlen + max(
-                        1, (subnet_count - 1).bit_length()
-                    )
-                    reserved_subnets = list(
-                        env_network.subnets(new_prefix=reserved_prefix_len)
-                    )
+@timed("conflict_check")
+def find_plan_conflicts(
+    plan: AllocationPlan, in_use: CidrIndex
+) -> List["PlanConflict"]:
+    """
+    Check the leaf pools of a plan against existing CIDR blocks.
 
-                    # Use the last subnet as the reserved one
-                    reserved_cidr = str(reserved_subnets[-1])
+    Parent pools may legitimately contain existing ranges; only the pools
+    that VPCs allocate from (environments, or the lowest included level)
+    must stay clear of them.
 
-                results["env_cidrs"][region][placeholder_bu][env] = {
-                    "cidr": [env_cidr],
-                    "reserved_cidr": reserved_cidr,
-                }
+    Args:
+        plan: Calculated allocation plan
+        in_use: Index of existing CIDR blocks
 
-    return results
+    Returns:
+        One PlanConflict per overlapping leaf pool, in plan order
+    """
+    max_prefix_len = plan.max_prefix_len
+    overlaps = in_use.overlaps
+    base, prefix_len, subtree_size = plan.base, plan.prefix_len, plan.subtree_size
+    conflicts = []
+    # Conflicting leaves cluster under few parents, so parent paths are cached
+    parent_paths: Dict[int, Tuple[str, ...]] = {}
+    for index in range(1, len(plan)):
+        if subtree_size[index] != 1 or not overlaps(
+            base[index], prefix_len[index], max_prefix_len
+        ):
+            continue
+        parent = plan.parent[index]
+        parent_path = parent_paths.get(parent)
+        if parent_path is None:
+            parent_path = parent_paths[parent] = plan.path(parent)
+        conflicts.append(
+            PlanConflict(
+                parent_path + (plan.name(index),),
+                plan.cidr(index),
+                in_use.overlapping(base[index], prefix_len[index], max_prefix_len),
+            )
+        )
+    return conflicts
 
 
+@timed("naming")
 def generate_resource_names(
     top_cidr: str,
     regions: List[str],
@@ -329,10 +1138,15 @@ def generate_resource_names(
     envs: List[str] = None,
     include_bu_level: bool = True,
     include_env_level: bool = True,
+    name_templates: Optional[NameTemplates] = None,
 ) -> Dict[str, Any]:
     """
     Generate standardized names and descriptions for all IPAM resources with flexible levels.
 
+    Names are formatted lazily from compiled templates (see naming.py), so
+    this costs O(regions + BUs + environments) rather than one formatted
+    pair per pool.
+
     Args:
         top_cidr: The top-level CIDR block
         regions: List of AWS regions
@@ -340,183 +1154,839 @@ def generate_resource_names(
         envs: List of environment names
         include_bu_level: Whether to include business unit level
         include_env_level: Whether to include environment level
+        name_templates: Custom name and description templates
 
     Returns:
         Dictionary with all resource names and descriptions
-    """
-    # Top level
-    top_name = "ipam-top"
-    top_description = "Top-Level Multi-Region IPAM Pool"
-
-    # Regional pools
-    reg_names = {
-        region: {
-            "name": f"ipam-regional-{region}",
-            "description": f"Regional IPAM Pool for {get_region_display_name(region)}",
-        }
-        for region in regions
-    }
-
-    # Initialize with empty dictionaries
-    bu_names = {}
-    env_names = {}
-
-    # BU pools (if included)
-    if include_bu_level and bus:
-        bu_names = {
-            region: {
-                bu: {
-                    "name": f"ipam-bu-{bu.lower()}-{region}",
-                    "description": f"{bu} Business Unit IPAM Pool for {get_region_display_name(region)}",
-                }
-                for bu in bus
-            }
-            for region in regions
-        }
 
-    # Environment pools (if included)
-    if include_env_level and envs:
-        if include_bu_level and bus:
-            # With BU level
-            env_names = {
-                region: {
-                    bu: {
-                        env: {
-                            "name": f"ipam-{env.lower()}-{bu.lower()}-{region}",
-                            "description": f"{env.capitalize()} Environment IPAM Pool for {bu} in {get_region_display_name(region)}",
-                        }
-                        for env in envs
-                    }
-                    for bu in bus
-                }
-                for region in regions
-            }
-        else:
-            # Without BU level (using placeholder)
-            placeholder_bu = "Default"
-            env_names = {
-                region: {
-                    placeholder_bu: {
-                        env: {
-                            "name": f"ipam-{env.lower()}-{region}",
-                            "description": f"{env.capitalize()} Environment IPAM Pool for {get_region_display_name(region)}",
-                        }
-                        for env in envs
-                    }
-                }
-                for region in regions
-            }
-
-    return {
-        "top": {"name": top_name, "description": top_description},
-        "regional": reg_names,
-        "business_units": bu_names,
-        "environments": env_names,
-    }
+    Raises:
+        ValueError: If a name template is invalid
+    """
+    return naming.resource_names(
+        regions, bus, envs, include_bu_level, include_env_level, name_templates
+    )
 
 
+@timed("terraform_output")
 def generate_terraform_output(
-    cidr_allocations: Dict[str, Any],
+    cidr_allocations: Mapping[str, Any],
     resource_names: Dict[str, Any],
     include_bu_level: bool = True,
     include_env_level: bool = True,
+    layout: str = "nested",
 ) -> str:
     """
     Generate Terraform-compatible variable definitions with flexible levels.
 
     Args:
-        cidr_allocations: Dictionary with calculated CIDR allocations
+        cidr_allocations: Mapping with calculated CIDR allocations
         resource_names: Dictionary with resource names and descriptions
         include_bu_level: Whether to include business unit level
         include_env_level: Whether to include environment level
+        layout: One of TFVARS_LAYOUTS
 
     Returns:
         String with Terraform variable definitions
     """
+    return "".join(
+        iter_terraform_output(
+            cidr_allocations,
+            resource_names,
+            include_bu_level,
+            include_env_level,
+            layout,
+        )
+    )
+
+
+@timed("terraform_output")
+def write_terraform_output(
+    stream: TextIO,
+    cidr_allocations: Mapping[str, Any],
+    resource_names: Dict[str, Any],
+    include_bu_level: bool = True,
+    include_env_level: bool = True,
+    layout: str = "nested",
+) -> None:
+    """
+    Write Terraform-compatible variable definitions to a text stream.
+
+    The document is written pool by pool, so memory use does not grow with
+    the size of the plan. Any object with a write() method works, such as an
+    open file, sys.stdout or socket.makefile("w").
+
+    Args:
+        stream: Text stream to write to
+        cidr_allocations: Mapping with calculated CIDR allocations
+        resource_names: Dictionary with resource names and descriptions
+        include_bu_level: Whether to include business unit level
+        include_env_level: Whether to include environment level
+        layout: One of TFVARS_LAYOUTS
+    """
+    write = stream.write
+    for chunk in iter_terraform_output(
+        cidr_allocations,
+        resource_names,
+        include_bu_level,
+        include_env_level,
+        layout,
+    ):
+        write(chunk)
+
+
+def iter_terraform_output(
+    cidr_allocations: Mapping[str, Any],
+    resource_names: Dict[str, Any],
+    include_bu_level: bool = True,
+    include_env_level: bool = True,
+    layout: str = "nested",
+) -> Iterator[str]:
+    """
+    Yield Terraform-compatible variable definitions one pool at a time.
+
+    Args:
+        cidr_allocations: Mapping with calculated CIDR allocations
+        resource_names: Dictionary with resource names and descriptions
+        include_bu_level: Whether to include business unit level
+        include_env_level: Whether to include environment level
+        layout: One of TFVARS_LAYOUTS
+
+    Returns:
+        Iterator over chunks of the Terraform variable definitions
+
+    Raises:
+        ValueError: If the layout is unknown
+    """
+    if _is_flat(layout):
+        return itertools.chain(
+            _iter_terraform_header(
+                cidr_allocations, resource_names, _iter_regional_configs
+            ),
+            _iter_terraform_flat_levels(
+                cidr_allocations.get("bu_cidrs") if include_bu_level else None,
+                cidr_allocations.get("env_cidrs") if include_env_level else None,
+                resource_names,
+            ),
+        )
+    return _iter_terraform_output(
+        cidr_allocations,
+        resource_names,
+        include_bu_level,
+        include_env_level,
+        _iter_regional_configs,
+        _iter_bu_configs,
+        _iter_env_configs,
+    )
+
+
+def _iter_terraform_output(
+    cidr_allocations: Mapping[str, Any],
+    resource_names: Dict[str, Any],
+    include_bu_level: bool,
+    include_env_level: bool,
+    regional_configs: Callable[[Mapping[str, Any], Dict[str, Any]], Iterable[str]],
+    bu_configs: Callable[[Mapping[str, Any], Dict[str, Any]], Iterable[str]],
+    env_configs: Callable[[Mapping[str, Any], Dict[str, Any]], Iterable[str]],
+) -> Iterator[str]:
+    """
+    Yield the Terraform document, taking the body of each pool block from a callable.
+
+    The callables receive the level's allocations and the resource names and
+    return the block's entries, which lets the parallel path splice in
+    entries rendered by worker processes.
+    """
+    yield from _iter_terraform_header(
+        cidr_allocations, resource_names, regional_configs
+    )
+    yield from _iter_terraform_levels(
+        cidr_allocations.get("bu_cidrs") if include_bu_level else None,
+        cidr_allocations.get("env_cidrs") if include_env_level else None,
+        resource_names,
+        bu_configs,
+        env_configs,
+    )
+
+
+def _iter_terraform_header(
+    cidr_allocations: Mapping[str, Any],
+    resource_names: Dict[str, Any],
+    regional_configs: Callable[[Mapping[str, Any], Dict[str, Any]], Iterable[str]],
+) -> Iterator[str]:
+    """Yield the top-level variables and the reg_ipam_configs block."""
     # Format regions list with double quotes
     regions_list = list(cidr_allocations["regional_cidrs"].keys())
     regions_str = "[" + ", ".join([f'"{region}"' for region in regions_list]) + "]"
 
     # Top-level configuration
-    output = f"""provider_region   = "{regions_list[0]}"
+    yield f"""provider_region   = "{regions_list[0]}"
 operating_regions = {regions_str}
 share_name = "global-aws-ipam-specification"
 top_name        = "{resource_names['top']['name']}"
 top_description = "{resource_names['top']['description']}"
 top_cidr        = {format_cidr_list(cidr_allocations['top_cidr'])}
-reg_ipam_configs = {{
 """
+    # IPv4 is the module default, so existing IPv4 output is unchanged
+    family = address_family(cidr_allocations["top_cidr"][0])
+    if family != "ipv4":
+        yield f'address_family  = "{family}"\n'
+    yield "reg_ipam_configs = {\n"
 
     # Regional pools
-    for region, data in cidr_allocations["regional_cidrs"].items():
-        output += f"""  {region} = {{
-    name        = "{resource_names['regional'][region]['name']}"
-    description = "{resource_names['regional'][region]['description']}"
+    yield from regional_configs(cidr_allocations["regional_cidrs"], resource_names)
+
+    yield "}\n"
+
+
+def _iter_terraform_levels(
+    bu_cidrs: Optional[Mapping[str, Any]],
+    env_cidrs: Optional[Mapping[str, Any]],
+    resource_names: Dict[str, Any],
+    bu_configs: Callable[[Mapping[str, Any], Dict[str, Any]], Iterable[str]],
+    env_configs: Callable[[Mapping[str, Any], Dict[str, Any]], Iterable[str]],
+) -> Iterator[str]:
+    """Yield the bu_ipam_configs and env_ipam_configs blocks (empty if falsy)."""
+    # BU pools (if included)
+    if bu_cidrs:
+        yield "bu_ipam_configs = {\n"
+        yield from bu_configs(bu_cidrs, resource_names)
+        yield "}\n"
+    else:
+        # Empty BU config if not included
+        yield "bu_ipam_configs = {}\n"
+
+    # Environment pools (if included)
+    if env_cidrs:
+        yield "env_ipam_configs = {\n"
+        yield from env_configs(env_cidrs, resource_names)
+        yield "}"
+    else:
+        # Empty environment config if not included
+        yield "env_ipam_configs = {}"
+
+
+def _iter_regional_configs(
+    regional_cidrs: Mapping[str, Any], resource_names: Dict[str, Any]
+) -> Iterator[str]:
+    """Yield the entries of the reg_ipam_configs block, one region at a time."""
+    regional_names = resource_names["regional"]
+    for region, data in regional_cidrs.items():
+        # Names are formatted on lookup, so look each pool up once
+        names = regional_names[region]
+        yield f"""  {region} = {{
+    name        = "{names['name']}"
+    description = "{names['description']}"
     cidr        = {format_cidr_list(data['cidr'])}
     locale      = "{data['locale']}"
   }}
 """
 
-    output += "}\n"
 
-    # BU pools (if included)
-    if (
-        include_bu_level
-        and "bu_cidrs" in cidr_allocations
-        and cidr_allocations["bu_cidrs"]
-    ):
-        output += "bu_ipam_configs = {\n"
-
-        for region, bus in cidr_allocations["bu_cidrs"].items():
-            output += f"  {region} = {{\n"
-            for bu, bu_data in bus.items():
-                output += f"""    "{bu}" = {{
-      name        = "{resource_names['business_units'][region][bu]['name']}"
-      description = "{resource_names['business_units'][region][bu]['description']}"
+def _iter_bu_configs(
+    bu_cidrs: Mapping[str, Any], resource_names: Dict[str, Any]
+) -> Iterator[str]:
+    """Yield the entries of the bu_ipam_configs block, one pool at a time."""
+    for region, bus in bu_cidrs.items():
+        yield f"  {region} = {{\n"
+        bu_names = resource_names["business_units"][region]
+        for bu, bu_data in bus.items():
+            names = bu_names[bu]
+            yield f"""    "{bu}" = {{
+      name        = "{names['name']}"
+      description = "{names['description']}"
       cidr        = {format_cidr_list(bu_data['cidr'])}
     }}
 """
-            output += "  }\n"
+        yield "  }\n"
+
+
+def _iter_env_configs(
+    env_cidrs: Mapping[str, Any], resource_names: Dict[str, Any]
+) -> Iterator[str]:
+    """Yield the entries of the env_ipam_configs block, one pool at a time."""
+    for region, bus in env_cidrs.items():
+        yield f"  {region} = {{\n"
+        for bu, envs in bus.items():
+            yield f"    {bu} = {{\n"
+            env_names = resource_names["environments"][region][bu]
+            for env, env_data in envs.items():
+                names = env_names[env]
+                yield f"""      {env} = {{
+        name          = "{names['name']}"
+        description   = "{names['description']}"
+        cidr          = {format_cidr_list(env_data['cidr'])}
+        reserved_cidr = "{env_data['reserved_cidr']}"
+      }}
+"""
+            yield "    }\n"
+        yield "  }\n"
+
+
+# Shapes of the BU and environment variables: nested maps by region, BU and
+# environment (bu_ipam_configs, env_ipam_configs), or flat maps keyed by the
+# module's composite pool ids (flat_bu_ipam_configs, flat_env_ipam_configs)
+TFVARS_LAYOUTS = ("nested", "flat")
+
+
+def _is_flat(layout: str) -> bool:
+    """Return whether layout is "flat", raising ValueError if it is unknown."""
+    if layout not in TFVARS_LAYOUTS:
+        raise ValueError(f"Unknown tfvars layout: {layout}")
+    return layout == "flat"
+
+
+def _iter_terraform_flat_levels(
+    bu_cidrs: Optional[Mapping[str, Any]],
+    env_cidrs: Optional[Mapping[str, Any]],
+    resource_names: Dict[str, Any],
+) -> Iterator[str]:
+    """
+    Yield the flat_bu_ipam_configs and flat_env_ipam_configs blocks.
+
+    Every pool is keyed by the composite id the Terraform module gives its
+    resources and names its parent pool in parent_key, so the module looks
+    parents up by key instead of scanning every BU of a region.
+    """
+    if bu_cidrs:
+        yield "flat_bu_ipam_configs = {\n"
+        for region, bus in bu_cidrs.items():
+            bu_names = resource_names["business_units"][region]
+            for bu, bu_data in bus.items():
+                names = bu_names[bu]
+                yield f"""  "{region}-{bu}" = {{
+    name        = "{names['name']}"
+    description = "{names['description']}"
+    cidr        = {format_cidr_list(bu_data['cidr'])}
+    region      = "{region}"
+    bu          = "{bu}"
+    parent_key  = "{region}"
+  }}
+"""
+        yield "}\n"
+    else:
+        yield "flat_bu_ipam_configs = {}\n"
 
-        output += "}\n"
+    if env_cidrs:
+        yield "flat_env_ipam_configs = {\n"
+        for region, bus in env_cidrs.items():
+            region_names = resource_names["environments"][region]
+            for bu, envs in bus.items():
+                # Without a BU level, environments sit under their region
+                parent_key = f"{region}-{bu}" if bu_cidrs else region
+                env_names = region_names[bu]
+                for env, env_data in envs.items():
+                    names = env_names[env]
+                    yield f"""  "{region}-{bu}-{env}" = {{
+    name          = "{names['name']}"
+    description   = "{names['description']}"
+    cidr          = {format_cidr_list(env_data['cidr'])}
+    reserved_cidr = "{env_data['reserved_cidr']}"
+    region        = "{region}"
+    bu            = "{bu}"
+    env           = "{env}"
+    parent_key    = "{parent_key}"
+  }}
+"""
+        yield "}"
     else:
-        # Empty BU config if not included
-        output += "bu_ipam_configs = {}\n"
+        yield "flat_env_ipam_configs = {}"
 
-    # Environment pools (if included)
-    if (
-        include_env_level
-        and "env_cidrs" in cidr_allocations
-        and cidr_allocations["env_cidrs"]
+
+@timed("terraform_output")
+def generate_terraform_json(
+    cidr_allocations: Mapping[str, Any],
+    resource_names: Dict[str, Any],
+    include_bu_level: bool = True,
+    include_env_level: bool = True,
+    json_backend: Optional[str] = None,
+    layout: str = "nested",
+) -> str:
+    """
+    Generate the Terraform variable definitions as a terraform.tfvars.json document.
+
+    Args:
+        cidr_allocations: Mapping with calculated CIDR allocations
+        resource_names: Dictionary with resource names and descriptions
+        include_bu_level: Whether to include business unit level
+        include_env_level: Whether to include environment level
+        json_backend: One of JSON_BACKENDS (the fastest installed if None)
+        layout: One of TFVARS_LAYOUTS
+
+    Returns:
+        String with the JSON document
+    """
+    return "".join(
+        iter_terraform_json(
+            cidr_allocations,
+            resource_names,
+            include_bu_level,
+            include_env_level,
+            json_backend,
+            layout,
+        )
+    )
+
+
+@timed("terraform_output")
+def write_terraform_json(
+    stream: TextIO,
+    cidr_allocations: Mapping[str, Any],
+    resource_names: Dict[str, Any],
+    include_bu_level: bool = True,
+    include_env_level: bool = True,
+    json_backend: Optional[str] = None,
+    layout: str = "nested",
+) -> None:
+    """
+    Write the Terraform variable definitions to a text stream as terraform.tfvars.json.
+
+    Like write_terraform_output(), the document is written pool by pool.
+
+    Args:
+        stream: Text stream to write to
+        cidr_allocations: Mapping with calculated CIDR allocations
+        resource_names: Dictionary with resource names and descriptions
+        include_bu_level: Whether to include business unit level
+        include_env_level: Whether to include environment level
+        json_backend: One of JSON_BACKENDS (the fastest installed if None)
+        layout: One of TFVARS_LAYOUTS
+    """
+    write = stream.write
+    for chunk in iter_terraform_json(
+        cidr_allocations,
+        resource_names,
+        include_bu_level,
+        include_env_level,
+        json_backend,
+        layout,
     ):
-        output += "env_ipam_configs = {\n"
+        write(chunk)
+
+
+def iter_terraform_json(
+    cidr_allocations: Mapping[str, Any],
+    resource_names: Dict[str, Any],
+    include_bu_level: bool = True,
+    include_env_level: bool = True,
+    json_backend: Optional[str] = None,
+    layout: str = "nested",
+) -> Iterator[str]:
+    """
+    Yield a terraform.tfvars.json document one pool at a time.
 
-        for region, bus in cidr_allocations["env_cidrs"].items():
-            output += f"  {region} = {{\n"
+    The document holds the same variables, in the same order, as the HCL of
+    iter_terraform_output(). Pool objects are serialized straight from the
+    allocations and names, one per line, so Terraform and other tools parse
+    it without an HCL parser and tfvars_import can stream it back.
+
+    Args:
+        cidr_allocations: Mapping with calculated CIDR allocations
+        resource_names: Dictionary with resource names and descriptions
+        include_bu_level: Whether to include business unit level
+        include_env_level: Whether to include environment level
+        json_backend: One of JSON_BACKENDS (the fastest installed if None)
+        layout: One of TFVARS_LAYOUTS
+
+    Returns:
+        Iterator over chunks of the JSON document
+
+    Raises:
+        ValueError: If the requested backend or the layout is unknown, or the
+            backend is not installed
+    """
+    levels = _iter_json_flat_levels if _is_flat(layout) else _iter_json_levels
+    dumps = json_encoder(json_backend)
+    yield from _iter_json_header(cidr_allocations, resource_names, dumps)
+    yield ",\n"
+    yield from levels(
+        cidr_allocations.get("bu_cidrs") if include_bu_level else None,
+        cidr_allocations.get("env_cidrs") if include_env_level else None,
+        resource_names,
+        dumps,
+    )
+
+
+def _iter_json_header(
+    cidr_allocations: Mapping[str, Any],
+    resource_names: Dict[str, Any],
+    dumps: Callable[[Any], str],
+) -> Iterator[str]:
+    """Yield the opening brace, the top-level variables and reg_ipam_configs."""
+    regional_cidrs = cidr_allocations["regional_cidrs"]
+    regions_list = list(regional_cidrs.keys())
+
+    yield (
+        f'{{\n"provider_region": {dumps(regions_list[0])},\n'
+        f'"operating_regions": {dumps(regions_list)},\n'
+        '"share_name": "global-aws-ipam-specification",\n'
+        f'"top_name": {dumps(resource_names["top"]["name"])},\n'
+        f'"top_description": {dumps(resource_names["top"]["description"])},\n'
+        f'"top_cidr": {dumps(list(cidr_allocations["top_cidr"]))},\n'
+    )
+    family = address_family(cidr_allocations["top_cidr"][0])
+    if family != "ipv4":
+        yield f'"address_family": {dumps(family)},\n'
+
+    # Regional pools
+    yield '"reg_ipam_configs": {'
+    regional_names = resource_names["regional"]
+    separator = "\n"
+    for region, data in regional_cidrs.items():
+        names = regional_names[region]
+        pool = {
+            "name": names["name"],
+            "description": names["description"],
+            "cidr": list(data["cidr"]),
+            "locale": data["locale"],
+        }
+        yield f"{separator}{dumps(region)}: {dumps(pool)}"
+        separator = ",\n"
+    yield "\n}"
+
+
+def _iter_json_levels(
+    bu_cidrs: Optional[Mapping[str, Any]],
+    env_cidrs: Optional[Mapping[str, Any]],
+    resource_names: Dict[str, Any],
+    dumps: Callable[[Any], str],
+) -> Iterator[str]:
+    """Yield bu_ipam_configs, env_ipam_configs and the closing brace."""
+    # BU pools (if included)
+    if bu_cidrs:
+        yield '"bu_ipam_configs": {'
+        region_separator = "\n"
+        for region, bus in bu_cidrs.items():
+            yield f"{region_separator}{dumps(region)}: {{"
+            bu_names = resource_names["business_units"][region]
+            separator = "\n"
+            for bu, bu_data in bus.items():
+                names = bu_names[bu]
+                pool = {
+                    "name": names["name"],
+                    "description": names["description"],
+                    "cidr": list(bu_data["cidr"]),
+                }
+                yield f"{separator}{dumps(bu)}: {dumps(pool)}"
+                separator = ",\n"
+            yield "\n}"
+            region_separator = ",\n"
+        yield "\n},\n"
+    else:
+        yield '"bu_ipam_configs": {},\n'
+
+    # Environment pools (if included)
+    if env_cidrs:
+        yield '"env_ipam_configs": {'
+        region_separator = "\n"
+        for region, bus in env_cidrs.items():
+            yield f"{region_separator}{dumps(region)}: {{"
+            bu_separator = "\n"
             for bu, envs in bus.items():
-                output += f"    {bu} = {{\n"
+                yield f"{bu_separator}{dumps(bu)}: {{"
+                env_names = resource_names["environments"][region][bu]
+                separator = "\n"
                 for env, env_data in envs.items():
-                    env_name = resource_names["environments"][region][bu][env]["name"]
-                    env_description = resource_names["environments"][region][bu][env][
-                        "description"
-                    ]
-
-                    output += f"""      {env} = {{
-        name          = "{env_name}"
-        description   = "{env_description}"
-        cidr          = {format_cidr_list(env_data['cidr'])}
-        reserved_cidr = "{env_data['reserved_cidr']}"
-      }}
-"""
-                output += "    }\n"
-            output += "  }\n"
+                    names = env_names[env]
+                    pool = {
+                        "name": names["name"],
+                        "description": names["description"],
+                        "cidr": list(env_data["cidr"]),
+                        "reserved_cidr": env_data["reserved_cidr"],
+                    }
+                    yield f"{separator}{dumps(env)}: {dumps(pool)}"
+                    separator = ",\n"
+                yield "\n}"
+                bu_separator = ",\n"
+            yield "\n}"
+            region_separator = ",\n"
+        yield "\n}\n}\n"
+    else:
+        yield '"env_ipam_configs": {}\n}\n'
+
 
-        output += "}"
+def _iter_json_flat_levels(
+    bu_cidrs: Optional[Mapping[str, Any]],
+    env_cidrs: Optional[Mapping[str, Any]],
+    resource_names: Dict[str, Any],
+    dumps: Callable[[Any], str],
+) -> Iterator[str]:
+    """Yield flat_bu_ipam_configs, flat_env_ipam_configs and the closing brace."""
+    if bu_cidrs:
+        yield '"flat_bu_ipam_configs": {'
+        separator = "\n"
+        for region, bus in bu_cidrs.items():
+            bu_names = resource_names["business_units"][region]
+            for bu, bu_data in bus.items():
+                names = bu_names[bu]
+                pool = {
+                    "name": names["name"],
+                    "description": names["description"],
+                    "cidr": list(bu_data["cidr"]),
+                    "region": region,
+                    "bu": bu,
+                    "parent_key": region,
+                }
+                yield f"{separator}{dumps(f'{region}-{bu}')}: {dumps(pool)}"
+                separator = ",\n"
+        yield "\n},\n"
     else:
-        # Empty environment config if not included
-        output += "env_ipam_configs = {}"
+        yield '"flat_bu_ipam_configs": {},\n'
+
+    if env_cidrs:
+        yield '"flat_env_ipam_configs": {'
+        separator = "\n"
+        for region, bus in env_cidrs.items():
+            region_names = resource_names["environments"][region]
+            for bu, envs in bus.items():
+                # Without a BU level, environments sit under their region
+                parent_key = f"{region}-{bu}" if bu_cidrs else region
+                env_names = region_names[bu]
+                for env, env_data in envs.items():
+                    names = env_names[env]
+                    pool = {
+                        "name": names["name"],
+                        "description": names["description"],
+                        "cidr": list(env_data["cidr"]),
+                        "reserved_cidr": env_data["reserved_cidr"],
+                        "region": region,
+                        "bu": bu,
+                        "env": env,
+                        "parent_key": parent_key,
+                    }
+                    yield f"{separator}{dumps(f'{region}-{bu}-{env}')}: {dumps(pool)}"
+                    separator = ",\n"
+        yield "\n}\n}\n"
+    else:
+        yield '"flat_env_ipam_configs": {}\n}\n'
+
+
+# Serializers json_encoder() can use, fastest first
+JSON_BACKENDS = ("orjson", "json")
+
+
+def json_encoder(json_backend: Optional[str] = None) -> Callable[[Any], str]:
+    """
+    Return a function serializing a value to compact JSON text.
+
+    Every backend produces the same text: no whitespace between tokens and
+    non-ASCII characters written as-is.
+
+    Args:
+        json_backend: "orjson" (requires the orjson package), "json" (the
+            standard library), or None for the fastest one installed
+
+    Returns:
+        Function from a JSON-serializable value to a string
+
+    Raises:
+        ValueError: If the backend is unknown or not installed
+    """
+    if json_backend not in (None,) + JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {json_backend}")
+    if json_backend in (None, "orjson"):
+        try:
+            import orjson
+        except ImportError as e:
+            if json_backend == "orjson":
+                raise ValueError(
+                    "The orjson backend requires the orjson package (pip install orjson)"
+                ) from e
+        else:
+            orjson_dumps = orjson.dumps
+
+            def dumps(value: Any) -> str:
+                return orjson_dumps(value).decode()
+
+            return dumps
+
+    return json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
 
-    return output
+
+# Output formats of the tfvars writers
+TFVARS_FORMATS = ("hcl", "json")
+
+# Levels terraform_shards() can split a plan at
+SHARD_LEVELS = ("region", "bu")
+
+
+class TerraformShard(NamedTuple):
+    """
+    The BU and environment pools of one region, or of one BU in a region,
+    deployed as a root stack of their own.
+
+    Attributes:
+        name: Shard name, in the module's key format ("us-east-1" or
+            "us-east-1-Finance")
+        region: Region of the shard
+        bu: Business unit of the shard (None for a whole region)
+    """
+
+    name: str
+    region: str
+    bu: Optional[str] = None
+
+
+def terraform_shards(
+    cidr_allocations: Mapping[str, Any],
+    include_bu_level: bool = True,
+    include_env_level: bool = True,
+    shard_by: str = "region",
+) -> List[TerraformShard]:
+    """
+    Split a plan into shards that Terraform can plan and apply concurrently.
+
+    The top-level and regional pools stay in the base stack (see
+    iter_terraform_base()); every shard holds the BU and environment pools
+    below one region, or below one BU, and none depends on another. Regions
+    without BU or environment pools get no shard.
+
+    Args:
+        cidr_allocations: Mapping with calculated CIDR allocations
+        include_bu_level: Whether to include business unit level
+        include_env_level: Whether to include environment level
+        shard_by: One of SHARD_LEVELS
+
+    Returns:
+        List of TerraformShard in plan order
+
+    Raises:
+        ValueError: If shard_by is unknown, or is "bu" without a BU level
+    """
+    if shard_by not in SHARD_LEVELS:
+        raise ValueError(f"Unknown shard level: {shard_by}")
+    if shard_by == "bu" and not include_bu_level:
+        raise ValueError("Sharding by business unit requires the BU level")
+
+    if include_bu_level:
+        level_cidrs = cidr_allocations.get("bu_cidrs")
+    elif include_env_level:
+        level_cidrs = cidr_allocations.get("env_cidrs")
+    else:
+        level_cidrs = None
+    shards = []
+    for region, bus in (level_cidrs or {}).items():
+        if not bus:
+            continue
+        if shard_by == "region":
+            shards.append(TerraformShard(region, region))
+        else:
+            shards.extend(TerraformShard(f"{region}-{bu}", region, bu) for bu in bus)
+    return shards
+
+
+def iter_terraform_base(
+    cidr_allocations: Mapping[str, Any],
+    resource_names: Dict[str, Any],
+    output_format: str = "hcl",
+    json_backend: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Yield the variables of the base stack: the IPAM, top-level and regional pools.
+
+    Args:
+        cidr_allocations: Mapping with calculated CIDR allocations
+        resource_names: Dictionary with resource names and descriptions
+        output_format: One of TFVARS_FORMATS
+        json_backend: JSON backend, as for iter_terraform_json()
+
+    Returns:
+        Iterator over chunks of the tfvars document
+
+    Raises:
+        ValueError: If the format or JSON backend is unknown
+    """
+    if output_format == "hcl":
+        return _iter_terraform_header(
+            cidr_allocations, resource_names, _iter_regional_configs
+        )
+    if output_format == "json":
+        return itertools.chain(
+            _iter_json_header(
+                cidr_allocations, resource_names, json_encoder(json_backend)
+            ),
+            ("\n}\n",),
+        )
+    raise ValueError(f"Unknown tfvars format: {output_format}")
+
+
+def iter_terraform_shard(
+    cidr_allocations: Mapping[str, Any],
+    resource_names: Dict[str, Any],
+    shard: TerraformShard,
+    include_bu_level: bool = True,
+    include_env_level: bool = True,
+    output_format: str = "hcl",
+    json_backend: Optional[str] = None,
+    layout: str = "nested",
+) -> Iterator[str]:
+    """
+    Yield the variables of one shard stack: its BU and environment pools.
+
+    Pool IDs of the base stack are not known when the plan is generated, so
+    the shard stack reads them from the base stack's state.
+
+    Args:
+        cidr_allocations: Mapping with calculated CIDR allocations
+        resource_names: Dictionary with resource names and descriptions
+        shard: Shard as returned by terraform_shards()
+        include_bu_level: Whether to include business unit level
+        include_env_level: Whether to include environment level
+        output_format: One of TFVARS_FORMATS
+        json_backend: JSON backend, as for iter_terraform_json()
+        layout: One of TFVARS_LAYOUTS
+
+    Returns:
+        Iterator over chunks of the tfvars document
+
+    Raises:
+        ValueError: If the format, JSON backend or layout is unknown
+    """
+    flat = _is_flat(layout)
+    bu_cidrs = _shard_cidrs(
+        cidr_allocations.get("bu_cidrs") if include_bu_level else None, shard
+    )
+    env_cidrs = _shard_cidrs(
+        cidr_allocations.get("env_cidrs") if include_env_level else None, shard
+    )
+    # Every pool is created through the IPAM's home region
+    provider_region = next(iter(cidr_allocations["regional_cidrs"]))
+    if output_format == "hcl":
+        return itertools.chain(
+            (f'provider_region   = "{provider_region}"\n',),
+            (
+                _iter_terraform_flat_levels(bu_cidrs, env_cidrs, resource_names)
+                if flat
+                else _iter_terraform_levels(
+                    bu_cidrs,
+                    env_cidrs,
+                    resource_names,
+                    _iter_bu_configs,
+                    _iter_env_configs,
+                )
+            ),
+        )
+    if output_format == "json":
+        dumps = json_encoder(json_backend)
+        return itertools.chain(
+            (f'{{\n"provider_region": {dumps(provider_region)},\n',),
+            (_iter_json_flat_levels if flat else _iter_json_levels)(
+                bu_cidrs, env_cidrs, resource_names, dumps
+            ),
+        )
+    raise ValueError(f"Unknown tfvars format: {output_format}")
+
+
+def _shard_cidrs(
+    level_cidrs: Optional[Mapping[str, Any]], shard: TerraformShard
+) -> Dict[str, Any]:
+    """Return the part of a {region: {bu: ...}} level that belongs to a shard."""
+    if not level_cidrs or shard.region not in level_cidrs:
+        return {}
+    bus = level_cidrs[shard.region]
+    if shard.bu is None:
+        return {shard.region: bus}
+    if shard.bu not in bus:
+        return {}
+    return {shard.region: {shard.bu: bus[shard.bu]}}
 
 
 def format_cidr_list(cidr_list: List[str]) -> str:
@@ -532,9 +2002,10 @@ def format_cidr_list(cidr_list: List[str]) -> str:
     return "[" + ", ".join([f'"{cidr}"' for cidr in cidr_list]) + "]"
 
 
+@timed("module_modifications")
 def get_modified_terraform_module(
     include_bu_level: bool, include_env_level: bool
-) -> str:
+) -> Optional[str]:
     """
     Generate modified Terraform module code based on the selected hierarchy.
 
@@ -543,87 +2014,1272 @@ def get_modified_terraform_module(
         include_env_level: Whether to include environment level
 
     Returns:
-        String with modified Terraform module code
+        Note on the Terraform module for the selected hierarchy, or None if
+        the module needs no changes
     """
-    # No modifications needed if both levels are included (original design)
-    if include_bu_level and include_env_level:
+    # No modifications needed if both levels are included (original design).
+    # Without a BU level, the module creates each environment under the
+    # regional pool named by its parent_key, at the same region-bu-env
+    # addresses as the flat layout, shards and terraform_changes()
+    if include_env_level:
         return None
 
-    # If BU level is skipped but ENV level is included
-    if not include_bu_level and include_env_level:
-        # Return modified module code that connects environments directly to regions
-        return """# Modified module/ipam/main.tf for Region -> Environment hierarchy (skipping BU level)
+    # If ENV level is skipped (with or without BU level), return an
+    # appropriate message
+    return """# No Terraform module modifications are needed if you're only skipping the Environment level.
+# The existing module will work correctly with the modified input variables."""
+
+
+# Number of distinct configurations kept by the plan cache
+PLAN_CACHE_SIZE = 32
+
+
+class PlanKey(NamedTuple):
+    """Canonical, hashable description of everything that shapes a plan."""
+
+    top_cidr: str
+    regions: Tuple[str, ...]
+    bus: Tuple[str, ...]
+    envs: Tuple[str, ...]
+    include_bu_level: bool
+    include_env_level: bool
+    environment_prefix_target: int
+    reserved_strategy: str
+    reserved_percentage: Optional[int]
+    # Only shapes the resource names, never the allocations
+    name_templates: Optional[NameTemplates] = None
+
+
+class PlanConflict(NamedTuple):
+    """A leaf pool that overlaps existing CIDR blocks."""
+
+    path: Tuple[str, ...]
+    cidr: str
+    entries: List[InventoryEntry]
 
-# Note: Replace this section in your modules/ipam/main.tf file
 
-########################################################
-# Environment Pools (directly under Regional Pools)
-########################################################
+class IpamConfiguration(NamedTuple):
+    """Everything the app and CLI derive from a single plan."""
 
-resource "aws_vpc_ipam_pool" "env" {
-  for_each = local.flattened_env_ipam_configs
+    cidr_allocations: Mapping[str, Any]
+    resource_names: Dict[str, Any]
+    terraform_output: str
+    terraform_module_modifications: Optional[str]
 
-  ipam_scope_id       = aws_vpc_ipam.this.private_default_scope_id
-  description         = each.value.description
-  address_family      = "ipv4"
-  auto_import         = false
-  locale              = each.value.region
-  source_ipam_pool_id = aws_vpc_ipam_pool.regional[each.value.region].id
 
-  depends_on = [
-    aws_vpc_ipam_pool_cidr.regional_cidr
-  ]
+def plan_key(
+    top_cidr: str,
+    regions: List[str],
+    bus: List[str] = None,
+    envs: List[str] = None,
+    include_bu_level: bool = True,
+    include_env_level: bool = True,
+    primary_region: Optional[str] = None,
+    region_order: Optional[List[str]] = None,
+    bu_order: Optional[List[str]] = None,
+    env_order: Optional[List[str]] = None,
+    environment_prefix_target: int = 18,
+    reserved_strategy: str = "Half of subnet",
+    reserved_percentage: Optional[int] = None,
+    name_templates: Optional[NameTemplates] = None,
+) -> PlanKey:
+    """
+    Normalize calculate_cidr_allocations arguments into a canonical cache key.
+
+    Orderings and the primary region are applied up front, and inputs that
+    cannot affect the result (lists for skipped levels, the percentage when
+    splitting in half, default name templates) are dropped, so equivalent
+    requests share one key.
+
+    Returns:
+        PlanKey for the configuration
+    """
+    regions, bus, envs = _resolve_order(
+        regions,
+        bus,
+        envs,
+        include_bu_level,
+        include_env_level,
+        primary_region,
+        region_order,
+        bu_order,
+        env_order,
+    )
+    return PlanKey(
+        top_cidr=top_cidr,
+        regions=tuple(regions),
+        bus=tuple(bus or ()) if include_bu_level else (),
+        envs=tuple(envs or ()) if include_env_level else (),
+        include_bu_level=bool(include_bu_level),
+        include_env_level=bool(include_env_level),
+        environment_prefix_target=environment_prefix_target,
+        reserved_strategy=reserved_strategy,
+        reserved_percentage=(
+            None if reserved_strategy == "Half of subnet" else reserved_percentage
+        ),
+        name_templates=(
+            None if name_templates == DEFAULT_NAME_TEMPLATES else name_templates
+        ),
+    )
+
+
+@timed("configuration")
+def build_ipam_configuration(key: PlanKey) -> IpamConfiguration:
+    """
+    Run the full pipeline (allocations, names, tfvars, module modifications) for a key.
+
+    This is uncached; use calculate_ipam_configuration() or wrap it in a
+    caching primitive such as st.cache_resource.
+
+    Args:
+        key: PlanKey as returned by plan_key()
+
+    Returns:
+        IpamConfiguration with all generated artifacts
+    """
+    return _configuration_from_plan(key, plan_from_key(key))
+
+
+def _configuration_from_plan(key: PlanKey, plan: AllocationPlan) -> IpamConfiguration:
+    """Name and render an already calculated plan of a key."""
+    cidr_allocations = plan.as_mapping()
+    resource_names = generate_resource_names(
+        key.top_cidr,
+        list(key.regions),
+        list(key.bus) or None,
+        list(key.envs) or None,
+        key.include_bu_level,
+        key.include_env_level,
+        key.name_templates,
+    )
+    terraform_output = generate_terraform_output(
+        cidr_allocations,
+        resource_names,
+        key.include_bu_level,
+        key.include_env_level,
+    )
+    terraform_module_modifications = get_modified_terraform_module(
+        key.include_bu_level, key.include_env_level
+    )
+    return IpamConfiguration(
+        cidr_allocations,
+        resource_names,
+        terraform_output,
+        terraform_module_modifications,
+    )
+
+
+def plan_from_key(key: PlanKey) -> AllocationPlan:
+    """Build the allocation plan described by a PlanKey."""
+    return build_allocation_plan(
+        key.top_cidr,
+        list(key.regions),
+        list(key.bus) or None,
+        list(key.envs) or None,
+        key.include_bu_level,
+        key.include_env_level,
+        environment_prefix_target=key.environment_prefix_target,
+        reserved_strategy=key.reserved_strategy,
+        reserved_percentage=key.reserved_percentage,
+    )
+
+
+_cached_ipam_configuration = lru_cache(maxsize=PLAN_CACHE_SIZE)(
+    build_ipam_configuration
+)
+
+
+def calculate_ipam_configuration(*args, **kwargs) -> IpamConfiguration:
+    """
+    Memoized full pipeline, keyed by the normalized configuration.
+
+    Accepts the same arguments as calculate_cidr_allocations. Results are
+    shared between callers and must be treated as read-only. The least
+    recently used of PLAN_CACHE_SIZE configurations is evicted first.
+
+    Returns:
+        IpamConfiguration with all generated artifacts
+    """
+    return _cached_ipam_configuration(plan_key(*args, **kwargs))
+
+
+def clear_plan_cache() -> None:
+    """Drop every memoized configuration."""
+    _cached_ipam_configuration.cache_clear()
+
+
+# Hierarchy levels a PlanDelta can target, mapped to PlanKey fields
+_DELTA_LEVELS = {"region": "regions", "bu": "bus", "env": "envs"}
+
+
+class PlanDelta(NamedTuple):
+    """A single edit to the ordered region, BU or environment list of a plan."""
+
+    level: str  # "region", "bu" or "env"
+    action: str  # "insert", "remove" or "reorder"
+    name: Optional[str] = None  # item to insert or remove
+    position: Optional[int] = None  # insert position (defaults to the end)
+    order: Optional[Tuple[str, ...]] = None  # complete new order for "reorder"
+
+
+class ReplanResult(NamedTuple):
+    """Outcome of an incremental re-plan."""
+
+    key: PlanKey
+    plan: AllocationPlan
+    added: List[Tuple[str, ...]]
+    removed: List[Tuple[str, ...]]
+    changed: List[Tuple[str, ...]]
+    reused_pools: int  # pools copied from the previous plan instead of recomputed
+
+
+def apply_plan_delta(key: PlanKey, delta: PlanDelta) -> PlanKey:
+    """
+    Apply an insert, remove or reorder edit to a PlanKey.
+
+    Args:
+        key: PlanKey of the current plan
+        delta: Edit to apply
+
+    Returns:
+        PlanKey of the edited configuration
+
+    Raises:
+        ValueError: If the delta does not fit the current configuration
+    """
+    field = _DELTA_LEVELS.get(delta.level)
+    if field is None:
+        raise ValueError(f"Unknown plan level {delta.level!r}")
+    items = list(getattr(key, field))
+
+    if delta.action == "insert":
+        if delta.name in items:
+            raise ValueError(f"{delta.name} is already part of the plan")
+        position = len(items) if delta.position is None else delta.position
+        items.insert(position, delta.name)
+    elif delta.action == "remove":
+        if delta.name not in items:
+            raise ValueError(f"{delta.name} is not part of the plan")
+        items.remove(delta.name)
+    elif delta.action == "reorder":
+        if delta.order is None or sorted(delta.order) != sorted(items):
+            raise ValueError(
+                f"New {delta.level} order must contain exactly the current items"
+            )
+        items = list(delta.order)
+    else:
+        raise ValueError(f"Unknown plan delta action {delta.action!r}")
+
+    return key._replace(**{field: tuple(items)})
+
+
+@timed("replan")
+def replan(
+    previous_key: PlanKey, previous_plan: AllocationPlan, delta: PlanDelta
+) -> ReplanResult:
+    """
+    Apply a delta to a plan, recomputing only the subtrees it invalidates.
+
+    Subtrees whose layout is unaffected are copied from the previous plan
+    (shifted to their new position when an earlier sibling moved), and only
+    the remaining pools are recalculated. The result is identical to a full
+    calculation of the edited configuration.
+
+    Args:
+        previous_key: PlanKey the previous plan was built from
+        previous_plan: Previously calculated AllocationPlan
+        delta: Insert, remove or reorder edit at the region, BU or env level
+
+    Returns:
+        ReplanResult with the new key and plan and the added, removed and
+        changed pool paths (tuples of region, BU and environment names)
+
+    Raises:
+        ValueError: If the delta is invalid or the edited hierarchy does not fit
+    """
+    key = apply_plan_delta(previous_key, delta)
+    try:
+        return _replan(previous_key, previous_plan, key)
+    except ValueError:
+        # Report exactly the error a full calculation raises
+        plan_from_key(key)
+        raise
+
+
+def plan_deltas(previous_key: PlanKey, key: PlanKey) -> Optional[List[PlanDelta]]:
+    """
+    Express the difference between two plan keys as a list of PlanDelta edits.
+
+    Args:
+        previous_key: PlanKey of the current plan
+        key: PlanKey of the edited configuration
+
+    Returns:
+        Removals, insertions and reorders that turn previous_key into key when
+        applied in order (empty if the keys are equal), or None if the keys
+        differ in more than their region, BU and environment lists or repeat
+        a name
+    """
+    fields = set(_DELTA_LEVELS.values())
+    for field in PlanKey._fields:
+        if field not in fields and getattr(previous_key, field) != getattr(key, field):
+            return None
+
+    deltas = []
+    for level, field in _DELTA_LEVELS.items():
+        items = list(getattr(previous_key, field))
+        target = getattr(key, field)
+        if len(set(items)) != len(items) or len(set(target)) != len(target):
+            return None
+        wanted = set(target)
+        for name in items:
+            if name not in wanted:
+                deltas.append(PlanDelta(level, "remove", name))
+        items = [name for name in items if name in wanted]
+        present = set(items)
+        for position, name in enumerate(target):
+            if name not in present:
+                deltas.append(PlanDelta(level, "insert", name, position))
+                items.insert(position, name)
+        if tuple(items) != target:
+            deltas.append(PlanDelta(level, "reorder", order=target))
+    return deltas
+
+
+@timed("replan_configuration")
+def replan_configuration(
+    previous_key: PlanKey, previous_plan: AllocationPlan, key: PlanKey
+) -> IpamConfiguration:
+    """
+    Run the full pipeline for key, re-planning from a previous plan where possible.
+
+    The difference between the keys is applied as PlanDelta edits with
+    replan(), so only the subtrees they invalidate are recalculated; keys
+    that differ in anything else are calculated from scratch. The result is
+    identical to build_ipam_configuration(key).
+
+    Args:
+        previous_key: PlanKey the previous plan was built from
+        previous_plan: Previously calculated AllocationPlan
+        key: PlanKey of the configuration to build
 
-  # Merge existing tags with "ipam" tag
-  tags = merge(
-    var.tags,
-    {
-      ipam = "ipam-pool-${each.value.env}-${each.value.region}"
+    Returns:
+        IpamConfiguration with all generated artifacts
+
+    Raises:
+        ValueError: If the hierarchy of key does not fit its top-level CIDR
+    """
+    deltas = plan_deltas(previous_key, key)
+    if deltas is None:
+        return build_ipam_configuration(key)
+    plan = previous_plan
+    for delta in deltas:
+        result = replan(previous_key, plan, delta)
+        previous_key, plan = result.key, result.plan
+    return _configuration_from_plan(key, plan)
+
+
+def _plan_layout(
+    key: PlanKey,
+    top_base: int,
+    top_prefix_len: int,
+    max_prefix_len: int = IPV4_MAX_PREFIXLEN,
+) -> Tuple:
+    """
+    Return the prefix lengths and reserved block shared by every subtree of a plan.
+
+    Returns:
+        Tuple of (regional prefix, BU prefix or None, env prefix or None,
+        reserved offset, reserved prefix)
+    """
+    regional_prefix_len = _child_prefix_len(
+        top_base,
+        top_prefix_len,
+        top_prefix_len + max(0, (len(key.regions) - 1).bit_length()),
+        max_prefix_len,
+    )
+    parent_prefix_len = regional_prefix_len
+    bu_prefix_len = None
+    if key.include_bu_level and key.bus:
+        bu_prefix_len = parent_prefix_len = _child_prefix_len(
+            top_base,
+            regional_prefix_len,
+            regional_prefix_len + max(0, (len(key.bus) - 1).bit_length()),
+            max_prefix_len,
+        )
+
+    env_prefix_len = None
+    reserved = (0, 0)
+    if key.include_env_level and key.envs:
+        env_prefix_len = min(
+            parent_prefix_len + max(0, (len(key.envs) - 1).bit_length()),
+            key.environment_prefix_target,
+        )
+        env_prefix_len = _child_prefix_len(
+            top_base, parent_prefix_len, env_prefix_len, max_prefix_len
+        )
+        reserved = _reserved_block(
+            top_base,
+            env_prefix_len,
+            key.reserved_strategy,
+            key.reserved_percentage,
+            max_prefix_len,
+        )
+
+    return (regional_prefix_len, bu_prefix_len, env_prefix_len) + reserved
+
+
+def _replan(
+    previous_key: PlanKey, previous_plan: AllocationPlan, key: PlanKey
+) -> ReplanResult:
+    """Build the plan for key, reusing unaffected subtrees of previous_plan."""
+    top_network = parse_network(key.top_cidr)
+    top_base = int(top_network.network_address)
+    top_prefix_len = top_network.prefixlen
+    max_prefix_len = top_network.max_prefixlen
+
+    layout = _plan_layout(key, top_base, top_prefix_len, max_prefix_len)
+    previous_layout = _plan_layout(
+        previous_key, top_base, top_prefix_len, max_prefix_len
+    )
+    regional_prefix_len, bu_prefix_len = layout[0], layout[1]
+    # A region (or BU) subtree can be copied when everything below it is laid
+    # out exactly as before
+    region_reusable = (
+        layout == previous_layout
+        and key.bus == previous_key.bus
+        and key.envs == previous_key.envs
+    )
+    bu_reusable = layout[1:] == previous_layout[1:] and key.envs == previous_key.envs
+
+    plan = AllocationPlan(
+        key.top_cidr,
+        key.include_bu_level,
+        key.include_env_level,
+        address_family(key.top_cidr),
+    )
+    plan.adopt_names(previous_plan)
+    plan.unique_names = all(
+        len(set(items)) == len(items) for items in (key.regions, key.bus, key.envs)
+    )
+    if not (plan.unique_names and previous_plan.unique_names):
+        # Repeated names make subtrees ambiguous; recalculate everything
+        region_reusable = bu_reusable = False
+    top_pool = plan.add_pool(-1, LEVEL_TOP, key.top_cidr, top_base, top_prefix_len)
+
+    added, changed = [], []
+    copied = set()
+    reused_pools = 0
+
+    def reuse(old_pool: int, parent_pool: int, new_base: int) -> None:
+        nonlocal reused_pools
+        offset = new_base - previous_plan.base[old_pool]
+        new_pool = plan.copy_subtree(previous_plan, old_pool, parent_pool, offset)
+        copied.add(new_pool)
+        size = plan.subtree_size[new_pool]
+        reused_pools += size
+        if offset:
+            changed.extend(plan.path(i) for i in range(new_pool, new_pool + size))
+
+    def compare(new_pool: int, old_pool: Optional[int]) -> None:
+        if old_pool is None:
+            added.append(plan.path(new_pool))
+        elif (
+            plan.base[new_pool] != previous_plan.base[old_pool]
+            or plan.prefix_len[new_pool] != previous_plan.prefix_len[old_pool]
+            or plan.reserved_cidr(new_pool) != previous_plan.reserved_cidr(old_pool)
+        ):
+            changed.append(plan.path(new_pool))
+
+    def old_child(old_pool: Optional[int], name: str, level: int) -> Optional[int]:
+        if old_pool is None:
+            return None
+        try:
+            old = previous_plan.child(old_pool, name)
+        except KeyError:
+            return None
+        return old if previous_plan.level[old] == level else None
+
+    def allocate_envs(
+        parent_pool: int,
+        old_parent: Optional[int],
+        base: int,
+        prefix_len: int,
+        location: str,
+    ) -> None:
+        first_env = len(plan)
+        _allocate_env_cidrs(
+            plan,
+            parent_pool,
+            base,
+            prefix_len,
+            list(key.envs),
+            key.environment_prefix_target,
+            key.reserved_strategy,
+            key.reserved_percentage,
+            location,
+        )
+        # Environment pools are leaves, so they occupy the indexes just added
+        for env_pool in range(first_env, len(plan)):
+            compare(env_pool, old_child(old_parent, plan.name(env_pool), LEVEL_ENV))
+
+    for i, region in enumerate(key.regions):
+        if i >= 1 << (regional_prefix_len - top_prefix_len):
+            raise ValueError(f"Not enough subnet space for region {region}")
+
+        regional_base = _nth_subnet(top_base, regional_prefix_len, i, max_prefix_len)
+        old_region = old_child(0, region, LEVEL_REGION)
+        if old_region is not None and region_reusable:
+            reuse(old_region, top_pool, regional_base)
+            continue
+
+        regional_pool = plan.add_pool(
+            top_pool, LEVEL_REGION, region, regional_base, regional_prefix_len
+        )
+        compare(regional_pool, old_region)
+
+        if bu_prefix_len is not None:
+            for bu_idx, bu in enumerate(key.bus):
+                if bu_idx >= 1 << (bu_prefix_len - regional_prefix_len):
+                    raise ValueError(
+                        f"Not enough subnet space for BU {bu} in region {region}"
+                    )
+
+                bu_base = _nth_subnet(
+                    regional_base, bu_prefix_len, bu_idx, max_prefix_len
+                )
+                old_bu = old_child(old_region, bu, LEVEL_BU)
+                if old_bu is not None and bu_reusable:
+                    reuse(old_bu, regional_pool, bu_base)
+                    continue
+
+                bu_pool = plan.add_pool(
+                    regional_pool, LEVEL_BU, bu, bu_base, bu_prefix_len
+                )
+                compare(bu_pool, old_bu)
+                if layout[2] is not None:
+                    allocate_envs(
+                        bu_pool,
+                        old_bu,
+                        bu_base,
+                        bu_prefix_len,
+                        f"BU {bu}, region {region}",
+                    )
+                plan.close_pool(bu_pool)
+        elif layout[2] is not None:
+            placeholder_pool = plan.add_pool(
+                regional_pool,
+                LEVEL_DEFAULT_BU,
+                "Default",
+                regional_base,
+                regional_prefix_len,
+            )
+            old_placeholder = old_child(old_region, "Default", LEVEL_DEFAULT_BU)
+            compare(placeholder_pool, old_placeholder)
+            allocate_envs(
+                placeholder_pool,
+                old_placeholder,
+                regional_base,
+                regional_prefix_len,
+                f"region {region}",
+            )
+            plan.close_pool(placeholder_pool)
+
+        plan.close_pool(regional_pool)
+
+    plan.close_pool(top_pool)
+
+    return ReplanResult(
+        key,
+        plan,
+        added,
+        _removed_paths(previous_plan, plan, copied),
+        changed,
+        reused_pools,
+    )
+
+
+def _removed_paths(
+    previous_plan: AllocationPlan, plan: AllocationPlan, copied: Set[int]
+) -> List[Tuple[str, ...]]:
+    """
+    List the pools of the previous plan that no longer exist in the new plan.
+
+    Subtrees that were copied into the new plan are skipped, so the cost is
+    proportional to the part of the hierarchy that was recalculated.
+    """
+    removed = []
+
+    def walk(old_pool: int, new_pool: int) -> None:
+        for old_child in previous_plan.children(old_pool):
+            try:
+                new_child = plan.child(new_pool, previous_plan.name(old_child))
+            except KeyError:
+                new_child = None
+            if (
+                new_child is None
+                or plan.level[new_child] != previous_plan.level[old_child]
+            ):
+                end = old_child + previous_plan.subtree_size[old_child]
+                removed.extend(previous_plan.path(i) for i in range(old_child, end))
+            elif new_child not in copied:
+                walk(old_child, new_child)
+
+    walk(0, 0)
+    return removed
+
+
+class BaselinePlanResult(NamedTuple):
+    """Outcome of planning around a deployed baseline."""
+
+    key: PlanKey
+    plan: AllocationPlan
+    kept: List[Tuple[str, ...]]  # pools that keep their baseline CIDR
+    placed: List[Tuple[str, ...]]  # new pools placed in free space
+    moved: List[Tuple[str, ...]]  # baseline pools that need a new CIDR
+    removed: List[Tuple[str, ...]]  # baseline pools no longer configured
+
+
+@timed("baseline_plan")
+def plan_around_baseline(
+    key: PlanKey, baseline_allocations: Mapping[str, Any]
+) -> BaselinePlanResult:
+    """
+    Plan a configuration while keeping every CIDR of a deployed plan that still fits.
+
+    Unlike a full calculation, where adding or reordering pools shifts every
+    later sibling, a pool found in the baseline keeps its CIDR (and reserved
+    CIDR) as long as it lies inside its new parent and does not overlap a
+    sibling kept before it. Only the remaining pools are placed, first fit
+    and in key order, into the free space of their parent, with the size a
+    full calculation would give them.
+
+    Args:
+        key: PlanKey of the new configuration
+        baseline_allocations: Allocations mapping of the deployed plan, e.g.
+            loaded with tfvars_import.load_tfvars()
+
+    Returns:
+        BaselinePlanResult with the new plan and the kept, placed, moved and
+        removed pool paths (tuples of region, BU and environment names)
+
+    Raises:
+        ValueError: If names repeat within a level, or a new pool does not
+            fit the free space left by the kept ones (a full calculation
+            may still fit)
+    """
+    if not all(
+        len(set(items)) == len(items) for items in (key.regions, key.bus, key.envs)
+    ):
+        raise ValueError(
+            "Planning around a baseline needs unique region, BU and environment names"
+        )
+
+    top_network = parse_network(key.top_cidr)
+    top_base = int(top_network.network_address)
+    top_prefix_len = top_network.prefixlen
+    max_prefix_len = top_network.max_prefixlen
+    baseline = _baseline_pools(baseline_allocations, max_prefix_len)
+
+    plan = AllocationPlan(
+        key.top_cidr,
+        key.include_bu_level,
+        key.include_env_level,
+        address_family(key.top_cidr),
+    )
+    top_pool = plan.add_pool(-1, LEVEL_TOP, key.top_cidr, top_base, top_prefix_len)
+    has_bus = key.include_bu_level and bool(key.bus)
+    has_envs = key.include_env_level and bool(key.envs)
+    kept, placed, moved = [], [], []
+
+    def allocate(
+        parent_pool: int,
+        parent_base: int,
+        parent_prefix_len: int,
+        level: int,
+        names: Sequence[str],
+        path: Tuple[str, ...],
+        location: str,
+    ) -> None:
+        child_prefix_len = parent_prefix_len + max(0, (len(names) - 1).bit_length())
+        if level == LEVEL_ENV:
+            child_prefix_len = min(child_prefix_len, key.environment_prefix_target)
+        child_prefix_len = _child_prefix_len(
+            parent_base, parent_prefix_len, child_prefix_len, max_prefix_len
+        )
+        blocks = _place_around_baseline(
+            baseline,
+            names,
+            path,
+            parent_base,
+            parent_prefix_len,
+            child_prefix_len,
+            max_prefix_len,
+        )
+
+        for name in names:
+            block = blocks.get(name)
+            if block is None:
+                raise ValueError(
+                    f"Not enough free space for {_LEVEL_LABELS[level]} {name} "
+                    f"{location}without moving existing pools; "
+                    "recalculate the plan instead"
+                )
+            base, prefix_len, reserved = block
+            child_path = path + (name,)
+            if level == LEVEL_ENV:
+                if reserved is None:
+                    offset, reserved_prefix_len = _reserved_block(
+                        base,
+                        prefix_len,
+                        key.reserved_strategy,
+                        key.reserved_percentage,
+                        max_prefix_len,
+                    )
+                    reserved = (base + offset, reserved_prefix_len)
+                pool = plan.add_pool(
+                    parent_pool, level, name, base, prefix_len, *reserved
+                )
+            else:
+                pool = plan.add_pool(parent_pool, level, name, base, prefix_len)
+
+            old = baseline.get(child_path)
+            if old is None:
+                placed.append(child_path)
+            elif old[:2] == (base, prefix_len):
+                kept.append(child_path)
+            else:
+                moved.append(child_path)
+
+            if level == LEVEL_REGION:
+                child_location = f"in region {name} "
+            else:
+                child_location = f"in BU {name}, region {path[0]} "
+            if level == LEVEL_REGION and has_bus:
+                allocate(
+                    pool,
+                    base,
+                    prefix_len,
+                    LEVEL_BU,
+                    key.bus,
+                    child_path,
+                    child_location,
+                )
+            elif level == LEVEL_REGION and has_envs:
+                placeholder = plan.add_pool(
+                    pool, LEVEL_DEFAULT_BU, "Default", base, prefix_len
+                )
+                allocate(
+                    placeholder,
+                    base,
+                    prefix_len,
+                    LEVEL_ENV,
+                    key.envs,
+                    child_path + ("Default",),
+                    child_location,
+                )
+                plan.close_pool(placeholder)
+            elif level == LEVEL_BU and has_envs:
+                allocate(
+                    pool,
+                    base,
+                    prefix_len,
+                    LEVEL_ENV,
+                    key.envs,
+                    child_path,
+                    child_location,
+                )
+            plan.close_pool(pool)
+
+    allocate(top_pool, top_base, top_prefix_len, LEVEL_REGION, key.regions, (), "")
+    plan.close_pool(top_pool)
+
+    configured = set(kept)
+    configured.update(placed, moved)
+    removed = [path for path in baseline if path not in configured]
+    return BaselinePlanResult(key, plan, kept, placed, moved, removed)
+
+
+_LEVEL_LABELS = {LEVEL_REGION: "region", LEVEL_BU: "BU", LEVEL_ENV: "environment"}
+
+# Integer network address, prefix length and (reserved address, reserved
+# prefix length) of a baseline pool; the reservation is (0, 0) when the pool
+# has none and None when it must be recalculated
+_BaselineBlock = Tuple[int, int, Optional[Tuple[int, int]]]
+
+
+def _baseline_pools(
+    cidr_allocations: Mapping[str, Any], max_prefix_len: int
+) -> Dict[Tuple[str, ...], _BaselineBlock]:
+    """
+    Index the pools of an allocations mapping by path.
+
+    Pools of another address family or with unparsable CIDRs are left out,
+    and reserved CIDRs outside their environment are marked for
+    recalculation.
+    """
+    pools: Dict[Tuple[str, ...], _BaselineBlock] = {}
+
+    def add(path: Tuple[str, ...], pool: Mapping[str, Any]) -> None:
+        try:
+            width, base, prefix_len = parse_block(pool["cidr"][0])
+        except (ValueError, IndexError, KeyError):
+            return
+        if width != max_prefix_len:
+            return
+        reserved = None
+        if "reserved_cidr" in pool:
+            reserved = (0, 0)
+            if pool["reserved_cidr"]:
+                try:
+                    _, reserved_base, reserved_prefix_len = parse_block(
+                        pool["reserved_cidr"]
+                    )
+                except ValueError:
+                    reserved_prefix_len = -1
+                size = 1 << (max_prefix_len - prefix_len)
+                if reserved_prefix_len > prefix_len and (
+                    base <= reserved_base < base + size
+                ):
+                    reserved = (reserved_base, reserved_prefix_len)
+                else:
+                    reserved = None
+        pools[path] = (base, prefix_len, reserved)
+
+    for region, pool in (cidr_allocations.get("regional_cidrs") or {}).items():
+        add((region,), pool)
+    for region, bus in (cidr_allocations.get("bu_cidrs") or {}).items():
+        for bu, pool in bus.items():
+            add((region, bu), pool)
+    for region, bus in (cidr_allocations.get("env_cidrs") or {}).items():
+        for bu, envs in bus.items():
+            for env, pool in envs.items():
+                add((region, bu, env), pool)
+    return pools
+
+
+def _place_around_baseline(
+    baseline: Dict[Tuple[str, ...], _BaselineBlock],
+    names: Sequence[str],
+    path: Tuple[str, ...],
+    parent_base: int,
+    parent_prefix_len: int,
+    child_prefix_len: int,
+    max_prefix_len: int,
+) -> Dict[str, _BaselineBlock]:
+    """
+    Choose the blocks of a parent's children, keeping baseline blocks that still fit.
+
+    Returns:
+        Dictionary of child name -> block; children that fit nowhere are
+        missing
+    """
+    parent_end = parent_base + (1 << (max_prefix_len - parent_prefix_len))
+    candidates = []
+    for name in names:
+        old = baseline.get(path + (name,))
+        if (
+            old is not None
+            and old[1] >= parent_prefix_len
+            and parent_base <= old[0] < parent_end
+        ):
+            candidates.append((old[0], old[1], name))
+
+    # Keep the baseline blocks in address order, dropping any that overlap
+    # an earlier one
+    blocks: Dict[str, _BaselineBlock] = {}
+    occupied: List[Tuple[int, int]] = []
+    for base, prefix_len, name in sorted(candidates):
+        if occupied and base < occupied[-1][1]:
+            continue
+        occupied.append((base, base + (1 << (max_prefix_len - prefix_len))))
+        blocks[name] = baseline[path + (name,)]
+
+    # New children all have the same aligned size, so one cursor sweeps the
+    # gaps between kept blocks from the bottom of the parent upwards
+    size = 1 << (max_prefix_len - child_prefix_len)
+    position = parent_base
+    gap = 0
+    for name in names:
+        if name in blocks:
+            continue
+        while True:
+            position = -(-position // size) * size
+            while gap < len(occupied) and occupied[gap][1] <= position:
+                gap += 1
+            if gap == len(occupied) or occupied[gap][0] >= position + size:
+                break
+            position = occupied[gap][1]
+        if position + size > parent_end:
+            break
+        blocks[name] = (position, child_prefix_len, None)
+        position += size
+    return blocks
+
+
+class TerraformChanges(NamedTuple):
+    """Resource changes Terraform would make to move from one tfvars to another."""
+
+    create: int
+    update: int  # updated in place
+    replace: int  # destroyed and created again
+    destroy: int
+    unchanged: int
+
+    def summary(self) -> str:
+        """Return a one-line summary, e.g. "3 to add, 1 to change, 0 to replace, 0 to destroy"."""
+        return (
+            f"{self.create} to add, {self.update} to change, "
+            f"{self.replace} to replace, {self.destroy} to destroy"
+        )
+
+
+@timed("terraform_changes")
+def terraform_changes(
+    before_allocations: Mapping[str, Any],
+    before_names: Dict[str, Any],
+    after_allocations: Mapping[str, Any],
+    after_names: Dict[str, Any],
+) -> TerraformChanges:
+    """
+    Count the resources of the IPAM module that a tfvars change would touch.
+
+    Each pool, pool CIDR, RAM share and reserved CIDR allocation is keyed by
+    its module address. A resource is replaced when an argument Terraform
+    cannot update in place changes (a CIDR, locale or reserved CIDR) or the
+    pool it belongs to is replaced, and updated when only a description
+    changes.
+
+    Args:
+        before_allocations: Allocations mapping of the deployed plan
+        before_names: Resource names of the deployed plan
+        after_allocations: Allocations mapping of the new plan
+        after_names: Resource names of the new plan
+
+    Returns:
+        TerraformChanges
+    """
+    before = {
+        address: (replace_on, update_on, depends_on)
+        for address, replace_on, update_on, depends_on in _terraform_resources(
+            before_allocations, before_names
+        )
     }
-  )
-}
-
-resource "aws_vpc_ipam_pool_cidr" "env_cidr" {
-  for_each = local.flattened_env_ipam_configs
-
-  ipam_pool_id = aws_vpc_ipam_pool.env[each.key].id
-  cidr         = each.value.cidr[0]
-
-  depends_on = [
-    aws_vpc_ipam_pool.env
-  ]
-}
-
-# Add this to modules/ipam/locals.tf
-
-locals {
-  # Flatten Environment IPAM configs into a list of objects (without BU level)
-  flattened_env_ipam_list = flatten([
-    for region, env_configs in var.env_ipam_configs : [
-      for bu, bu_envs in env_configs : [
-        for env, env_config in bu_envs : merge(
-          env_config,
-          {
-            region = region,
-            bu     = bu,
-            env    = env
-          }
-        )
-      ]
+    create = update = replace = unchanged = 0
+    replaced = set()
+    for address, replace_on, update_on, depends_on in _terraform_resources(
+        after_allocations, after_names
+    ):
+        old = before.pop(address, None)
+        if old is None:
+            create += 1
+        elif old[0] != replace_on or (
+            depends_on is not None and (depends_on in replaced or old[2] != depends_on)
+        ):
+            replaced.add(address)
+            replace += 1
+        elif old[1] != update_on:
+            update += 1
+        else:
+            unchanged += 1
+    return TerraformChanges(create, update, replace, len(before), unchanged)
+
+
+def _terraform_resources(
+    cidr_allocations: Mapping[str, Any], resource_names: Dict[str, Any]
+) -> Iterator[Tuple[str, Tuple, Tuple, Optional[str]]]:
+    """
+    Yield the pool resources the IPAM module creates for a plan, parents first.
+
+    Yields:
+        Tuples of (address, arguments that force replacement, arguments
+        updated in place, address of the resource it is attached to)
+    """
+    regional_cidrs = cidr_allocations["regional_cidrs"]
+    yield "aws_vpc_ipam.this", (), (tuple(sorted(regional_cidrs)),), None
+    yield (
+        "aws_vpc_ipam_pool.top",
+        (),
+        (resource_names["top"]["description"],),
+        None,
+    )
+    yield (
+        "aws_vpc_ipam_pool_cidr.top_cidr",
+        (cidr_allocations["top_cidr"][0],),
+        (),
+        "aws_vpc_ipam_pool.top",
+    )
+
+    regional_names = resource_names["regional"]
+    for region, pool in regional_cidrs.items():
+        address = f'aws_vpc_ipam_pool.regional["{region}"]'
+        yield (
+            address,
+            (pool["locale"],),
+            (regional_names[region]["description"],),
+            "aws_vpc_ipam_pool.top",
+        )
+        yield (
+            f'aws_vpc_ipam_pool_cidr.regional_cidr["{region}"]',
+            (pool["cidr"][0],),
+            (),
+            address,
+        )
+
+    bu_cidrs = cidr_allocations.get("bu_cidrs") or {}
+    for region, bus in bu_cidrs.items():
+        bu_names = resource_names["business_units"][region]
+        for bu, pool in bus.items():
+            address = f'aws_vpc_ipam_pool.bu["{region}-{bu}"]'
+            yield (
+                address,
+                (),
+                (bu_names[bu]["description"],),
+                f'aws_vpc_ipam_pool.regional["{region}"]',
+            )
+            yield (
+                f'aws_vpc_ipam_pool_cidr.bu_cidr["{region}-{bu}"]',
+                (pool["cidr"][0],),
+                (),
+                address,
+            )
+
+    for region, bus in (cidr_allocations.get("env_cidrs") or {}).items():
+        for bu, envs in bus.items():
+            env_names = resource_names["environments"][region][bu]
+            parent = (
+                f'aws_vpc_ipam_pool.bu["{region}-{bu}"]'
+                if bu in bu_cidrs.get(region, ())
+                else f'aws_vpc_ipam_pool.regional["{region}"]'
+            )
+            for env, pool in envs.items():
+                key = f"{region}-{bu}-{env}"
+                names = env_names[env]
+                address = f'aws_vpc_ipam_pool.env["{key}"]'
+                share = f'aws_ram_resource_share.ram_shares["{key}"]'
+                yield address, (), (names["description"],), parent
+                yield (
+                    f'aws_vpc_ipam_pool_cidr.env_cidr["{key}"]',
+                    (pool["cidr"][0],),
+                    (),
+                    address,
+                )
+                yield share, (), (names["description"],), None
+                yield (
+                    f'aws_ram_principal_association.ram_shares_prin_assoc["{key}"]',
+                    (),
+                    (),
+                    share,
+                )
+                yield (
+                    f'aws_ram_resource_association.share_assoc["{key}"]',
+                    (),
+                    (),
+                    address,
+                )
+                if pool.get("reserved_cidr"):
+                    yield (
+                        "aws_vpc_ipam_pool_cidr_allocation.reserved_cidr"
+                        f'["{key}-{pool["reserved_cidr"]}"]',
+                        (f"Reserved CIDR block for {names['name']}",),
+                        (),
+                        address,
+                    )
+
+
+def region_chunks(
+    region_count: int, workers: int, chunk_size: Optional[int] = None
+) -> List[Tuple[int, int]]:
+    """
+    Split region indexes into contiguous (start, stop) chunks for worker processes.
+
+    Args:
+        region_count: Number of regions in the plan
+        workers: Number of worker processes
+        chunk_size: Regions per chunk (defaults to an even split across workers)
+
+    Returns:
+        List of (start, stop) index ranges in region order
+    """
+    if chunk_size is None:
+        chunk_size = max(1, -(-region_count // max(1, workers)))
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    return [
+        (start, min(start + chunk_size, region_count))
+        for start in range(0, region_count, chunk_size)
     ]
-  ])
-
-  # Convert the flattened list into a map
-  flattened_env_ipam_configs = {
-    for env_config in local.flattened_env_ipam_list :
-    "${env_config.region}-${env_config.env}" => env_config
-  }
-}"""
-
-    # If ENV level is skipped (with or without BU level)
-    if not include_env_level:
-        # Return appropriate message
-        return """# No Terraform module modifications are needed if you're only skipping the Environment level.
-# The existing module will work correctly with the modified input variables."""
 
-    return None
+
+class _RegionChunk(NamedTuple):
+    """
+    Everything a worker process sends back for a contiguous range of regions.
+
+    Resource names are not included: the parent names the whole hierarchy
+    lazily in time linear in the number of regions, BUs and environments.
+    """
+
+    plan: AllocationPlan
+    regional_configs: str
+    bu_configs: str
+    env_configs: str
+
+
+def _seeded_plan(key: PlanKey) -> Tuple[AllocationPlan, int, int]:
+    """
+    Create a plan holding the top-level pool and every name of the key.
+
+    Interning all names up front gives every chunk plan the same name ids,
+    so chunk subtrees can be copied into the merged plan verbatim.
+
+    Returns:
+        Tuple of (plan, top-level base address, top-level prefix length)
+    """
+    top_network = parse_network(key.top_cidr)
+    top_base = int(top_network.network_address)
+    top_prefix_len = top_network.prefixlen
+
+    plan = AllocationPlan(
+        key.top_cidr,
+        key.include_bu_level,
+        key.include_env_level,
+        address_family(key.top_cidr),
+    )
+    plan.add_pool(-1, LEVEL_TOP, key.top_cidr, top_base, top_prefix_len)
+    for name in key.regions + key.bus + key.envs + ("Default",):
+        plan.intern(name)
+    return plan, top_base, top_prefix_len
+
+
+def _plan_region_chunk(key: PlanKey, start: int, stop: int) -> _RegionChunk:
+    """Plan, name and render regions[start:stop] (runs in a worker process)."""
+    regions = list(key.regions)
+    bus = list(key.bus) or None
+    envs = list(key.envs) or None
+
+    plan, top_base, top_prefix_len = _seeded_plan(key)
+    _allocate_regions(
+        plan,
+        0,
+        top_base,
+        top_prefix_len,
+        regions,
+        bus,
+        envs,
+        key.include_bu_level,
+        key.include_env_level,
+        key.environment_prefix_target,
+        key.reserved_strategy,
+        key.reserved_percentage,
+        start,
+        stop,
+    )
+    plan.close_pool(0)
+
+    resource_names = generate_resource_names(
+        key.top_cidr,
+        regions[start:stop],
+        bus,
+        envs,
+        key.include_bu_level,
+        key.include_env_level,
+        key.name_templates,
+    )
+    cidr_allocations = plan.as_mapping()
+    bu_configs = env_configs = ""
+    if "bu_cidrs" in cidr_allocations:
+        bu_configs = "".join(
+            _iter_bu_configs(cidr_allocations["bu_cidrs"], resource_names)
+        )
+    if "env_cidrs" in cidr_allocations:
+        env_configs = "".join(
+            _iter_env_configs(cidr_allocations["env_cidrs"], resource_names)
+        )
+    return _RegionChunk(
+        plan,
+        "".join(
+            _iter_regional_configs(cidr_allocations["regional_cidrs"], resource_names)
+        ),
+        bu_configs,
+        env_configs,
+    )
+
+
+@timed("parallel_configuration")
+def build_ipam_configuration_parallel(
+    key: PlanKey, workers: Optional[int] = None, chunk_size: Optional[int] = None
+) -> IpamConfiguration:
+    """
+    Run the full pipeline with regional subtrees fanned out to a process pool.
+
+    Once the regional prefix length is fixed, every region is an independent
+    subtree: workers plan, name and render contiguous chunks of regions, and
+    the chunks are merged in region order, so the result (including any
+    error raised) is identical to build_ipam_configuration(). Plans with a
+    single chunk or repeated names are calculated serially.
+
+    Args:
+        key: PlanKey as returned by plan_key()
+        workers: Number of worker processes (defaults to the CPU count)
+        chunk_size: Regions per worker task (defaults to an even split)
+
+    Returns:
+        IpamConfiguration with all generated artifacts
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = region_chunks(len(key.regions), workers, chunk_size)
+    unique_names = all(
+        len(set(items)) == len(items) for items in (key.regions, key.bus, key.envs)
+    )
+    if len(chunks) < 2 or not unique_names:
+        return build_ipam_configuration(key)
+
+    # Imported here so that serial callers (e.g. the CLI) skip multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        results = list(
+            executor.map(
+                _plan_region_chunk,
+                [key] * len(chunks),
+                [start for start, _ in chunks],
+                [stop for _, stop in chunks],
+            )
+        )
+
+    plan, _, _ = _seeded_plan(key)
+    for result in results:
+        for region_pool in result.plan.children(0):
+            plan.copy_subtree(result.plan, region_pool, 0)
+    plan.close_pool(0)
+
+    # Names are lazy, so naming the whole hierarchy here is cheaper than
+    # shipping and merging the chunks' names
+    resource_names = generate_resource_names(
+        key.top_cidr,
+        list(key.regions),
+        list(key.bus) or None,
+        list(key.envs) or None,
+        key.include_bu_level,
+        key.include_env_level,
+        key.name_templates,
+    )
+
+    cidr_allocations = plan.as_mapping()
+    terraform_output = "".join(
+        _iter_terraform_output(
+            cidr_allocations,
+            resource_names,
+            key.include_bu_level,
+            key.include_env_level,
+            lambda *_: [result.regional_configs for result in results],
+            lambda *_: [result.bu_configs for result in results],
+            lambda *_: [result.env_configs for result in results],
+        )
+    )
+    return IpamConfiguration(
+        cidr_allocations,
+        resource_names,
+        terraform_output,
+        get_modified_terraform_module(key.include_bu_level, key.include_env_level),
+    )
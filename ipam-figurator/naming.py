@@ -0,0 +1,308 @@
+"""
+Names and descriptions of the IPAM pools, generated from user-configurable
+templates such as "ipam-{env_lower}-{bu_lower}-{region}".
+
+Templates are validated and compiled once into positional format strings.
+The names of a hierarchy are exposed as read-only nested mappings that
+format a pool's name and description only when it is looked up, so naming
+a plan costs O(regions + BUs + environments) up front, however many pools
+it has.
+"""
+
+import string
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from regions import get_region_display_name
+
+# Placeholder BU that holds the environments when the BU level is skipped
+PLACEHOLDER_BU = "Default"
+
+# Template fields in positional order: each level appends its own values
+TEMPLATE_FIELDS = (
+    "region",
+    "region_name",
+    "bu",
+    "bu_lower",
+    "env",
+    "env_lower",
+    "env_title",
+)
+
+_REGION_FIELDS = frozenset(TEMPLATE_FIELDS[:2])
+_BU_FIELDS = frozenset(TEMPLATE_FIELDS[:4])
+_ENV_FIELDS = frozenset(TEMPLATE_FIELDS)
+_DEFAULT_ENV_FIELDS = _ENV_FIELDS - {"bu", "bu_lower"}
+
+
+class NameTemplates(NamedTuple):
+    """
+    Name and description templates of each pool level.
+
+    Regional templates may use {region} and {region_name} (the display
+    name, e.g. "US East (N. Virginia)"); BU templates add {bu} and
+    {bu_lower}; environment templates add {env}, {env_lower} and
+    {env_title}. The default_env templates name environments when the BU
+    level is skipped and cannot use the BU fields. Standard format specs
+    such as {bu_lower:.8} are allowed.
+    """
+
+    top_name: str = "ipam-top"
+    top_description: str = "Top-Level Multi-Region IPAM Pool"
+    region_name: str = "ipam-regional-{region}"
+    region_description: str = "Regional IPAM Pool for {region_name}"
+    bu_name: str = "ipam-bu-{bu_lower}-{region}"
+    bu_description: str = "{bu} Business Unit IPAM Pool for {region_name}"
+    env_name: str = "ipam-{env_lower}-{bu_lower}-{region}"
+    env_description: str = "{env_title} Environment IPAM Pool for {bu} in {region_name}"
+    default_env_name: str = "ipam-{env_lower}-{region}"
+    default_env_description: str = "{env_title} Environment IPAM Pool for {region_name}"
+
+
+DEFAULT_NAME_TEMPLATES = NameTemplates()
+
+# Template fields allowed per NameTemplates field
+_ALLOWED_FIELDS: Dict[str, FrozenSet[str]] = {
+    "top_name": frozenset(),
+    "top_description": frozenset(),
+    "region_name": _REGION_FIELDS,
+    "region_description": _REGION_FIELDS,
+    "bu_name": _BU_FIELDS,
+    "bu_description": _BU_FIELDS,
+    "env_name": _ENV_FIELDS,
+    "env_description": _ENV_FIELDS,
+    "default_env_name": _DEFAULT_ENV_FIELDS,
+    "default_env_description": _DEFAULT_ENV_FIELDS,
+}
+
+# (name format, description format) of one level
+_Formats = Tuple[str, str]
+
+
+class CompiledTemplates(NamedTuple):
+    """NameTemplates as positional format strings over TEMPLATE_FIELDS."""
+
+    top: _Formats
+    region: _Formats
+    bu: _Formats
+    env: _Formats
+    default_env: _Formats
+
+
+def name_templates_from_mapping(overrides: Mapping[str, str]) -> NameTemplates:
+    """
+    Build NameTemplates from a mapping of overridden templates.
+
+    Args:
+        overrides: NameTemplates field name -> template
+
+    Returns:
+        NameTemplates with the defaults for fields that are not overridden
+
+    Raises:
+        ValueError: If a key is not a template field or a template is invalid
+    """
+    unknown = sorted(set(overrides) - set(NameTemplates._fields))
+    if unknown:
+        raise ValueError(f"Unknown name templates: {', '.join(unknown)}")
+    templates = DEFAULT_NAME_TEMPLATES._replace(**overrides)
+    compile_templates(templates)
+    return templates
+
+
+@lru_cache(maxsize=16)
+def compile_templates(templates: NameTemplates) -> CompiledTemplates:
+    """
+    Validate templates and convert their named fields to positional ones.
+
+    Args:
+        templates: Templates to compile
+
+    Returns:
+        CompiledTemplates
+
+    Raises:
+        ValueError: If a template is not a string, uses a field its level
+            does not provide or has an invalid format spec
+    """
+    compiled = {
+        field: _compile(field, template)
+        for field, template in zip(NameTemplates._fields, templates)
+    }
+    return CompiledTemplates(
+        *(
+            (compiled[f"{level}_name"], compiled[f"{level}_description"])
+            for level in ("top", "region", "bu", "env", "default_env")
+        )
+    )
+
+
+def _compile(field: str, template: str) -> str:
+    """Convert one template to a positional format string, validating it."""
+    if not isinstance(template, str):
+        raise ValueError(f"Name template {field} must be a string")
+    try:
+        parsed = list(string.Formatter().parse(template))
+    except ValueError as e:
+        raise ValueError(f"Invalid name template {field} {template!r}: {e}") from e
+
+    allowed = _ALLOWED_FIELDS[field]
+    parts = []
+    for literal, name, format_spec, conversion in parsed:
+        parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        if name is None:
+            continue
+        if name not in allowed:
+            raise ValueError(
+                f"Name template {field} cannot use {{{name}}}"
+                f" (available: {', '.join(sorted(allowed)) or 'none'})"
+            )
+        parts.append(
+            "{"
+            + str(TEMPLATE_FIELDS.index(name))
+            + (f"!{conversion}" if conversion else "")
+            + (f":{format_spec}" if format_spec else "")
+            + "}"
+        )
+    compiled = "".join(parts)
+
+    # Catch bad format specs now rather than on the first lookup
+    try:
+        compiled.format(*TEMPLATE_FIELDS)
+    except (ValueError, IndexError, KeyError) as e:
+        raise ValueError(f"Invalid name template {field} {template!r}: {e}") from e
+    return compiled
+
+
+def _region_values(region: str) -> Tuple[str, ...]:
+    return region, get_region_display_name(region)
+
+
+def _bu_values(bu: str) -> Tuple[str, ...]:
+    return bu, bu.lower()
+
+
+def _env_values(env: str) -> Tuple[str, ...]:
+    return env, env.lower(), env.capitalize()
+
+
+class _Level(NamedTuple):
+    keys: Tuple[str, ...]
+    # Pool name -> its template field values, computed once per name
+    values: Dict[str, Tuple[str, ...]]
+
+
+class PoolNames(Mapping):
+    """
+    Read-only names of the pools under one parent, keyed by pool name.
+
+    Values are nested PoolNames down to the last level, whose values are
+    {"name": ..., "description": ...} dictionaries formatted on access.
+    Instances compare equal to the equivalent plain dictionaries and are
+    picklable.
+    """
+
+    __slots__ = ("_levels", "_formats", "_context")
+
+    def __init__(
+        self, levels: Tuple[_Level, ...], formats: _Formats, context: Tuple = ()
+    ):
+        self._levels = levels
+        self._formats = formats
+        self._context = context
+
+    def __getitem__(self, key: str):
+        context = self._context + self._levels[0].values[key]
+        if len(self._levels) > 1:
+            return PoolNames(self._levels[1:], self._formats, context)
+        name_format, description_format = self._formats
+        return {
+            "name": name_format.format(*context),
+            "description": description_format.format(*context),
+        }
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._levels[0].keys)
+
+    def __len__(self) -> int:
+        return len(self._levels[0].keys)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._levels[0].values
+
+    def __repr__(self) -> str:
+        return f"PoolNames({dict(self.items())!r})"
+
+
+def _level(items: Sequence[str], values: Callable[[str], Tuple[str, ...]]) -> _Level:
+    level_values = {item: values(item) for item in items}
+    return _Level(tuple(level_values), level_values)
+
+
+def resource_names(
+    regions: List[str],
+    bus: Optional[List[str]] = None,
+    envs: Optional[List[str]] = None,
+    include_bu_level: bool = True,
+    include_env_level: bool = True,
+    templates: Optional[NameTemplates] = None,
+) -> Dict[str, Any]:
+    """
+    Name every pool of a hierarchy from compiled templates.
+
+    Args:
+        regions: List of AWS regions
+        bus: List of business unit names
+        envs: List of environment names
+        include_bu_level: Whether to include business unit level
+        include_env_level: Whether to include environment level
+        templates: Name templates (DEFAULT_NAME_TEMPLATES if None)
+
+    Returns:
+        Dictionary with "top", "regional", "business_units" and
+        "environments" names, nested by region, BU and environment
+
+    Raises:
+        ValueError: If a template is invalid
+    """
+    compiled = compile_templates(templates or DEFAULT_NAME_TEMPLATES)
+    region_level = _level(regions, _region_values)
+    top_name, top_description = compiled.top
+
+    bu_names: Mapping[str, Any] = {}
+    env_names: Mapping[str, Any] = {}
+    if include_bu_level and bus:
+        bu_level = _level(bus, _bu_values)
+        bu_names = PoolNames((region_level, bu_level), compiled.bu)
+        if include_env_level and envs:
+            env_names = PoolNames(
+                (region_level, bu_level, _level(envs, _env_values)), compiled.env
+            )
+    elif include_env_level and envs:
+        env_names = PoolNames(
+            (
+                region_level,
+                _level([PLACEHOLDER_BU], _bu_values),
+                _level(envs, _env_values),
+            ),
+            compiled.default_env,
+        )
+
+    return {
+        "top": {"name": top_name.format(), "description": top_description.format()},
+        "regional": PoolNames((region_level,), compiled.region),
+        "business_units": bu_names,
+        "environments": env_names,
+    }
@@ -0,0 +1,335 @@
+"""
+Offline verification of a calculated IPAM hierarchy, replicating (and
+completing) the CIDR checks of the Terraform module before any tfvars are
+emitted: every pool lies inside its parent, sibling pools never overlap and
+every reserved CIDR lies inside its environment.
+"""
+
+from bisect import bisect_right
+from collections import defaultdict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from allocation_plan import (
+    IPV6_MAX_PREFIXLEN,
+    LEVEL_ENV,
+    AllocationPlan,
+    format_cidr,
+    format_ipv6_cidr,
+)
+from cidr_index import parse_block
+from instrumentation import timed
+
+# Issues listed in a PlanVerificationError message before it is truncated
+MAX_REPORTED_ISSUES = 5
+
+# (address width, first address, last address)
+_Interval = Tuple[int, int, int]
+
+
+class VerificationIssue(NamedTuple):
+    """A broken invariant of the hierarchy."""
+
+    path: Tuple[str, ...]
+    message: str
+
+
+class PlanVerificationError(ValueError):
+    """Raised when a plan fails verification; carries every issue found."""
+
+    def __init__(self, issues: List[VerificationIssue]):
+        self.issues = issues
+        lines = [
+            f"{'/'.join(issue.path) or 'top'}: {issue.message}"
+            for issue in issues[:MAX_REPORTED_ISSUES]
+        ]
+        if len(issues) > MAX_REPORTED_ISSUES:
+            lines.append(f"... and {len(issues) - MAX_REPORTED_ISSUES} more")
+        super().__init__(
+            f"Plan failed verification with {len(issues)} issue(s): " + "; ".join(lines)
+        )
+
+
+class _Pool(NamedTuple):
+    key: Hashable
+    parent: Optional[Hashable]
+    intervals: List[_Interval]
+    reserved: Optional[_Interval]
+
+
+@timed("verification")
+def verify_allocations(cidr_allocations: Mapping[str, Any]) -> List[VerificationIssue]:
+    """
+    Verify CIDR allocations shaped like the tfvars output.
+
+    Plans returned by calculate_cidr_allocations are checked straight from
+    their integer columns; other mappings (for example parsed from an
+    existing tfvars file) are parsed first.
+
+    Args:
+        cidr_allocations: Mapping with "top_cidr", "regional_cidrs" and
+            optionally "bu_cidrs" and "env_cidrs"
+
+    Returns:
+        List of issues, empty if the hierarchy is consistent
+    """
+    plan = getattr(cidr_allocations, "plan", None)
+    if isinstance(plan, AllocationPlan):
+        return verify_plan(plan)
+
+    issues: List[VerificationIssue] = []
+    pools = list(_mapping_pools(cidr_allocations, issues))
+    issues.extend(_verify_pools(pools, lambda key: key))
+    return issues
+
+
+def verify_plan(plan: AllocationPlan) -> List[VerificationIssue]:
+    """
+    Verify an AllocationPlan without formatting any CIDR strings.
+
+    Every pool has a single block, so containment is two comparisons with
+    the parent, and each parent's children (normally appended in address
+    order) are swept once, sorting them only if they are out of order.
+
+    Args:
+        plan: Calculated allocation plan
+
+    Returns:
+        List of issues, empty if the hierarchy is consistent
+    """
+    width = plan.max_prefix_len
+    base, parent, level = plan.base, plan.parent, plan.level
+    reserved_base, reserved_prefix_len = plan.reserved_base, plan.reserved_prefix_len
+    ends = [
+        start + (1 << (width - prefix_len)) - 1
+        for start, prefix_len in zip(base, plan.prefix_len)
+    ]
+    issues: List[VerificationIssue] = []
+    children: Dict[int, List[int]] = defaultdict(list)
+
+    for index in range(1, len(plan)):
+        parent_index = parent[index]
+        children[parent_index].append(index)
+        if base[index] < base[parent_index] or ends[index] > ends[parent_index]:
+            issues.append(
+                VerificationIssue(
+                    plan.path(index),
+                    f"{plan.cidr(index)} is not inside its parent pool"
+                    f" ({plan.cidr(parent_index)})",
+                )
+            )
+        if level[index] == LEVEL_ENV and reserved_prefix_len[index]:
+            reserved_start = reserved_base[index]
+            reserved_end = (
+                reserved_start + (1 << (width - reserved_prefix_len[index])) - 1
+            )
+            if reserved_start < base[index] or reserved_end > ends[index]:
+                issues.append(
+                    VerificationIssue(
+                        plan.path(index),
+                        f"reserved CIDR {plan.reserved_cidr(index)} is not inside"
+                        f" {plan.cidr(index)}",
+                    )
+                )
+
+    for siblings in children.values():
+        if any(
+            base[later] <= base[earlier]
+            for earlier, later in zip(siblings, siblings[1:])
+        ):
+            siblings.sort(key=lambda index: (base[index], ends[index]))
+        widest = siblings[0]
+        for index in siblings[1:]:
+            if base[index] <= ends[widest]:
+                issues.append(
+                    VerificationIssue(
+                        plan.path(index),
+                        f"{plan.cidr(index)} overlaps {plan.cidr(widest)}"
+                        f" of sibling {'/'.join(plan.path(widest))}",
+                    )
+                )
+            if ends[index] > ends[widest]:
+                widest = index
+
+    return issues
+
+
+def ensure_valid(cidr_allocations: Mapping[str, Any]) -> None:
+    """
+    Verify CIDR allocations and raise if any invariant is broken.
+
+    Args:
+        cidr_allocations: Mapping as accepted by verify_allocations()
+
+    Raises:
+        PlanVerificationError: If verification finds any issue
+    """
+    issues = verify_allocations(cidr_allocations)
+    if issues:
+        raise PlanVerificationError(issues)
+
+
+def _mapping_pools(
+    cidr_allocations: Mapping[str, Any], issues: List[VerificationIssue]
+) -> Iterator[_Pool]:
+    """Yield every pool of an allocations mapping, keyed by its path."""
+
+    def intervals(path: Tuple[str, ...], cidrs: Iterable[str]) -> List[_Interval]:
+        parsed = []
+        for cidr in cidrs:
+            interval = parse(path, cidr)
+            if interval is not None:
+                parsed.append(interval)
+        return parsed
+
+    def parse(path: Tuple[str, ...], cidr: str) -> Optional[_Interval]:
+        try:
+            width, start, prefix_len = parse_block(cidr)
+        except ValueError as e:
+            issues.append(VerificationIssue(path, str(e)))
+            return None
+        return width, start, start + (1 << (width - prefix_len)) - 1
+
+    yield _Pool((), None, intervals((), cidr_allocations["top_cidr"]), None)
+
+    for region, regional in cidr_allocations["regional_cidrs"].items():
+        yield _Pool((region,), (), intervals((region,), regional["cidr"]), None)
+
+    bu_cidrs = cidr_allocations.get("bu_cidrs") or {}
+    for region, bus in bu_cidrs.items():
+        for bu, bu_config in bus.items():
+            path = (region, bu)
+            yield _Pool(path, (region,), intervals(path, bu_config["cidr"]), None)
+
+    for region, groups in (cidr_allocations.get("env_cidrs") or {}).items():
+        for bu, envs in groups.items():
+            # Without a BU level, environments sit under a placeholder BU
+            # and belong to the regional pool
+            parent = (region, bu) if bu in bu_cidrs.get(region, ()) else (region,)
+            for env, env_config in envs.items():
+                path = (region, bu, env)
+                reserved_cidr = env_config.get("reserved_cidr")
+                yield _Pool(
+                    path,
+                    parent,
+                    intervals(path, env_config["cidr"]),
+                    parse(path, reserved_cidr) if reserved_cidr else None,
+                )
+
+
+def _verify_pools(
+    pools: Iterable[_Pool], describe: Callable[[Hashable], Tuple[str, ...]]
+) -> List[VerificationIssue]:
+    """
+    Check containment, sibling overlap and reserved CIDRs of a pool hierarchy.
+
+    Each parent's intervals are sorted once so containment is a binary
+    search, and each set of siblings is sorted once and swept for overlaps,
+    which keeps the whole check O(n log n).
+
+    Args:
+        pools: Every pool, parents before their children
+        describe: Turns a pool key into the path used in issues
+
+    Returns:
+        List of issues
+    """
+    issues: List[VerificationIssue] = []
+    parents: Dict[Hashable, Tuple[List[_Interval], List[Tuple[int, int]]]] = {}
+    siblings: Dict[Hashable, List[Tuple[_Interval, Hashable]]] = defaultdict(list)
+
+    for pool in pools:
+        intervals = sorted(pool.intervals)
+        parents[pool.key] = (
+            intervals,
+            [(width, start) for width, start, _ in intervals],
+        )
+
+        if pool.parent is not None:
+            parent = parents.get(pool.parent)
+            if parent is None:
+                issues.append(
+                    VerificationIssue(describe(pool.key), "has no parent pool")
+                )
+            # A parent without a valid CIDR was already reported
+            elif parent[0]:
+                for interval in intervals:
+                    if not _contained(interval, *parent):
+                        issues.append(
+                            VerificationIssue(
+                                describe(pool.key),
+                                f"{_format(interval)} is not inside its parent pool"
+                                f" ({', '.join(map(_format, parent[0]))})",
+                            )
+                        )
+            siblings[pool.parent].extend((interval, pool.key) for interval in intervals)
+
+        if pool.reserved is not None and not _contained(
+            pool.reserved, intervals, parents[pool.key][1]
+        ):
+            issues.append(
+                VerificationIssue(
+                    describe(pool.key),
+                    f"reserved CIDR {_format(pool.reserved)} is not inside"
+                    f" {', '.join(map(_format, intervals))}",
+                )
+            )
+
+    for children in siblings.values():
+        children.sort()
+        previous_end = previous = None
+        for interval, key in children:
+            width, start, end = interval
+            if (
+                previous is not None
+                and previous[0][0] == width
+                and start <= previous_end
+            ):
+                if key != previous[1]:
+                    issues.append(
+                        VerificationIssue(
+                            describe(key),
+                            f"{_format(interval)} overlaps {_format(previous[0])}"
+                            f" of sibling {'/'.join(describe(previous[1]))}",
+                        )
+                    )
+            if previous is None or previous[0][0] != width or end > previous_end:
+                previous_end, previous = end, (interval, key)
+
+    return issues
+
+
+def _contained(
+    interval: _Interval,
+    parent_intervals: List[_Interval],
+    parent_starts: List[Tuple[int, int]],
+) -> bool:
+    """Return whether an interval lies inside one of a parent's sorted intervals."""
+    width, start, end = interval
+    if len(parent_intervals) == 1:
+        parent_width, parent_start, parent_end = parent_intervals[0]
+        return parent_width == width and parent_start <= start and end <= parent_end
+    i = bisect_right(parent_starts, (width, start)) - 1
+    if i < 0:
+        return False
+    parent_width, _, parent_end = parent_intervals[i]
+    return parent_width == width and end <= parent_end
+
+
+def _format(interval: _Interval) -> str:
+    width, start, end = interval
+    prefix_len = width - (end - start + 1).bit_length() + 1
+    if width == IPV6_MAX_PREFIXLEN:
+        return format_ipv6_cidr(start, prefix_len)
+    return format_cidr(start, prefix_len)
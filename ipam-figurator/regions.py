@@ -0,0 +1,66 @@
+from typing import Dict, List, Tuple
+
+# Regions that support IPAM, in catalog order
+_IPAM_REGIONS: Tuple[Dict[str, str], ...] = (
+    {"code": "us-east-1", "name": "US East (N. Virginia)"},
+    {"code": "us-east-2", "name": "US East (Ohio)"},
+    {"code": "us-west-1", "name": "US West (N. California)"},
+    {"code": "us-west-2", "name": "US West (Oregon)"},
+    {"code": "ca-central-1", "name": "Canada (Central)"},
+    {"code": "eu-north-1", "name": "EU North (Stockholm)"},
+    {"code": "eu-west-1", "name": "EU West (Ireland)"},
+    {"code": "eu-west-2", "name": "EU West (London)"},
+    {"code": "eu-west-3", "name": "EU West (Paris)"},
+    {"code": "eu-central-1", "name": "EU Central (Frankfurt)"},
+    {"code": "eu-south-1", "name": "EU South (Milan)"},
+    {"code": "ap-northeast-1", "name": "AP Northeast (Tokyo)"},
+    {"code": "ap-northeast-2", "name": "AP Northeast (Seoul)"},
+    {"code": "ap-northeast-3", "name": "AP Northeast (Osaka)"},
+    {"code": "ap-southeast-1", "name": "AP Southeast (Singapore)"},
+    {"code": "ap-southeast-2", "name": "AP Southeast (Sydney)"},
+    {"code": "ap-south-1", "name": "AP South (Mumbai)"},
+    {"code": "sa-east-1", "name": "SA East (São Paulo)"},
+    {"code": "af-south-1", "name": "Africa (Cape Town)"},
+    {"code": "me-south-1", "name": "Middle East (Bahrain)"},
+)
+
+# Region code prefixes of each geography shown in the region picker
+GEOGRAPHY_PREFIXES: Dict[str, Tuple[str, ...]] = {
+    "americas": ("us-", "ca-", "sa-"),
+    "emea": ("eu-", "me-", "af-"),
+    "apac": ("ap-",),
+}
+
+# Indexes built once at import
+_DISPLAY_NAMES: Dict[str, str] = {
+    region["code"]: region["name"] for region in _IPAM_REGIONS
+}
+_REGIONS_BY_GEOGRAPHY: Dict[str, Tuple[Dict[str, str], ...]] = {
+    geography: tuple(
+        region for region in _IPAM_REGIONS if region["code"].startswith(prefixes)
+    )
+    for geography, prefixes in GEOGRAPHY_PREFIXES.items()
+}
+
+
+def get_ipam_regions() -> List[Dict[str, str]]:
+    """Return a list of AWS regions that support IPAM with their display names."""
+    return list(_IPAM_REGIONS)
+
+
+def get_regions_by_geography(geography: str) -> List[Dict[str, str]]:
+    """
+    Return the IPAM regions of one geography, in catalog order.
+
+    Args:
+        geography: "americas", "emea" or "apac"
+
+    Returns:
+        List of {"code", "name"} region entries
+    """
+    return list(_REGIONS_BY_GEOGRAPHY[geography])
+
+
+def get_region_display_name(region_code: str) -> str:
+    """Convert AWS region code to a human-readable display name."""
+    return _DISPLAY_NAMES.get(region_code, region_code)
@@ -0,0 +1,425 @@
+"""
+Load a terraform.tfvars (or terraform.tfvars.json) written by this tool back
+into the allocation and resource-name structures that
+generate_terraform_output() consumes, so a deployed plan can be diffed,
+verified, visualized, re-emitted or used as the baseline of a new one.
+
+The parser reads the file in chunks and builds the variables in a single
+pass, so besides the parsed values memory only holds about a megabyte of
+text (or one line, if longer, as in minified JSON). It understands the HCL
+subset the generator emits (attributes whose values are strings, lists,
+nested objects, numbers and booleans, with # and // comments) and, because
+JSON is made of the same tokens, .tfvars.json files. Heredocs, interpolation
+and expressions are not supported.
+"""
+
+import contextlib
+import gc
+import json
+import re
+import sys
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+# Characters read at a time; each chunk is parsed up to its last newline, so
+# a single line is never split
+CHUNK_SIZE = 1 << 20
+
+_NAME = r'(?:"[^"\\\n]*"|[A-Za-z_][\w.\-]*)[ \t]*[=:][ \t]*'
+_STRING_LIST = r'\[(?:\s*"[^"\\\n]*"\s*,?)*\s*\]'
+
+# The generator's `key = "value"` and `key = ["value", ...]` attributes,
+# `key = {` openings and whole objects of such attributes (every pool) are
+# each matched as one token; everything else (including a pool split
+# between two chunks) falls back to single strings, literals and punctuation
+_TOKEN = re.compile(
+    rf"""
+    (?P<space>\s+|\#[^\n]*|//[^\n]*)
+    |(?:"(?P<quoted>[^"\\\n]*)"|(?P<name>[A-Za-z_][\w.\-]*))[ \t]*[=:][ \t]*(?:
+        "(?P<pair>[^"\\\n]*)"
+        |(?P<list>{_STRING_LIST})
+        |\{{(?P<object>(?:\s*{_NAME}(?:"[^"\\\n]*"|{_STRING_LIST})[ \t]*,?)*\s*)\}}
+        |(?P<open>\{{)
+    )
+    |(?P<string>"(?:[^"\\\n]|\\.)*")
+    |(?P<punct>[{{}}\[\],=:])
+    |(?P<bare>[\w.+\-]+)
+    |(?P<error>.)
+    """,
+    re.VERBOSE,
+)
+_ATTRIBUTE = re.compile(
+    r'(?:"([^"\\\n]*)"|([A-Za-z_][\w.\-]*))[ \t]*[=:][ \t]*(?:"([^"\\\n]*)"|(\[)([^\]]*)\])'
+)
+_LIST_ITEM = re.compile(r'"([^"\\\n]*)"')
+
+_LITERALS = {"true": True, "false": False, "null": None}
+_ATTRIBUTE_KINDS = frozenset(("pair", "list", "object", "open"))
+
+
+class TfvarsPlan(NamedTuple):
+    """A plan loaded from a tfvars document."""
+
+    cidr_allocations: Dict[str, Any]
+    resource_names: Dict[str, Any]
+    include_bu_level: bool
+    include_env_level: bool
+
+
+def load_tfvars(path: str) -> TfvarsPlan:
+    """
+    Load a plan from a terraform.tfvars or terraform.tfvars.json file.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        TfvarsPlan
+
+    Raises:
+        ValueError: If the file cannot be parsed or lacks the IPAM variables
+    """
+    with open(path, encoding="utf-8") as stream:
+        try:
+            return read_tfvars(stream)
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}") from e
+
+
+def read_tfvars(stream: TextIO) -> TfvarsPlan:
+    """
+    Load a plan from a text stream of HCL or JSON tfvars.
+
+    Args:
+        stream: Text stream, e.g. an open file or io.StringIO
+
+    Returns:
+        TfvarsPlan
+
+    Raises:
+        ValueError: If the text cannot be parsed or lacks the IPAM variables
+    """
+    return plan_from_variables(parse_tfvars(stream))
+
+
+def parse_tfvars(source: Union[str, TextIO]) -> Dict[str, Any]:
+    """
+    Parse the variables of a tfvars document.
+
+    Args:
+        source: HCL or JSON text, or a text stream to read it from
+
+    Returns:
+        Dictionary of variable name -> value (str, list, dict, number, bool
+        or None)
+
+    Raises:
+        ValueError: If the text is not in the supported subset
+    """
+    parser = _Parser()
+    with _gc_paused():
+        if isinstance(source, str):
+            parser.feed(source)
+            return parser.close()
+
+        rest = ""
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                parser.feed(rest)
+                return parser.close()
+            text = rest + chunk
+            cut = text.rfind("\n") + 1
+            parser.feed(text[:cut])
+            rest = text[cut:]
+
+
+@contextlib.contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Pause the cyclic garbage collector.
+
+    Parsing creates millions of containers without reference cycles, which
+    would otherwise trigger repeated full collections over everything parsed
+    so far.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class _Parser:
+    """Push-down parser fed with text that ends on a line boundary."""
+
+    def __init__(self):
+        self.root: Dict[str, Any] = {}
+        # Open containers, innermost last; the root object has no braces in
+        # HCL
+        self.stack: List[Union[Dict[str, Any], List[Any]]] = [self.root]
+        # Attribute name waiting for its value, and whether its "=" was seen
+        self.key: Optional[str] = None
+        self.separated = False
+        self.started = False
+        # JSON documents wrap the variables in braces
+        self.braced = False
+        self.closed = False
+        self.line = 1
+
+    def feed(self, text: str) -> None:
+        """Parse the next part of the document."""
+        stack = self.stack
+        intern = sys.intern
+        container = stack[-1]
+        key = self.key
+        separated = self.separated
+        for match in _TOKEN.finditer(text):
+            kind = match.lastgroup
+            if kind == "space":
+                continue
+            if self.closed:
+                self._fail(text, match, "unexpected text after the document")
+            if not self.started:
+                self.started = True
+                if match.group() == "{":
+                    self.braced = True
+                    continue
+
+            if kind in _ATTRIBUTE_KINDS:
+                if key is not None or container.__class__ is not dict:
+                    self._fail(text, match, "unexpected attribute")
+                group = match.group
+                name = group("quoted")
+                name = intern(group("name") if name is None else name)
+                if kind == "pair":
+                    container[name] = group("pair")
+                elif kind == "object":
+                    # A pool: an object of plain strings and lists of them
+                    value = {}
+                    for quoted, bare, string, bracket, items in _ATTRIBUTE.findall(
+                        group("object")
+                    ):
+                        value[intern(quoted or bare)] = (
+                            _LIST_ITEM.findall(items) if bracket else string
+                        )
+                    container[name] = value
+                elif kind == "list":
+                    container[name] = _LIST_ITEM.findall(group("list"))
+                else:
+                    container[name] = value = {}
+                    stack.append(value)
+                    container = value
+                continue
+
+            value = match.group()
+            if kind == "punct":
+                if value == ",":
+                    if key is not None:
+                        self._fail(text, match, f"missing value for {key}")
+                    continue
+                if value == "=" or value == ":":
+                    if key is None or separated:
+                        self._fail(text, match, f"unexpected {value!r}")
+                    separated = True
+                    continue
+                if value == "}" or value == "]":
+                    if key is not None:
+                        self._fail(text, match, f"missing value for {key}")
+                    if (value == "}") != (container.__class__ is dict):
+                        self._fail(text, match, f"unexpected {value!r}")
+                    if len(stack) == 1:
+                        if not self.braced:
+                            self._fail(text, match, f"unexpected {value!r}")
+                        self.closed = True
+                        continue
+                    stack.pop()
+                    container = stack[-1]
+                    continue
+                item: Any = {} if value == "{" else []
+            elif kind == "string":
+                item = json.loads(value) if "\\" in value else value[1:-1]
+            elif kind != "bare":
+                self._fail(text, match, f"unexpected {value!r}")
+
+            if container.__class__ is dict and key is None:
+                if kind == "punct":
+                    self._fail(text, match, "expected an attribute name")
+                key = intern(item if kind == "string" else value)
+                separated = False
+                continue
+            if kind == "bare":
+                item = _LITERALS.get(value, value)
+                if item is value:
+                    item = _number(value)
+                    if item is None:
+                        self._fail(text, match, f"unsupported value {value!r}")
+
+            if container.__class__ is dict:
+                if not separated:
+                    self._fail(text, match, f"expected '=' after {key}")
+                container[key] = item
+                key = None
+            else:
+                container.append(item)
+            if kind == "punct":
+                stack.append(item)
+                container = item
+
+        self.key = key
+        self.separated = separated
+        self.line += text.count("\n")
+
+    def close(self) -> Dict[str, Any]:
+        """Check that the document is complete and return its variables."""
+        if self.key is not None:
+            raise ValueError(f"line {self.line}: missing value for {self.key}")
+        if len(self.stack) > 1 or self.braced != self.closed:
+            raise ValueError(f"line {self.line}: unexpected end of file")
+        return self.root
+
+    def _fail(self, text: str, match: "re.Match", message: str) -> None:
+        line = self.line + text.count("\n", 0, match.start())
+        raise ValueError(f"line {line}: {message}")
+
+
+def _number(value: str) -> Optional[Union[int, float]]:
+    """Convert an unquoted number, or return None if value is not one."""
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def plan_from_variables(variables: Dict[str, Any]) -> TfvarsPlan:
+    """
+    Rebuild the allocation and resource-name structures from tfvars variables.
+
+    Pools may come nested (bu_ipam_configs, env_ipam_configs) or flat
+    (flat_bu_ipam_configs, flat_env_ipam_configs, as written with the "flat"
+    layout). The BU and environment configurations are emptied as they are
+    converted, so a large plan is not held twice.
+
+    Args:
+        variables: Variables as returned by parse_tfvars()
+
+    Returns:
+        TfvarsPlan
+
+    Raises:
+        ValueError: If a required variable or attribute is missing
+    """
+    for name in ("top_cidr", "reg_ipam_configs"):
+        if name not in variables:
+            raise ValueError(f"missing variable {name}")
+
+    bu_configs = variables.get("bu_ipam_configs") or _nest(
+        variables.get("flat_bu_ipam_configs"), ("region", "bu")
+    )
+    env_configs = variables.get("env_ipam_configs") or _nest(
+        variables.get("flat_env_ipam_configs"), ("region", "bu", "env")
+    )
+    include_bu_level = bool(bu_configs)
+    include_env_level = bool(env_configs)
+    regional_cidrs: Dict[str, Any] = {}
+    cidr_allocations: Dict[str, Any] = {
+        "top_cidr": list(variables["top_cidr"]),
+        "regional_cidrs": regional_cidrs,
+    }
+    resource_names: Dict[str, Any] = {
+        "top": {
+            "name": variables.get("top_name", ""),
+            "description": variables.get("top_description", ""),
+        },
+        "regional": {},
+        "business_units": {},
+        "environments": {},
+    }
+
+    with _gc_paused():
+        try:
+            for region, config in variables["reg_ipam_configs"].items():
+                regional_cidrs[region] = {
+                    "cidr": config["cidr"],
+                    "locale": config["locale"],
+                }
+                resource_names["regional"][region] = _names(config)
+
+            if include_bu_level:
+                bu_cidrs = cidr_allocations["bu_cidrs"] = {}
+                for region, bus in bu_configs.items():
+                    cidrs = bu_cidrs[region] = {}
+                    names = resource_names["business_units"][region] = {}
+                    for bu, config in bus.items():
+                        cidrs[bu] = {"cidr": config["cidr"]}
+                        names[bu] = _names(config)
+                    bus.clear()
+
+            if include_env_level:
+                env_cidrs = cidr_allocations["env_cidrs"] = {}
+                for region, bus in env_configs.items():
+                    region_cidrs = env_cidrs[region] = {}
+                    region_names = resource_names["environments"][region] = {}
+                    for bu, envs in bus.items():
+                        cidrs = region_cidrs[bu] = {}
+                        names = region_names[bu] = {}
+                        for env, config in envs.items():
+                            cidrs[env] = {
+                                "cidr": config["cidr"],
+                                "reserved_cidr": config.get("reserved_cidr", ""),
+                            }
+                            names[env] = _names(config)
+                        envs.clear()
+        except (KeyError, AttributeError, TypeError) as e:
+            raise ValueError(f"unexpected pool configuration: {e!r}") from e
+
+    return TfvarsPlan(
+        cidr_allocations, resource_names, include_bu_level, include_env_level
+    )
+
+
+def _nest(flat: Optional[Dict[str, Any]], levels: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    Group flat pool configurations by the attributes named in levels.
+
+    The flat map is emptied; pools keep their order, which is the plan's.
+
+    Raises:
+        ValueError: If a pool lacks one of the attributes
+    """
+    nested: Dict[str, Any] = {}
+    if not flat:
+        return nested
+    try:
+        for config in flat.values():
+            parent = nested
+            for level in levels[:-1]:
+                parent = parent.setdefault(config[level], {})
+            parent[config[levels[-1]]] = config
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"unexpected pool configuration: {e!r}") from e
+    flat.clear()
+    return nested
+
+
+def _names(config: Dict[str, Any]) -> Dict[str, str]:
+    """Return the name and description of a pool configuration."""
+    return {
+        "name": config.get("name", ""),
+        "description": config.get("description", ""),
+    }
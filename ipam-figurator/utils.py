@@ -1,112 +1,119 @@
-import ipaddress
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-from typing import Dict, List, Any, Optional, Tuple
-import numpy as np
-
-
+from typing import TYPE_CHECKING, Callable, Dict, List, Any, Optional, Tuple
+
+# pandas and Plotly are imported inside the functions that draw tables and
+# charts, so they are only loaded once the Visualization tab has content
+if TYPE_CHECKING:
+    import pandas as pd
+    import plotly.graph_objects as go
+
+import hierarchy_table
+import hierarchy_view
+import ipam_logic
+from instrumentation import Recorder, timed
+from allocation_plan import LevelStats
+
+# Region catalog lives in a UI-free module; re-exported for existing callers
+from regions import (
+    get_ipam_regions,
+    get_region_display_name,
+    get_regions_by_geography,
+)
+
+# Row labels of the allocation summary, by allocation_stats() key
+STATS_LEVEL_NAMES = {
+    "top": "Top",
+    "regional": "Regional",
+    "business_units": "Business Unit",
+    "environments": "Environment",
+}
+
+# Page sizes offered for the CIDR hierarchy table
+HIERARCHY_PAGE_SIZES = [25, 100, 500]
+
+
+@timed("hierarchy_table")
 def display_cidr_hierarchy(cidr_allocations: Dict[str, Any]) -> None:
     """
-    Display a visual representation of the CIDR hierarchy using tables.
+    Display the CIDR hierarchy as one filterable, paginated table.
+
+    The table of every pool is built once per plan (see hierarchy_table.py);
+    filtering happens on its integer columns and only the rows of the
+    current page are formatted and sent to the browser.
 
     Args:
         cidr_allocations: Dictionary with calculated CIDR allocations
     """
-    # Create a dataframe for the top-level CIDR
-    top_df = pd.DataFrame(
-        {
-            "Level": ["Top"],
-            "CIDR": cidr_allocations["top_cidr"],
-            "IP Range": [
-                f"{ipaddress.IPv4Network(cidr_allocations['top_cidr'][0]).network_address} - "
-                f"{ipaddress.IPv4Network(cidr_allocations['top_cidr'][0]).broadcast_address}"
-            ],
-            "Usable IPs": [
-                format_ip_count(
-                    ipaddress.IPv4Network(cidr_allocations["top_cidr"][0]).num_addresses
-                )
-            ],
-        }
-    )
+    import pandas as pd
+
+    table = hierarchy_table.hierarchy_table(cidr_allocations)
 
     st.subheader("CIDR Hierarchy")
-    st.write("Top-Level Pool")
-    st.dataframe(top_df, hide_index=True)
-
-    # Check if regional CIDRs exist
-    if "regional_cidrs" in cidr_allocations and cidr_allocations["regional_cidrs"]:
-        # Create a dataframe for the regional CIDRs
-        regional_data = []
-        for region, data in cidr_allocations["regional_cidrs"].items():
-            cidr = data["cidr"][0]
-            network = ipaddress.IPv4Network(cidr)
-            regional_data.append(
-                {
-                    "Region": region,
-                    "CIDR": cidr,
-                    "IP Range": f"{network.network_address} - {network.broadcast_address}",
-                    "Usable IPs": format_ip_count(network.num_addresses),
-                }
-            )
+    levels_present = sorted(set(table.level))
+    filter_col, level_col, size_col = st.columns([3, 3, 1])
+    with filter_col:
+        query = st.text_input(
+            "Filter pools",
+            key="hierarchy_query",
+            placeholder="Name or path (e.g. us-east-1/abc), address or CIDR",
+        )
+    with level_col:
+        levels = st.multiselect(
+            "Levels",
+            levels_present,
+            default=levels_present,
+            format_func=hierarchy_table.LEVEL_NAMES.get,
+            key="hierarchy_levels",
+        )
+    with size_col:
+        page_size = st.selectbox(
+            "Rows per page", HIERARCHY_PAGE_SIZES, index=1, key="hierarchy_page_size"
+        )
 
-        regional_df = pd.DataFrame(regional_data)
-
-        st.write("Regional Pools")
-        st.dataframe(regional_df, hide_index=True)
-
-    # Check if BU CIDRs exist
-    if "bu_cidrs" in cidr_allocations and cidr_allocations["bu_cidrs"]:
-        # Create dataframes for each region's BU CIDRs
-        st.write("Business Unit Pools")
-        for region, bus in cidr_allocations["bu_cidrs"].items():
-            bu_data = []
-            for bu, bu_info in bus.items():
-                cidr = bu_info["cidr"][0]
-                network = ipaddress.IPv4Network(cidr)
-                bu_data.append(
-                    {
-                        "Business Unit": bu,
-                        "CIDR": cidr,
-                        "IP Range": f"{network.network_address} - {network.broadcast_address}",
-                        "Usable IPs": format_ip_count(network.num_addresses),
-                    }
-                )
-
-            bu_df = pd.DataFrame(bu_data)
-            st.write(f"Region: {region}")
-            st.dataframe(bu_df, hide_index=True)
-
-    # Check if environment CIDRs exist
-    if "env_cidrs" in cidr_allocations and cidr_allocations["env_cidrs"]:
-        # Create dataframes for each region's environment CIDRs
-        st.write("Environment Pools")
-        for region, bus in cidr_allocations["env_cidrs"].items():
-            st.write(f"Region: {region}")
-
-            for bu, envs in bus.items():
-                env_data = []
-                for env, env_info in envs.items():
-                    cidr = env_info["cidr"][0]
-                    reserved = env_info.get("reserved_cidr", "")
-                    network = ipaddress.IPv4Network(cidr)
-                    env_data.append(
-                        {
-                            "Environment": env,
-                            "CIDR": cidr,
-                            "Reserved CIDR": reserved,
-                            "IP Range": f"{network.network_address} - {network.broadcast_address}",
-                            "Usable IPs": format_ip_count(network.num_addresses),
-                        }
-                    )
-
-                env_df = pd.DataFrame(env_data)
-                st.write(f"Business Unit: {bu}")
-                st.dataframe(env_df, hide_index=True)
+    rows = table.filter(levels, query)
+    page_count = max(1, -(-len(rows) // page_size))
+    page = st.number_input(
+        f"Page (of {page_count:,})",
+        min_value=1,
+        max_value=page_count,
+        value=1,
+        step=1,
+        # A new filter result starts again from the first page
+        key=f"hierarchy_page-{len(rows)}-{page_size}",
+    )
+    start = (int(page) - 1) * page_size
+    page_rows = rows[start : start + page_size]
+
+    columns = {
+        "Level": [hierarchy_table.LEVEL_NAMES[table.level[row]] for row in page_rows],
+        "Pool": [table.path[row] or "(top)" for row in page_rows],
+        "CIDR": [table.cidr(row) for row in page_rows],
+        "IP Range": [
+            f"{table.address(table.first[row])} - {table.address(table.last[row])}"
+            for row in page_rows
+        ],
+        "Usable IPs": [format_ip_count(table.size[row]) for row in page_rows],
+    }
+    if any(table.reserved_prefix_len[row] for row in page_rows):
+        columns["Reserved CIDR"] = [table.reserved_cidr(row) for row in page_rows]
+    st.dataframe(pd.DataFrame(columns), hide_index=True, use_container_width=True)
+
+    if rows:
+        st.caption(
+            f"Pools {start + 1:,}-{start + len(page_rows):,} of {len(rows):,}"
+            f" matching ({len(table):,} in the plan)"
+        )
+    else:
+        st.caption(f"No pools match ({len(table):,} in the plan)")
 
 
 def format_ip_count(count: int) -> str:
     """Format an IP address count with commas and proper suffix."""
+    if count >= 1 << 40:
+        # IPv6 blocks: a power of two reads better than a 20-digit count
+        if count & (count - 1) == 0:
+            return f"2^{count.bit_length() - 1}"
+        return f"{count:.2e}"
     if count >= 1000000:
         return f"{count/1000000:.2f}M"
     elif count >= 1000:
@@ -115,6 +122,7 @@ def format_ip_count(count: int) -> str:
         return f"{count:,}"
 
 
+@timed("network_structure")
 def visualize_network_structure(cidr_allocations: Dict[str, Any]) -> None:
     """
     Create a hierarchical visualization of the network structure using Plotly.
@@ -122,13 +130,9 @@ def visualize_network_structure(cidr_allocations: Dict[str, Any]) -> None:
     Args:
         cidr_allocations: Dictionary with calculated CIDR allocations
     """
-    # Top-level stats
-    top_cidr = cidr_allocations["top_cidr"][0]
-    network = ipaddress.IPv4Network(top_cidr)
-    total_ips = network.num_addresses
-
-    # Calculate IP allocations at each level
-    summary_stats = calculate_allocation_stats(cidr_allocations)
+    # Per-level statistics, accumulated while the plan was calculated
+    level_stats = ipam_logic.allocation_stats(cidr_allocations)
+    total_ips = level_stats["top"].total_addresses
 
     st.subheader("IP Address Allocation Overview")
 
@@ -138,12 +142,9 @@ def visualize_network_structure(cidr_allocations: Dict[str, Any]) -> None:
         st.metric("Total IP Space", format_ip_count(total_ips))
     with col2:
         allocated_ips = (
-            total_ips
-            if "regional_cidrs" not in cidr_allocations
-            else sum(
-                ipaddress.IPv4Network(data["cidr"][0]).num_addresses
-                for region, data in cidr_allocations["regional_cidrs"].items()
-            )
+            level_stats["regional"].total_addresses
+            if "regional" in level_stats
+            else total_ips
         )
         st.metric("Allocated IPs", format_ip_count(allocated_ips))
     with col3:
@@ -153,158 +154,177 @@ def visualize_network_structure(cidr_allocations: Dict[str, Any]) -> None:
         st.metric("Utilization", f"{utilization:.1f}%")
 
     # Create hierarchy visualization
-    fig = create_hierarchy_visualization(cidr_allocations)
-    st.plotly_chart(fig, use_container_width=True)
+    display_hierarchy_chart(cidr_allocations)
 
     # Create a summary table
     st.subheader("Allocation Summary")
-    summary_df = pd.DataFrame(summary_stats)
-    st.table(summary_df)
+    st.table(calculate_allocation_stats(cidr_allocations, level_stats))
 
 
-def calculate_allocation_stats(cidr_allocations: Dict[str, Any]) -> pd.DataFrame:
-    """Calculate allocation statistics at each level of the hierarchy."""
-    top_cidr = cidr_allocations["top_cidr"][0]
-    top_network = ipaddress.IPv4Network(top_cidr)
-    top_ips = top_network.num_addresses
+@timed("sunburst")
+def display_hierarchy_chart(cidr_allocations: Dict[str, Any]) -> None:
+    """
+    Draw the level-of-detail Sunburst of a plan with drill-down.
 
-    stats = {
-        "Pool Level": ["Top"],
-        "Total IPs": [format_ip_count(top_ips)],
-        "Allocation Count": [1],
-        "Average Size": [format_ip_count(top_ips)],
-    }
+    Clicking a pool focuses the chart on its subtree, clicking an "N more"
+    node pages through the pools it folds and clicking the centre goes back
+    up one level. The focus is kept in st.session_state.sunburst_focus as
+    (pool path, offset).
 
-    # Regional stats
-    if "regional_cidrs" in cidr_allocations and cidr_allocations["regional_cidrs"]:
-        regional_ips = sum(
-            ipaddress.IPv4Network(data["cidr"][0]).num_addresses
-            for region, data in cidr_allocations["regional_cidrs"].items()
-        )
-        regional_count = len(cidr_allocations["regional_cidrs"])
-        stats["Pool Level"].append("Regional")
-        stats["Total IPs"].append(format_ip_count(regional_ips))
-        stats["Allocation Count"].append(regional_count)
-        stats["Average Size"].append(format_ip_count(regional_ips // regional_count))
-
-    # BU stats
-    if "bu_cidrs" in cidr_allocations and cidr_allocations["bu_cidrs"]:
-        bu_count = 0
-        bu_ips = 0
-        for region, bus in cidr_allocations["bu_cidrs"].items():
-            for bu, bu_info in bus.items():
-                bu_count += 1
-                bu_ips += ipaddress.IPv4Network(bu_info["cidr"][0]).num_addresses
-
-        stats["Pool Level"].append("Business Unit")
-        stats["Total IPs"].append(format_ip_count(bu_ips))
-        stats["Allocation Count"].append(bu_count)
-        stats["Average Size"].append(
-            format_ip_count(bu_ips // bu_count if bu_count > 0 else 0)
+    Args:
+        cidr_allocations: Dictionary with calculated CIDR allocations
+    """
+    focus, offset = st.session_state.get("sunburst_focus", ((), 0))
+    try:
+        nodes = hierarchy_view.sunburst_nodes(cidr_allocations, focus, offset)
+    except KeyError:
+        # The plan changed under the focused pool
+        focus, offset = (), 0
+        nodes = hierarchy_view.sunburst_nodes(cidr_allocations)
+    st.session_state.sunburst_focus = (focus, offset)
+
+    if focus or offset:
+        location = " / ".join(focus) or "Top"
+        if offset:
+            location += f" (from pool {offset + 1:,})"
+        col1, col2 = st.columns([4, 1])
+        col1.write(f"**Showing:** {location}")
+        if col2.button("Back to top", key="sunburst_reset"):
+            st.session_state.sunburst_focus = ((), 0)
+            st.rerun()
+
+    fig = create_hierarchy_visualization(cidr_allocations, nodes)
+    # A fresh key per focus, so a click is only handled once
+    chart_key = f"sunburst-{'/'.join(focus)}-{offset}"
+    try:
+        event = st.plotly_chart(
+            fig,
+            use_container_width=True,
+            key=chart_key,
+            on_select="rerun",
+            selection_mode="points",
         )
+    except TypeError:
+        # Streamlit releases before 1.35 cannot report clicks
+        st.plotly_chart(fig, use_container_width=True)
+        event = None
+
+    st.caption(
+        f"{len(nodes.ids):,} chart nodes for {nodes.total_pools:,} pools"
+        f" ({nodes.folded_pools:,} not drawn), figure payload"
+        f" {len(fig.to_json()) / 1024:,.1f} KiB"
+    )
+
+    points = event.selection.points if event is not None else []
+    if points:
+        point = points[0]
+        index = point.get("point_number", point.get("point_index"))
+        if index is not None and 0 <= index < len(nodes.ids):
+            new_focus = _sunburst_drill_target(cidr_allocations, nodes, index)
+            if new_focus != (focus, offset):
+                st.session_state.sunburst_focus = new_focus
+                st.rerun()
+
+
+def _sunburst_drill_target(
+    cidr_allocations: Dict[str, Any],
+    nodes: hierarchy_view.SunburstNodes,
+    index: int,
+) -> Tuple[Tuple[str, ...], int]:
+    """Return the (pool path, offset) to focus on after clicking a node."""
+    path = nodes.paths[index]
+    if nodes.offsets[index] >= 0:
+        return path, nodes.offsets[index]
+    if index == 0:
+        return path[:-1], 0
+    if hierarchy_view.count_pools(cidr_allocations, path):
+        return path, 0
+    return nodes.paths[0], 0
+
+
+@timed("allocation_summary")
+def calculate_allocation_stats(
+    cidr_allocations: Dict[str, Any],
+    level_stats: Optional[Dict[str, LevelStats]] = None,
+) -> "pd.DataFrame":
+    """
+    Tabulate allocation statistics at each level of the hierarchy.
+
+    Args:
+        cidr_allocations: Dictionary with calculated CIDR allocations
+        level_stats: Statistics already returned by ipam_logic.allocation_stats()
+
+    Returns:
+        DataFrame with one row per level
+    """
+    import pandas as pd
+
+    if level_stats is None:
+        level_stats = ipam_logic.allocation_stats(cidr_allocations)
 
-    # Environment stats
-    if "env_cidrs" in cidr_allocations and cidr_allocations["env_cidrs"]:
-        env_count = 0
-        env_ips = 0
-        for region, bus in cidr_allocations["env_cidrs"].items():
-            for bu, envs in bus.items():
-                for env, env_info in envs.items():
-                    env_count += 1
-                    env_ips += ipaddress.IPv4Network(env_info["cidr"][0]).num_addresses
-
-        stats["Pool Level"].append("Environment")
-        stats["Total IPs"].append(format_ip_count(env_ips))
-        stats["Allocation Count"].append(env_count)
-        stats["Average Size"].append(
-            format_ip_count(env_ips // env_count if env_count > 0 else 0)
+    stats = {
+        "Pool Level": [],
+        "Total IPs": [],
+        "Allocation Count": [],
+        "Average Size": [],
+        "Smallest": [],
+        "Largest": [],
+        "Reserved IPs": [],
+    }
+    for key, level_name in STATS_LEVEL_NAMES.items():
+        level = level_stats.get(key)
+        if level is None:
+            continue
+        stats["Pool Level"].append(level_name)
+        stats["Total IPs"].append(format_ip_count(level.total_addresses))
+        stats["Allocation Count"].append(level.count)
+        stats["Average Size"].append(format_ip_count(level.average_size))
+        stats["Smallest"].append(format_ip_count(level.min_size))
+        stats["Largest"].append(format_ip_count(level.max_size))
+        stats["Reserved IPs"].append(
+            format_ip_count(level.reserved_addresses) if level.reserved_count else "-"
         )
 
     return pd.DataFrame(stats)
 
 
-def create_hierarchy_visualization(cidr_allocations: Dict[str, Any]) -> go.Figure:
-    """Create a hierarchical visualization of the IP address allocations."""
-    # Create labels and values for the sunburst chart
-    labels = []
-    parents = []
-    values = []
-    hover_text = []
-
-    # Add top-level
-    top_cidr = cidr_allocations["top_cidr"][0]
-    top_network = ipaddress.IPv4Network(top_cidr)
-    top_ips = top_network.num_addresses
-    top_label = f"Top: {top_cidr}"
-
-    labels.append(top_label)
-    parents.append("")
-    values.append(top_ips)
-    hover_text.append(f"CIDR: {top_cidr}<br>IPs: {format_ip_count(top_ips)}")
-
-    # Add regions if they exist
-    if "regional_cidrs" in cidr_allocations and cidr_allocations["regional_cidrs"]:
-        for region, data in cidr_allocations["regional_cidrs"].items():
-            region_cidr = data["cidr"][0]
-            region_network = ipaddress.IPv4Network(region_cidr)
-            region_ips = region_network.num_addresses
-            region_label = f"{region}: {region_cidr}"
-
-            labels.append(region_label)
-            parents.append(top_label)
-            values.append(region_ips)
-            hover_text.append(
-                f"Region: {region}<br>CIDR: {region_cidr}<br>IPs: {format_ip_count(region_ips)}"
-            )
+@timed("sunburst_figure")
+def create_hierarchy_visualization(
+    cidr_allocations: Dict[str, Any],
+    nodes: Optional[hierarchy_view.SunburstNodes] = None,
+) -> "go.Figure":
+    """
+    Create a hierarchical visualization of the IP address allocations.
 
-    # Add BUs if they exist
-    if "bu_cidrs" in cidr_allocations and cidr_allocations["bu_cidrs"]:
-        for region, bus in cidr_allocations["bu_cidrs"].items():
-            region_label = (
-                f"{region}: {cidr_allocations['regional_cidrs'][region]['cidr'][0]}"
-            )
+    Args:
+        cidr_allocations: Dictionary with calculated CIDR allocations
+        nodes: Nodes to draw (defaults to the whole plan within
+            hierarchy_view.DEFAULT_NODE_BUDGET nodes)
+
+    Returns:
+        Sunburst figure
+    """
+    import plotly.graph_objects as go
+
+    if nodes is None:
+        nodes = hierarchy_view.sunburst_nodes(cidr_allocations)
 
-            for bu, bu_info in bus.items():
-                bu_cidr = bu_info["cidr"][0]
-                bu_network = ipaddress.IPv4Network(bu_cidr)
-                bu_ips = bu_network.num_addresses
-                bu_label = f"{region}-{bu}: {bu_cidr}"
-
-                labels.append(bu_label)
-                parents.append(region_label)
-                values.append(bu_ips)
-                hover_text.append(
-                    f"Region: {region}<br>BU: {bu}<br>CIDR: {bu_cidr}<br>IPs: {format_ip_count(bu_ips)}"
-                )
-
-    # Add environments if they exist
-    if "env_cidrs" in cidr_allocations and cidr_allocations["env_cidrs"]:
-        for region, bus in cidr_allocations["env_cidrs"].items():
-            for bu, envs in bus.items():
-                bu_label = f"{region}-{bu}: {cidr_allocations['bu_cidrs'][region][bu]['cidr'][0]}"
-
-                for env, env_info in envs.items():
-                    env_cidr = env_info["cidr"][0]
-                    env_network = ipaddress.IPv4Network(env_cidr)
-                    env_ips = env_network.num_addresses
-                    env_label = f"{region}-{bu}-{env}: {env_cidr}"
-
-                    labels.append(env_label)
-                    parents.append(bu_label)
-                    values.append(env_ips)
-                    hover_text.append(
-                        f"Region: {region}<br>BU: {bu}<br>Env: {env}<br>CIDR: {env_cidr}<br>IPs: {format_ip_count(env_ips)}"
-                    )
-
-    # Create sunburst figure
+    # Compact ids link nodes to their parents; CIDRs and sizes are shared
+    # between the segment text and a single hover template
     fig = go.Figure(
         go.Sunburst(
-            labels=labels,
-            parents=parents,
-            values=values,
+            ids=nodes.ids,
+            labels=nodes.labels,
+            parents=nodes.parents,
+            values=nodes.values,
             branchvalues="total",
-            hovertext=hover_text,
-            hoverinfo="text",
+            customdata=[
+                (cidr, format_ip_count(value))
+                for cidr, value in zip(nodes.cidrs, nodes.values)
+            ],
+            texttemplate="%{label}<br>%{customdata[0]}",
+            hovertemplate="<b>%{label}</b><br>CIDR: %{customdata[0]}"
+            "<br>IPs: %{customdata[1]}<extra></extra>",
             maxdepth=3,
         )
     )
@@ -318,81 +338,113 @@ def create_hierarchy_visualization(cidr_allocations: Dict[str, Any]) -> go.Figur
     return fig
 
 
-def get_ipam_regions() -> List[Dict[str, str]]:
-    """Return a list of AWS regions that support IPAM with their display names."""
-    return [
-        {"code": "us-east-1", "name": "US East (N. Virginia)"},
-        {"code": "us-east-2", "name": "US East (Ohio)"},
-        {"code": "us-west-1", "name": "US West (N. California)"},
-        {"code": "us-west-2", "name": "US West (Oregon)"},
-        {"code": "ca-central-1", "name": "Canada (Central)"},
-        {"code": "eu-north-1", "name": "EU North (Stockholm)"},
-        {"code": "eu-west-1", "name": "EU West (Ireland)"},
-        {"code": "eu-west-2", "name": "EU West (London)"},
-        {"code": "eu-west-3", "name": "EU West (Paris)"},
-        {"code": "eu-central-1", "name": "EU Central (Frankfurt)"},
-        {"code": "eu-south-1", "name": "EU South (Milan)"},
-        {"code": "ap-northeast-1", "name": "AP Northeast (Tokyo)"},
-        {"code": "ap-northeast-2", "name": "AP Northeast (Seoul)"},
-        {"code": "ap-northeast-3", "name": "AP Northeast (Osaka)"},
-        {"code": "ap-southeast-1", "name": "AP Southeast (Singapore)"},
-        {"code": "ap-southeast-2", "name": "AP Southeast (Sydney)"},
-        {"code": "ap-south-1", "name": "AP South (Mumbai)"},
-        {"code": "sa-east-1", "name": "SA East (São Paulo)"},
-        {"code": "af-south-1", "name": "Africa (Cape Town)"},
-        {"code": "me-south-1", "name": "Middle East (Bahrain)"},
-    ]
-
-
-def get_region_display_name(region_code: str) -> str:
-    """Convert AWS region code to a human-readable display name."""
-    regions = get_ipam_regions()
-    for region in regions:
-        if region["code"] == region_code:
-            return region["name"]
-    return region_code
+def display_performance_panel(recorder: Optional[Recorder]) -> None:
+    """
+    Show the "Performance" expander: how long each stage of this run took.
+
+    Recording is switched on with the checkboxes in the expander and applies
+    from the next run (any widget change or button click).
+
+    Args:
+        recorder: Recorder active during this run, or None if recording is off
+    """
+    import pandas as pd
+
+    with st.expander("Performance", expanded=recorder is not None):
+        record_col, memory_col = st.columns(2)
+        record_col.checkbox("Record stage timings", key="record_performance")
+        memory_col.checkbox(
+            "Track peak memory (slower)",
+            key="record_memory",
+            disabled=not st.session_state.get("record_performance"),
+        )
+        if recorder is None:
+            st.caption(
+                "Times validation, allocation, naming, Terraform output and "
+                "each table and chart on the next run."
+            )
+            return
+        if not recorder.spans:
+            st.caption("No stages ran in this run.")
+            return
+
+        columns = {
+            # Nested stages are indented under the stage that ran them
+            "Stage": ["\u2003" * span.depth + span.name for span in recorder.spans],
+            "Time (ms)": [round(span.seconds * 1000, 2) for span in recorder.spans],
+        }
+        if recorder.memory:
+            columns["Peak memory (MiB)"] = [
+                round(span.peak_bytes / 2**20, 2) for span in recorder.spans
+            ]
+        st.dataframe(pd.DataFrame(columns), hide_index=True, use_container_width=True)
+        st.caption(f"{recorder.total_seconds() * 1000:,.1f} ms in recorded stages")
+
+
+def edit_order(
+    order: List[str],
+    key: str,
+    labels: Optional[Callable[[str], str]] = None,
+    column: str = "Name",
+) -> List[str]:
+    """
+    Show an order as an editable grid of positions and return the edited order.
+
+    Meant to be called inside an st.form: typing new positions for any
+    number of rows does not rerun the app, and the combined moves are
+    applied when the form is submitted (see ipam_logic.reorder_items()).
+
+    Args:
+        order: Current order
+        key: Widget key prefix
+        labels: Optional function giving a description for each item
+        column: Header of the item column
+
+    Returns:
+        The order implied by the positions in the grid
+    """
+    import pandas as pd
+
+    columns = {"Position": list(range(1, len(order) + 1)), column: order}
+    if labels is not None:
+        columns["Description"] = [labels(item) for item in order]
+    edited = st.data_editor(
+        pd.DataFrame(columns),
+        column_config={
+            "Position": st.column_config.NumberColumn(
+                min_value=1, max_value=max(len(order), 1), step=1
+            )
+        },
+        disabled=[name for name in columns if name != "Position"],
+        hide_index=True,
+        use_container_width=True,
+        # A new order gets a fresh grid instead of the previous edits
+        key=f"{key}_order_editor_{hash(tuple(order))}",
+    )
+    return ipam_logic.reorder_items(order, edited["Position"].tolist())
 
 
 def create_sortable_list(items: List[str], title: str, key_prefix: str) -> None:
-    """Create a sortable list using streamlit session state."""
+    """
+    Create a sortable list using streamlit session state.
+
+    Moves are staged in a grid and applied together with one rerun.
+    """
     if f"{key_prefix}_order" not in st.session_state:
         st.session_state[f"{key_prefix}_order"] = list(range(len(items)))
 
     st.write(f"### {title} Order")
     st.write("Reorganize items (first item will have first CIDR allocation)")
 
-    # Create columns for the reordering UI
-    cols = st.columns(len(items))
-
-    for i, item_idx in enumerate(st.session_state[f"{key_prefix}_order"]):
-        if item_idx < len(items):
-            with cols[i]:
-                item = items[item_idx]
-                st.write(f"**{i+1}. {item}**")
-                if i > 0:
-                    if st.button(f"↑ {item}", key=f"{key_prefix}_{item}_up"):
-                        # Swap with previous item
-                        idx = st.session_state[f"{key_prefix}_order"].index(item_idx)
-                        (
-                            st.session_state[f"{key_prefix}_order"][idx],
-                            st.session_state[f"{key_prefix}_order"][idx - 1],
-                        ) = (
-                            st.session_state[f"{key_prefix}_order"][idx - 1],
-                            st.session_state[f"{key_prefix}_order"][idx],
-                        )
-                        st.rerun()
-                if i < len(items) - 1:
-                    if st.button(f"↓ {item}", key=f"{key_prefix}_{item}_down"):
-                        # Swap with next item
-                        idx = st.session_state[f"{key_prefix}_order"].index(item_idx)
-                        (
-                            st.session_state[f"{key_prefix}_order"][idx],
-                            st.session_state[f"{key_prefix}_order"][idx + 1],
-                        ) = (
-                            st.session_state[f"{key_prefix}_order"][idx + 1],
-                            st.session_state[f"{key_prefix}_order"][idx],
-                        )
-                        st.rerun()
+    ordered = get_ordered_items(items, key_prefix)
+    with st.form(f"{key_prefix}_order_form"):
+        new_order = edit_order(ordered, key_prefix, column=title)
+        if st.form_submit_button("Apply Order") and new_order != ordered:
+            positions = {item: index for index, item in enumerate(items)}
+            st.session_state[f"{key_prefix}_order"] = [
+                positions[item] for item in new_order
+            ]
+            st.rerun()
 
 
 def get_ordered_items(items: List[str], key_prefix: str) -> List[str]:
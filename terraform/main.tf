@@ -14,6 +14,7 @@ module "ipam" {
   top_name          = var.top_name
   top_description   = var.top_description
   top_cidr          = var.top_cidr
+  address_family    = var.address_family
   reg_ipam_configs  = var.reg_ipam_configs
   bu_ipam_configs   = var.bu_ipam_configs
   env_ipam_configs  = var.env_ipam_configs
@@ -21,4 +22,8 @@ module "ipam" {
   organization_arn  = data.aws_organizations_organization.current.arn
   share_name        = var.share_name
   tags              = module.tags.tag_map
+
+  # Pre-flattened alternatives written by the configurator's --layout flat
+  flat_bu_ipam_configs  = var.flat_bu_ipam_configs
+  flat_env_ipam_configs = var.flat_env_ipam_configs
 }
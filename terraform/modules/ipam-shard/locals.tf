@@ -0,0 +1,102 @@
+#==============================================================================
+# Sample Terraform Implementation for Hierarchical IPAM on AWS
+#
+# This code demonstrates how to implement hierarchical IP Address Management
+# across multiple AWS regions, business units, and environments.
+#
+# IMPORTANT: This code is provided as a sample for educational purposes.
+# Before using in production, review security configurations and customize
+# to meet your organizational requirements.
+#==============================================================================
+
+
+locals {
+  #=========================================
+  # Pool Config Processing
+  #=========================================
+
+  # Convert BU configs into a flat list for easier processing
+  flattened_bu_ipam_list = flatten([
+    for region, bu_configs in var.bu_ipam_configs : [
+      for bu, bu_config in bu_configs : merge(bu_config, {
+        region     = region, # Add region identifier
+        bu         = bu,     # Add business unit identifier
+        parent_key = region  # Key of the regional pool
+      })
+    ]
+  ])
+
+  # Same composite keys as the ipam module, so addresses match a single-stack
+  # deployment; pre-flattened pools are taken as they are
+  flattened_bu_ipam_configs = merge(
+    {
+      for bu_config in local.flattened_bu_ipam_list :
+      "${bu_config.region}-${bu_config.bu}" => bu_config
+    },
+    var.flat_bu_ipam_configs
+  )
+
+  # Flatten environment configs into a list for easier processing
+  flattened_env_ipam_list = flatten([
+    for region, env_configs in var.env_ipam_configs : [
+      for bu, bu_envs in env_configs : [
+        for env, env_config in bu_envs : merge(
+          env_config,
+          {
+            region = region, # Add region identifier
+            bu     = bu,     # Add business unit identifier
+            env    = env,    # Add environment identifier
+            # Parent BU pool, or the regional pool without a BU level
+            parent_key = can(var.bu_ipam_configs[region][bu]) ? "${region}-${bu}" : region
+          }
+        )
+      ]
+    ]
+  ])
+
+  flattened_env_ipam_configs = merge(
+    {
+      for env_config in local.flattened_env_ipam_list :
+      "${env_config.region}-${env_config.bu}-${env_config.env}" => env_config
+    },
+    var.flat_env_ipam_configs
+  )
+
+  bu_pool_ids = {
+    for key, pool in aws_vpc_ipam_pool.bu :
+    key => pool.id
+  }
+
+  # Pool IDs of every pool that can be a parent, by key
+  parent_pool_ids = merge(var.regional_pool_ids, local.bu_pool_ids)
+
+  #=========================================
+  # RAM Resource Sharing
+  #=========================================
+
+  # Create map of IPAM pool ARNs for RAM sharing
+  ipam_pool_arns = {
+    for key, pool in aws_vpc_ipam_pool.env :
+    key => pool.arn
+  }
+
+  # Create map of IPAM pool descriptions for RAM share naming
+  ipam_pool_descriptions = {
+    for key, pool in aws_vpc_ipam_pool.env :
+    key => pool.description
+  }
+
+  #=========================================
+  # Reserved CIDR Processing
+  #=========================================
+
+  reserved_cidr_allocations = {
+    for key, env_config in local.flattened_env_ipam_configs :
+    "${key}-${env_config.reserved_cidr}" => {
+      pool_key    = key
+      cidr        = env_config.reserved_cidr
+      description = "Reserved CIDR block for ${env_config.name}"
+    }
+    if env_config.reserved_cidr != ""
+  }
+}
@@ -0,0 +1,141 @@
+#==============================================================================
+# Sample Terraform Implementation for Hierarchical IPAM on AWS
+#
+# This code demonstrates how to implement hierarchical IP Address Management
+# across multiple AWS regions, business units, and environments.
+#
+# IMPORTANT: This code is provided as a sample for educational purposes.
+# Before using in production, review security configurations and customize
+# to meet your organizational requirements.
+#==============================================================================
+
+
+#=======================================
+# Business Unit Pools
+#=======================================
+
+# The IPAM, top-level and regional pools live in the base stack; their IDs are
+# passed in, so every shard can be planned and applied on its own.
+
+resource "aws_vpc_ipam_pool" "bu" {
+  for_each = local.flattened_bu_ipam_configs
+
+  ipam_scope_id       = var.ipam_scope_id
+  description         = each.value.description
+  address_family      = var.address_family
+  auto_import         = false
+  locale              = each.value.region
+  source_ipam_pool_id = var.regional_pool_ids[each.value.parent_key]
+
+  # Merge existing tags with "ipam" tag
+  tags = merge(
+    var.tags,
+    {
+      ipam = "ipam-pool-${each.value.bu}-${each.value.region}"
+    }
+  )
+}
+
+resource "aws_vpc_ipam_pool_cidr" "bu_cidr" {
+  for_each = local.flattened_bu_ipam_configs
+
+  ipam_pool_id = aws_vpc_ipam_pool.bu[each.key].id
+  cidr         = each.value.cidr[0]
+
+  depends_on = [
+    aws_vpc_ipam_pool.bu
+  ]
+}
+
+#=======================================
+# Environment Pools
+#=======================================
+
+resource "aws_vpc_ipam_pool" "env" {
+  for_each = local.flattened_env_ipam_configs
+
+  ipam_scope_id       = var.ipam_scope_id
+  description         = each.value.description
+  address_family      = var.address_family
+  auto_import         = true
+  locale              = each.value.region
+  # BU pool, or the regional pool when the hierarchy has no BU level
+  source_ipam_pool_id = local.parent_pool_ids[each.value.parent_key]
+
+  depends_on = [
+    aws_vpc_ipam_pool_cidr.bu_cidr
+  ]
+
+  # Merge existing tags with "ipam" tag
+  tags = merge(
+    var.tags,
+    {
+      ipam = "ipam-pool-${each.value.bu}-${each.value.env}-${each.value.region}"
+    }
+  )
+}
+
+resource "aws_vpc_ipam_pool_cidr" "env_cidr" {
+  for_each = local.flattened_env_ipam_configs
+
+  ipam_pool_id = aws_vpc_ipam_pool.env[each.key].id
+  cidr         = each.value.cidr[0]
+
+  depends_on = [
+    aws_vpc_ipam_pool.env
+  ]
+}
+
+#=======================================
+# Create RAM shares and associations
+#=======================================
+
+resource "aws_ram_resource_share" "ram_shares" {
+  for_each = local.ipam_pool_arns
+
+  name                      = replace(replace("RAM Share for ${local.ipam_pool_descriptions[each.key]}", "(", "- "), ")", "")
+  allow_external_principals = false
+  permission_arns           = ["arn:aws:ram::aws:permission/AWSRAMDefaultPermissionsIpamPool"]
+
+  depends_on = [
+    aws_vpc_ipam_pool_cidr.env_cidr
+  ]
+}
+
+resource "aws_ram_principal_association" "ram_shares_prin_assoc" {
+  for_each = aws_ram_resource_share.ram_shares
+
+  principal          = var.organization_arn
+  resource_share_arn = aws_ram_resource_share.ram_shares[each.key].arn
+
+  depends_on = [
+    aws_ram_resource_share.ram_shares
+  ]
+}
+
+resource "aws_ram_resource_association" "share_assoc" {
+  for_each = local.ipam_pool_arns
+
+  resource_arn       = each.value
+  resource_share_arn = aws_ram_resource_share.ram_shares[each.key].arn
+
+  depends_on = [
+    aws_ram_principal_association.ram_shares_prin_assoc
+  ]
+}
+
+#=======================================
+# Reserved CIDR Allocations
+#=======================================
+
+resource "aws_vpc_ipam_pool_cidr_allocation" "reserved_cidr" {
+  for_each = local.reserved_cidr_allocations
+
+  ipam_pool_id = aws_vpc_ipam_pool.env[each.value.pool_key].id
+  cidr         = each.value.cidr
+  description  = each.value.description
+
+  depends_on = [
+    aws_vpc_ipam_pool_cidr.env_cidr
+  ]
+}
@@ -0,0 +1,47 @@
+#==============================================================================
+# Sample Terraform Implementation for Hierarchical IPAM on AWS
+#
+# This code demonstrates how to implement hierarchical IP Address Management
+# across multiple AWS regions, business units, and environments.
+#
+# IMPORTANT: This code is provided as a sample for educational purposes.
+# Before using in production, review security configurations and customize
+# to meet your organizational requirements.
+#==============================================================================
+
+
+#=======================================
+# IPAM Pool Identifier Outputs
+#=======================================
+
+output "bu_pool_ids" {
+  description = <<-EOT
+    Map of Business Unit IPAM pool IDs keyed by region-bu composite identifier.
+    Format: {region-bu => pool_id}
+  EOT
+  value       = local.bu_pool_ids
+}
+
+output "env_pool_ids" {
+  description = <<-EOT
+    Map of Environment IPAM pool IDs keyed by region-bu-env composite identifier.
+    Format: {region-bu-env => pool_id}
+    These are the leaf-level pools used for allocating CIDRs to actual VPCs.
+  EOT
+  value = {
+    for key, pool in aws_vpc_ipam_pool.env :
+    key => pool.id
+  }
+}
+
+#=======================================
+# Resource Access Manager (RAM) Outputs
+#=======================================
+
+output "ram_resource_share_arns" {
+  description = <<-EOT
+    Map of RAM resource share ARNs keyed by pool identifier.
+    Format: {pool_key => share_arn}
+  EOT
+  value       = { for k, v in aws_ram_resource_share.ram_shares : k => v.arn }
+}
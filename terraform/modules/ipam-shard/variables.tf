@@ -0,0 +1,167 @@
+#==============================================================================
+# Sample Terraform Implementation for Hierarchical IPAM on AWS
+#
+# This code demonstrates how to implement hierarchical IP Address Management
+# across multiple AWS regions, business units, and environments.
+#
+# IMPORTANT: This code is provided as a sample for educational purposes.
+# Before using in production, review security configurations and customize
+# to meet your organizational requirements.
+#==============================================================================
+
+
+#=============================================
+# Base Stack References
+#=============================================
+
+variable "ipam_scope_id" {
+  description = <<-EOT
+    ID of the IPAM scope the pools are created in.
+    Taken from the base stack's ipam_scope_id output.
+  EOT
+  type        = string
+}
+
+variable "regional_pool_ids" {
+  description = <<-EOT
+    Map of regional IPAM pool IDs keyed by region, from the base stack.
+    Format: {region => pool_id}
+    Every region used in this shard's configs must be present.
+  EOT
+  type        = map(string)
+}
+
+variable "address_family" {
+  description = <<-EOT
+    IP address family of the pools: "ipv4" or "ipv6".
+    Must match the base stack.
+  EOT
+  type        = string
+  default     = "ipv4"
+
+  validation {
+    condition     = contains(["ipv4", "ipv6"], var.address_family)
+    error_message = "Address family must be either \"ipv4\" or \"ipv6\"."
+  }
+}
+
+variable "organization_arn" {
+  description = <<-EOT
+    The ARN of the AWS Organization or specific account to share IPAM resources with.
+    Format: arn:aws:organizations::<management-account-id>:organization/o-<organization-id>
+  EOT
+  type        = string
+
+  validation {
+    condition     = can(regex("^arn:aws:organizations::", var.organization_arn))
+    error_message = "Organization ARN must be a valid AWS Organizations ARN."
+  }
+}
+
+#=============================================
+# IPAM Pool Configuration Variables
+#=============================================
+
+variable "bu_ipam_configs" {
+  description = <<-EOT
+    Business Unit IPAM pools of this shard, as in the ipam module.
+    Format: {region => {bu => {name, description, cidr}}}
+    Empty when the hierarchy has no BU level.
+  EOT
+  type = map(map(object({
+    name        = string       # Display name for the business unit pool
+    description = string       # Detailed description of the business unit pool's purpose
+    cidr        = list(string) # List containing single CIDR allocation for this business unit
+  })))
+  default = {}
+}
+
+variable "env_ipam_configs" {
+  description = <<-EOT
+    Environment IPAM pools of this shard, as in the ipam module.
+    Format: {region => {bu => {env => {name, description, cidr, reserved_cidr}}}}
+    Environments whose BU has no pool in bu_ipam_configs are created under their regional pool.
+  EOT
+  type = map(map(map(object({
+    name          = string       # Display name for the environment pool
+    description   = string       # Detailed description of the environment pool
+    cidr          = list(string) # List containing single CIDR for this environment
+    reserved_cidr = string       # Optional CIDR to reserve within this environment
+  }))))
+  default = {}
+}
+
+variable "flat_bu_ipam_configs" {
+  description = <<-EOT
+    Business Unit IPAM pools pre-flattened by the generator, as an alternative to bu_ipam_configs.
+    Keyed by the region-bu composite identifier used for the pool resources, with the
+    key of the parent regional pool in parent_key, so the module needs no nested lookups.
+
+    Example:
+    {
+      "us-east-1-finance" = {
+        name        = "Finance BU"
+        description = "Finance Business Unit Pool"
+        cidr        = ["10.0.0.0/14"]
+        region      = "us-east-1"
+        bu          = "finance"
+        parent_key  = "us-east-1"
+      }
+    }
+  EOT
+  type = map(object({
+    name        = string       # Display name for the business unit pool
+    description = string       # Detailed description of the business unit pool's purpose
+    cidr        = list(string) # List containing single CIDR allocation for this business unit
+    region      = string       # Region identifier
+    bu          = string       # Business unit identifier
+    parent_key  = string       # Key of the parent regional pool
+  }))
+  default = {}
+}
+
+variable "flat_env_ipam_configs" {
+  description = <<-EOT
+    Environment IPAM pools pre-flattened by the generator, as an alternative to env_ipam_configs.
+    Keyed by the region-bu-env composite identifier used for the pool resources, with the
+    key of the parent BU pool (or regional pool, without a BU level) in parent_key.
+
+    Example:
+    {
+      "us-east-1-finance-core" = {
+        name          = "Finance Core"
+        description   = "Finance Core Infrastructure"
+        cidr          = ["10.0.0.0/16"]
+        reserved_cidr = "10.0.0.0/24"
+        region        = "us-east-1"
+        bu            = "finance"
+        env           = "core"
+        parent_key    = "us-east-1-finance"
+      }
+    }
+  EOT
+  type = map(object({
+    name          = string       # Display name for the environment pool
+    description   = string       # Detailed description of the environment pool
+    cidr          = list(string) # List containing single CIDR for this environment
+    reserved_cidr = string       # Optional CIDR to reserve within this environment
+    region        = string       # Region identifier
+    bu            = string       # Business unit identifier
+    env           = string       # Environment identifier
+    parent_key    = string       # Key of the parent BU (or regional) pool
+  }))
+  default = {}
+}
+
+#=============================================
+# Resource Tagging
+#=============================================
+
+variable "tags" {
+  description = <<-EOT
+    Map of tags to apply to all resources created in the shard.
+    Normally the tag map of the base stack, so every stack is tagged alike.
+  EOT
+  type        = map(string)
+  default     = {}
+}
@@ -9,69 +9,37 @@
 # to meet your organizational requirements.
 #==============================================================================
 
+
 locals {
   #=========================================
-  # CIDR Validation Logic
+  # Pool Config Processing
   #=========================================
 
+  # Pools arrive either pre-flattened (flat_*_ipam_configs, keyed by the
+  # composite ids below and carrying their parent_key), or nested by region,
+  # BU and environment, which is flattened here in a single pass. Either way
+  # every lookup below is by key, so planning stays linear in the number of
+  # pools.
+
   # Convert BU configs into a flat list for easier processing
   flattened_bu_ipam_list = flatten([
     for region, bu_configs in var.bu_ipam_configs : [
       for bu, bu_config in bu_configs : merge(bu_config, {
-        region = region, # Add region identifier
-        bu     = bu      # Add business unit identifier
+        region     = region, # Add region identifier
+        bu         = bu,     # Add business unit identifier
+        parent_key = region  # Key of the regional pool
       })
     ]
   ])
 
-  # Convert flattened list to a map with composite keys for easier lookup
-  flattened_bu_ipam_configs = {
-    for bu_config in local.flattened_bu_ipam_list :
-    "${bu_config.region}-${bu_config.bu}" => bu_config
-  }
-
-  # Extract all environment CIDRs grouped by region for validation
-  env_cidrs_by_region = {
-    for region, env_configs in var.env_ipam_configs : region => flatten([
-      for bu, bu_envs in env_configs : [
-        for env, env_config in bu_envs : env_config.cidr[0] # Extract just the CIDR string
-      ]
-    ])
-  }
-
-  # Map each environment CIDR to its parent BU for validation
-  # This is used to ensure environment CIDRs are properly contained within BU CIDRs
-  get_bu_for_env = {
-    for region in keys(var.bu_ipam_configs) : region => {
-      for env_cidr in local.env_cidrs_by_region[region] : env_cidr => (
-        # Find the first BU that contains this environment CIDR
-        length([
-          for bu, bu_config in var.bu_ipam_configs[region] : bu
-          if contains(bu_config.cidr, env_cidr)
-        ]) > 0 ?
-        # If found, return the BU name
-        [for bu, bu_config in var.bu_ipam_configs[region] : bu
-        if contains(bu_config.cidr, env_cidr)][0]
-        :
-        # If not found, return null (this indicates a validation error)
-        null
-      )
-    }
-  }
-
-  # Collect all environment CIDRs that don't belong to any BU CIDR
-  unmatched_env_cidrs = flatten([
-    for region, env_bu_map in local.get_bu_for_env : [
-      for env_cidr, bu in env_bu_map : {
-        region   = region,
-        env_cidr = env_cidr
-      } if bu == null # Only include entries where no matching BU was found
-    ]
-  ])
-
-  #=========================================
-  # Environment Config Processing
-  #=========================================
+  # Business unit configs keyed "region-bu"
+  flattened_bu_ipam_configs = merge(
+    {
+      for bu_config in local.flattened_bu_ipam_list :
+      "${bu_config.region}-${bu_config.bu}" => bu_config
+    },
+    var.flat_bu_ipam_configs
+  )
 
   # Flatten environment configs into a list for easier processing
   flattened_env_ipam_list = flatten([
@@ -82,52 +50,76 @@ locals {
           {
             region = region, # Add region identifier
             bu     = bu,     # Add business unit identifier
-            env    = env     # Add environment identifier
+            env    = env,    # Add environment identifier
+            # Parent BU pool, or the regional pool without a BU level
+            parent_key = can(var.bu_ipam_configs[region][bu]) ? "${region}-${bu}" : region
           }
         )
       ]
     ]
   ])
 
-  # Convert flattened environment list to a map with composite keys for easier lookup
-  flattened_env_ipam_configs = {
-    for env_config in local.flattened_env_ipam_list :
-    "${env_config.region}-${env_config.bu}-${env_config.env}" => env_config
-  }
+  # Environment configs keyed "region-bu-env"
+  flattened_env_ipam_configs = merge(
+    {
+      for env_config in local.flattened_env_ipam_list :
+      "${env_config.region}-${env_config.bu}-${env_config.env}" => env_config
+    },
+    var.flat_env_ipam_configs
+  )
+
+  # Pool IDs of every pool that can be a parent, by key
+  parent_pool_ids = merge(
+    { for key, pool in aws_vpc_ipam_pool.regional : key => pool.id },
+    { for key, pool in aws_vpc_ipam_pool.bu : key => pool.id }
+  )
 
   #=========================================
   # CIDR Validation for Cross-Reference
   #=========================================
 
-  # Validate that every environment CIDR is contained within its corresponding BU CIDR
-  env_cidr_validation = flatten([
-    for region, env_configs in var.env_ipam_configs : [
-      for bu, bu_envs in env_configs : [
-        for env, env_config in bu_envs : {
-          region   = region,
-          bu       = bu,
-          env      = env,
-          env_cidr = env_config.cidr[0],
-          # Check if this environment CIDR is contained in any BU CIDR in this region
-          valid_bu = length([
-            for bu_name, bu_config in var.bu_ipam_configs[region] : bu_name
-            if contains(bu_config.cidr, env_config.cidr[0])
-          ]) > 0
-        }
-      ]
+  # CIDR of every pool that can be a parent, by key
+  parent_pool_cidrs = merge(
+    { for key, config in var.reg_ipam_configs : key => config.cidr[0] },
+    { for key, config in local.flattened_bu_ipam_configs : key => config.cidr[0] }
+  )
+
+  # Every pool (and reserved CIDR) with the CIDR of its parent, found by key
+  cidr_containment_checks = concat(
+    [
+      for key, config in local.flattened_bu_ipam_configs : {
+        key    = "bu ${key}"
+        cidr   = config.cidr[0]
+        parent = lookup(local.parent_pool_cidrs, config.parent_key, "")
+      }
+    ],
+    [
+      for key, config in local.flattened_env_ipam_configs : {
+        key    = "env ${key}"
+        cidr   = config.cidr[0]
+        parent = lookup(local.parent_pool_cidrs, config.parent_key, "")
+      }
+    ],
+    [
+      for key, config in local.flattened_env_ipam_configs : {
+        key    = "reserved ${key}"
+        cidr   = config.reserved_cidr
+        parent = config.cidr[0]
+      }
+      if config.reserved_cidr != ""
     ]
-  ])
-
-  # Extract validation errors for clearer reporting
-  env_cidr_validation_errors = [
-    for entry in local.env_cidr_validation : entry
-    if entry.valid_bu == false
-  ]
-
-  # Identify environment configs with no matching BU (validation error)
-  unmatched_env_configs = [
-    for env_config in local.flattened_env_ipam_list : env_config
-    if env_config.bu == null
+  )
+
+  # Pools whose parent is missing or does not contain them. A CIDR is inside
+  # its parent when its network address, masked to the parent's prefix
+  # length, is the parent's network address.
+  cidr_validation_errors = [
+    for check in local.cidr_containment_checks : check.key
+    if !try(
+      tonumber(split("/", check.cidr)[1]) >= tonumber(split("/", check.parent)[1]) &&
+      cidrhost("${cidrhost(check.cidr, 0)}/${split("/", check.parent)[1]}", 0) == cidrhost(check.parent, 0),
+      false
+    )
   ]
 
   #=========================================
@@ -150,43 +142,14 @@ locals {
   # Reserved CIDR Processing
   #=========================================
 
-  # Extract all environment pools with reserved CIDRs
-  env_reserved_cidrs = flatten([
-    for region, env_configs in var.env_ipam_configs : [
-      for bu, bu_envs in env_configs : [
-        for env, env_config in bu_envs : {
-          region      = region
-          bu          = bu
-          env         = env
-          pool_key    = "${region}-${bu}-${env}" # Match the key format used for env pools
-          cidr        = env_config.reserved_cidr
-          description = "Reserved CIDR block for ${env_config.name}"
-        }
-        if env_config.reserved_cidr != "" # Only include environments with non-empty reserved_cidr
-      ]
-    ]
-  ])
-
-  # Convert to a map with unique keys for easier lookup
+  # Reserved CIDRs keyed "region-bu-env-cidr"
   reserved_cidr_allocations = {
-    for item in local.env_reserved_cidrs :
-    "${item.pool_key}-${item.cidr}" => item
-  }
-
-  # Modified to correct the CIDR containment check using proper CIDR functions
-  # This checks if the reserved CIDR falls within its parent environment CIDR
-  reserved_cidr_validation = [
-    for item in local.env_reserved_cidrs : {
-      pool_key      = item.pool_key
-      reserved_cidr = item.cidr
-      env_cidr      = var.env_ipam_configs[item.region][item.bu][item.env].cidr[0]
-      is_valid      = true # Reserved CIDR validation not currently functional; bypass
+    for key, env_config in local.flattened_env_ipam_configs :
+    "${key}-${env_config.reserved_cidr}" => {
+      pool_key    = key # Match the key format used for env pools
+      cidr        = env_config.reserved_cidr
+      description = "Reserved CIDR block for ${env_config.name}"
     }
-  ]
-
-  # Extract validation errors for reporting
-  reserved_cidr_validation_errors = [
-    for check in local.reserved_cidr_validation : check
-    if check.is_valid == false
-  ]
+    if env_config.reserved_cidr != "" # Only include environments with non-empty reserved_cidr
+  }
 }
@@ -40,7 +40,7 @@ resource "aws_vpc_ipam" "this" {
 resource "aws_vpc_ipam_pool" "top" {
   ipam_scope_id  = aws_vpc_ipam.this.private_default_scope_id
   description    = var.top_description
-  address_family = "ipv4"
+  address_family = var.address_family
   auto_import    = false
 
   depends_on = [
@@ -75,7 +75,7 @@ resource "aws_vpc_ipam_pool" "regional" {
   # ipam_scope_id       = aws_vpc_ipam_scope.private.id
   ipam_scope_id       = aws_vpc_ipam.this.private_default_scope_id
   description         = each.value.description
-  address_family      = "ipv4"
+  address_family      = var.address_family
   auto_import         = false
   locale              = each.value.locale
   source_ipam_pool_id = aws_vpc_ipam_pool.top.id
@@ -113,10 +113,10 @@ resource "aws_vpc_ipam_pool" "bu" {
 
   ipam_scope_id       = aws_vpc_ipam.this.private_default_scope_id
   description         = each.value.description
-  address_family      = "ipv4"
+  address_family      = var.address_family
   auto_import         = false
   locale              = each.value.region
-  source_ipam_pool_id = aws_vpc_ipam_pool.regional[each.value.region].id
+  source_ipam_pool_id = aws_vpc_ipam_pool.regional[each.value.parent_key].id
 
   depends_on = [
     aws_vpc_ipam_pool_cidr.regional_cidr
@@ -151,12 +151,14 @@ resource "aws_vpc_ipam_pool" "env" {
 
   ipam_scope_id       = aws_vpc_ipam.this.private_default_scope_id
   description         = each.value.description
-  address_family      = "ipv4"
+  address_family      = var.address_family
   auto_import         = true
   locale              = each.value.region
-  source_ipam_pool_id = aws_vpc_ipam_pool.bu["${each.value.region}-${each.value.bu}"].id
+  # BU pool, or the regional pool when the hierarchy has no BU level
+  source_ipam_pool_id = local.parent_pool_ids[each.value.parent_key]
 
   depends_on = [
+    aws_vpc_ipam_pool_cidr.regional_cidr,
     aws_vpc_ipam_pool_cidr.bu_cidr
   ]
 
@@ -235,3 +237,15 @@ resource "aws_vpc_ipam_pool_cidr_allocation" "reserved_cidr" {
     aws_vpc_ipam_pool_cidr.env_cidr
   ]
 }
+
+#=======================================
+# CIDR Containment Checks
+#=======================================
+
+# Reported as warnings on plan and apply; see local.cidr_validation_errors
+check "cidr_containment" {
+  assert {
+    condition     = length(local.cidr_validation_errors) == 0
+    error_message = "Pools or reserved CIDRs outside their parent CIDR: ${join(", ", local.cidr_validation_errors)}"
+  }
+}
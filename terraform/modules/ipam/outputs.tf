@@ -13,6 +13,14 @@
 # IPAM Pool Identifier Outputs
 #=======================================
 
+output "ipam_scope_id" {
+  description = <<-EOT
+    The ID of the IPAM's private default scope, in which every pool is created.
+    Shard stacks create their business unit and environment pools in this scope.
+  EOT
+  value       = aws_vpc_ipam.this.private_default_scope_id
+}
+
 output "top_pool_id" {
   description = <<-EOT
     The ID of the top-level IPAM pool that represents the organization's entire IP space.
@@ -48,10 +56,12 @@ output "bu_cidrs" {
     Format: {region => {bu => cidr_list}}
     These CIDR blocks define the address space available to each business unit within a region.
   EOT
+  # Grouped in one pass over the flattened pools, whichever input form was used
   value = {
-    for region, bu_configs in var.bu_ipam_configs : region => {
-      for bu, bu_config in bu_configs : bu => bu_config.cidr
-    }
+    for region, bus in {
+      for bu_config in local.flattened_bu_ipam_configs :
+      bu_config.region => { (bu_config.bu) = bu_config.cidr }...
+    } : region => merge(bus...)
   }
 }
 
@@ -76,10 +86,13 @@ output "env_cidrs" {
     VPC CIDR allocations should be requested from these pools.
   EOT
   value = {
-    for region, env_configs in var.env_ipam_configs : region => {
-      for bu, bu_envs in env_configs : bu => {
-        for env, env_config in bu_envs : env => env_config.cidr
-      }
+    for region, env_configs in {
+      for env_config in local.flattened_env_ipam_configs :
+      env_config.region => env_config...
+    } : region => {
+      for bu, bu_envs in {
+        for env_config in env_configs : env_config.bu => env_config...
+      } : bu => { for env_config in bu_envs : env_config.env => env_config.cidr }
     }
   }
 }
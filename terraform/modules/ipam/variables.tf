@@ -87,6 +87,20 @@ variable "top_cidr" {
   }
 }
 
+variable "address_family" {
+  description = <<-EOT
+    IP address family of every pool in the hierarchy: "ipv4" or "ipv6".
+    Must match the top-level CIDR (e.g., "ipv6" for ["fd00:1::/48"]).
+  EOT
+  type        = string
+  default     = "ipv4"
+
+  validation {
+    condition     = contains(["ipv4", "ipv6"], var.address_family)
+    error_message = "Address family must be either \"ipv4\" or \"ipv6\"."
+  }
+}
+
 variable "reg_ipam_configs" {
   description = <<-EOT
     Configuration for regional IPAM pools.
@@ -134,6 +148,7 @@ variable "bu_ipam_configs" {
     description = string       # Detailed description of the business unit pool's purpose
     cidr        = list(string) # List containing single CIDR allocation for this business unit
   })))
+  default = {}
 }
 
 variable "env_ipam_configs" {
@@ -166,6 +181,69 @@ variable "env_ipam_configs" {
     cidr          = list(string) # List containing single CIDR for this environment
     reserved_cidr = string       # Optional CIDR to reserve within this environment
   }))))
+  default = {}
+}
+
+variable "flat_bu_ipam_configs" {
+  description = <<-EOT
+    Business Unit IPAM pools pre-flattened by the generator, as an alternative to bu_ipam_configs.
+    Keyed by the region-bu composite identifier used for the pool resources, with the
+    key of the parent regional pool in parent_key, so the module needs no nested lookups.
+
+    Example:
+    {
+      "us-east-1-finance" = {
+        name        = "Finance BU"
+        description = "Finance Business Unit Pool"
+        cidr        = ["10.0.0.0/14"]
+        region      = "us-east-1"
+        bu          = "finance"
+        parent_key  = "us-east-1"
+      }
+    }
+  EOT
+  type = map(object({
+    name        = string       # Display name for the business unit pool
+    description = string       # Detailed description of the business unit pool's purpose
+    cidr        = list(string) # List containing single CIDR allocation for this business unit
+    region      = string       # Region identifier
+    bu          = string       # Business unit identifier
+    parent_key  = string       # Key of the parent regional pool
+  }))
+  default = {}
+}
+
+variable "flat_env_ipam_configs" {
+  description = <<-EOT
+    Environment IPAM pools pre-flattened by the generator, as an alternative to env_ipam_configs.
+    Keyed by the region-bu-env composite identifier used for the pool resources, with the
+    key of the parent BU pool (or regional pool, without a BU level) in parent_key.
+
+    Example:
+    {
+      "us-east-1-finance-core" = {
+        name          = "Finance Core"
+        description   = "Finance Core Infrastructure"
+        cidr          = ["10.0.0.0/16"]
+        reserved_cidr = "10.0.0.0/24"
+        region        = "us-east-1"
+        bu            = "finance"
+        env           = "core"
+        parent_key    = "us-east-1-finance"
+      }
+    }
+  EOT
+  type = map(object({
+    name          = string       # Display name for the environment pool
+    description   = string       # Detailed description of the environment pool
+    cidr          = list(string) # List containing single CIDR for this environment
+    reserved_cidr = string       # Optional CIDR to reserve within this environment
+    region        = string       # Region identifier
+    bu            = string       # Business unit identifier
+    env           = string       # Environment identifier
+    parent_key    = string       # Key of the parent BU (or regional) pool
+  }))
+  default = {}
 }
 
 #=============================================
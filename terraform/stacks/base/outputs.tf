@@ -0,0 +1,56 @@
+#==============================================================================
+# Sample Terraform Implementation for Hierarchical IPAM on AWS
+#
+# This code demonstrates how to implement hierarchical IP Address Management
+# across multiple AWS regions, business units, and environments.
+#
+# IMPORTANT: This code is provided as a sample for educational purposes.
+# Before using in production, review security configurations and customize
+# to meet your organizational requirements.
+#==============================================================================
+
+
+#=======================================
+# Outputs Read by the Shard Stacks
+#=======================================
+
+output "ipam_scope_id" {
+  description = "ID of the IPAM scope every pool is created in."
+  value       = module.ipam.ipam_scope_id
+}
+
+output "regional_pool_ids" {
+  description = <<-EOT
+    Map of regional IPAM pool IDs keyed by region identifier.
+    Format: {region_key => pool_id}
+    Parents of the business unit (or, without a BU level, environment) pools of the shards.
+  EOT
+  value       = module.ipam.regional_pool_ids
+}
+
+output "address_family" {
+  description = "IP address family of every pool in the hierarchy."
+  value       = var.address_family
+}
+
+output "organization_arn" {
+  description = "ARN of the AWS Organization the shards share their environment pools with."
+  value       = data.aws_organizations_organization.current.arn
+}
+
+output "tags" {
+  description = "Tags applied to the base stack, reused by the shards."
+  value       = module.tags.tag_map
+}
+
+#=======================================
+# IPAM Pool Identifier Outputs
+#=======================================
+
+output "ipam_top_pool_id" {
+  description = <<-EOT
+    The ID of the top-level IPAM pool.
+    Use this ID when referencing the entire organizational address space.
+  EOT
+  value       = module.ipam.top_pool_id
+}
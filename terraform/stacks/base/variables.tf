@@ -0,0 +1,164 @@
+#==============================================================================
+# Sample Terraform Implementation for Hierarchical IPAM on AWS
+#
+# This code demonstrates how to implement hierarchical IP Address Management
+# across multiple AWS regions, business units, and environments.
+#
+# IMPORTANT: This code is provided as a sample for educational purposes.
+# Before using in production, review security configurations and customize
+# to meet your organizational requirements.
+#==============================================================================
+
+#=============================================
+# Core Configuration Variables
+#=============================================
+
+variable "provider_region" {
+  description = "AWS region where IPAM will be deployed and managed."
+  type        = string
+
+  validation {
+    condition     = can(regex("^[a-z]{2}-[a-z]+-[0-9]{1}$", var.provider_region))
+    error_message = "Provider region must be a valid AWS region name (e.g., us-east-1, eu-west-1)."
+  }
+}
+
+variable "operating_regions" {
+  description = <<-EOT
+    Regions where IPAM operates and manages resources.
+    Must be valid AWS region names like us-east-1, eu-west-1, etc.
+    At least one region must be specified.
+  EOT
+  type        = list(string)
+
+  validation {
+    condition     = length(var.operating_regions) > 0
+    error_message = "At least one operating region must be specified."
+  }
+
+  validation {
+    condition     = alltrue([for region in var.operating_regions : can(regex("^[a-z]{2}-[a-z]+-[0-9]{1}$", region))])
+    error_message = "All operating regions must be valid AWS region names (e.g., us-east-1, eu-west-1)."
+  }
+}
+
+variable "share_name" {
+  description = <<-EOT
+    Name of the RAM share for IPAM resources.
+    This name will be used to identify shared resources across accounts.
+    Should be descriptive of the shared IPAM resource purpose.
+  EOT
+  type        = string
+
+  validation {
+    condition     = length(var.share_name) >= 3 && length(var.share_name) <= 128
+    error_message = "Share name must be between 3 and 128 characters."
+  }
+}
+
+#=============================================
+# IPAM Pool Configuration Variables
+#=============================================
+
+variable "top_name" {
+  description = <<-EOT
+    Name of the top-level IPAM pool.
+    This is the root pool that contains all regional allocations.
+    Should be descriptive of your organization's entire IP space.
+  EOT
+  type        = string
+
+  validation {
+    condition     = length(var.top_name) >= 3 && length(var.top_name) <= 128
+    error_message = "Top pool name must be between 3 and 128 characters."
+  }
+}
+
+variable "top_description" {
+  description = <<-EOT
+    Description of the top-level IPAM pool.
+    Should provide context about the organizational IP space allocation strategy.
+    This appears in the AWS console and helps administrators understand the pool's purpose.
+  EOT
+  type        = string
+}
+
+variable "top_cidr" {
+  description = <<-EOT
+    CIDR block for the top-level IPAM pool.
+    This represents your organization's entire IP address space.
+    Example: ["10.0.0.0/8"] for a standard RFC1918 private address space.
+    Only one CIDR block is currently supported at this level.
+  EOT
+  type        = list(string)
+
+  validation {
+    condition     = length(var.top_cidr) == 1
+    error_message = "Exactly one top-level CIDR block must be specified."
+  }
+
+  validation {
+    condition     = alltrue([for cidr in var.top_cidr : can(cidrhost(cidr, 0))])
+    error_message = "Top-level CIDR must be a valid IPv4 or IPv6 CIDR block (e.g., 10.0.0.0/8 or fd00:1::/48)."
+  }
+}
+
+variable "address_family" {
+  description = <<-EOT
+    IP address family of every pool in the hierarchy: "ipv4" or "ipv6".
+    Must match the top-level CIDR (e.g., "ipv6" for ["fd00:1::/48"]).
+  EOT
+  type        = string
+  default     = "ipv4"
+
+  validation {
+    condition     = contains(["ipv4", "ipv6"], var.address_family)
+    error_message = "Address family must be either \"ipv4\" or \"ipv6\"."
+  }
+}
+
+variable "reg_ipam_configs" {
+  description = <<-EOT
+    Configuration for regional IPAM pools.
+    Defines IP allocations for each AWS region where IPAM will operate.
+    Each region should receive a non-overlapping portion of the top-level CIDR.
+    
+    Example:
+    {
+      us_east_1 = {
+        name        = "US East 1 Region"
+        description = "US East 1 Regional Pool"
+        cidr        = ["10.0.0.0/12"]
+        locale      = "us-east-1"
+      }
+    }
+  EOT
+  type = map(object({
+    name        = string       # Display name for the regional pool
+    description = string       # Detailed description of the regional pool's purpose
+    cidr        = list(string) # List containing single CIDR allocation for this region
+    locale      = string       # AWS region identifier (e.g., us-east-1)
+  }))
+
+  validation {
+    condition     = length(var.reg_ipam_configs) > 0
+    error_message = "At least one regional IPAM configuration must be specified."
+  }
+
+  validation {
+    condition = alltrue([
+      for k, v in var.reg_ipam_configs :
+      can(regex("^[a-z]{2}-[a-z]+-[0-9]{1}$", v.locale))
+    ])
+    error_message = "Each regional IPAM configuration must have a valid AWS region locale."
+  }
+
+  validation {
+    condition = alltrue([
+      for k, v in var.reg_ipam_configs :
+      length(v.cidr) == 1 &&
+      can(cidrhost(v.cidr[0], 0))
+    ])
+    error_message = "Each regional IPAM configuration must have exactly one valid CIDR block."
+  }
+}
@@ -0,0 +1,32 @@
+#==============================================================================
+# Sample Terraform Implementation for Hierarchical IPAM on AWS
+#
+# This code demonstrates how to implement hierarchical IP Address Management
+# across multiple AWS regions, business units, and environments.
+#
+# IMPORTANT: This code is provided as a sample for educational purposes.
+# Before using in production, review security configurations and customize
+# to meet your organizational requirements.
+#==============================================================================
+
+
+# Shard stack of a sharded deployment: the business unit and environment pools
+# of one region (or one BU in a region), with their RAM shares and reserved
+# CIDRs. Each shard has its own state, so shards are planned and applied
+# independently once the base stack (../base) exists. Resource addresses match
+# the single-stack deployment (module.ipam.*).
+
+module "ipam" {
+  source            = "../../modules/ipam-shard"
+  ipam_scope_id     = data.terraform_remote_state.base.outputs.ipam_scope_id
+  regional_pool_ids = data.terraform_remote_state.base.outputs.regional_pool_ids
+  address_family    = data.terraform_remote_state.base.outputs.address_family
+  organization_arn  = data.terraform_remote_state.base.outputs.organization_arn
+  bu_ipam_configs   = var.bu_ipam_configs
+  env_ipam_configs  = var.env_ipam_configs
+  tags              = data.terraform_remote_state.base.outputs.tags
+
+  # Pre-flattened alternatives written by the configurator's --layout flat
+  flat_bu_ipam_configs  = var.flat_bu_ipam_configs
+  flat_env_ipam_configs = var.flat_env_ipam_configs
+}
@@ -0,0 +1,40 @@
+#==============================================================================
+# Sample Terraform Implementation for Hierarchical IPAM on AWS
+#
+# This code demonstrates how to implement hierarchical IP Address Management
+# across multiple AWS regions, business units, and environments.
+#
+# IMPORTANT: This code is provided as a sample for educational purposes.
+# Before using in production, review security configurations and customize
+# to meet your organizational requirements.
+#==============================================================================
+
+
+#=======================================
+# IPAM Pool Identifier Outputs
+#=======================================
+
+output "ipam_bu_pool_ids" {
+  description = <<-EOT
+    Map of Business Unit IPAM pool IDs of this shard keyed by region-bu composite identifier.
+    Format: {region-bu => pool_id}
+  EOT
+  value       = module.ipam.bu_pool_ids
+}
+
+output "ipam_env_pool_ids" {
+  description = <<-EOT
+    Map of Environment IPAM pool IDs of this shard keyed by region-bu-env composite identifier.
+    Format: {region-bu-env => pool_id}
+    These are the leaf-level pools used for allocating CIDRs to actual VPCs.
+  EOT
+  value       = module.ipam.env_pool_ids
+}
+
+output "ipam_ram_resource_share_arns" {
+  description = <<-EOT
+    The ARNs of the RAM resource shares for this shard's IPAM pools.
+    Format: {pool_key => share_arn}
+  EOT
+  value       = module.ipam.ram_resource_share_arns
+}
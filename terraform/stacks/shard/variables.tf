@@ -0,0 +1,218 @@
+#==============================================================================
+# Sample Terraform Implementation for Hierarchical IPAM on AWS
+#
+# This code demonstrates how to implement hierarchical IP Address Management
+# across multiple AWS regions, business units, and environments.
+#
+# IMPORTANT: This code is provided as a sample for educational purposes.
+# Before using in production, review security configurations and customize
+# to meet your organizational requirements.
+#==============================================================================
+
+
+#=============================================
+# Core Configuration Variables
+#=============================================
+
+variable "provider_region" {
+  description = "AWS region where IPAM will be deployed and managed."
+  type        = string
+
+  validation {
+    condition     = can(regex("^[a-z]{2}-[a-z]+-[0-9]{1}$", var.provider_region))
+    error_message = "Provider region must be a valid AWS region name (e.g., us-east-1, eu-west-1)."
+  }
+}
+
+#=============================================
+# Base Stack State
+#=============================================
+
+variable "base_state_backend" {
+  description = <<-EOT
+    Backend type of the base stack's state (e.g. "local", "s3"), read with terraform_remote_state.
+    The shard takes the IPAM scope, regional pool IDs, organization and tags from it.
+  EOT
+  type        = string
+  default     = "local"
+}
+
+variable "base_state_config" {
+  description = <<-EOT
+    Configuration of the base stack's state backend, as for terraform_remote_state.
+    Example for S3: { bucket = "my-tf-state", key = "ipam/base.tfstate", region = "us-east-1" }
+  EOT
+  type        = any
+  default = {
+    path = "../base/terraform.tfstate"
+  }
+}
+
+#=============================================
+# IPAM Pool Configuration Variables
+#=============================================
+
+variable "bu_ipam_configs" {
+  description = <<-EOT
+    Configuration for Business Unit IPAM pools.
+    Defines IP allocations for each business unit within each region.
+    Organized as a map of regions to business units to configurations.
+    Each business unit should receive a non-overlapping portion of its regional CIDR.
+    
+    Example:
+    {
+      us_east_1 = {
+        finance = {
+          name        = "Finance BU"
+          description = "Finance Business Unit Pool"
+          cidr        = ["10.0.0.0/14"]
+        }
+      }
+    }
+  EOT
+  type = map(map(object({
+    name        = string       # Display name for the business unit pool
+    description = string       # Detailed description of the business unit pool's purpose
+    cidr        = list(string) # List containing single CIDR allocation for this business unit
+  })))
+  default = {}
+
+  validation {
+    condition = alltrue(flatten([
+      for region, bus in var.bu_ipam_configs : [
+        for bu, config in bus :
+        length(config.cidr) == 1 &&
+        can(cidrhost(config.cidr[0], 0))
+      ]
+    ]))
+    error_message = "Each business unit IPAM configuration must have exactly one valid CIDR block."
+  }
+}
+
+variable "env_ipam_configs" {
+  description = <<-EOT
+    Configuration for environment-specific IPAM pools within each business unit and region.
+    Defines IP allocations for each environment within each business unit and region.
+    Each environment should receive a non-overlapping portion of its parent business unit CIDR.
+    
+    Example:
+    {
+      us_east_1 = {
+        finance = {
+          core = {
+            name          = "Finance Core"
+            description   = "Finance Core Infrastructure"
+            cidr          = ["10.0.0.0/16"]
+            reserved_cidr = "10.0.0.0/24"  # Optional reserved block
+          }
+        }
+      }
+    }
+    
+    Note: The reserved_cidr is an optional subnet that can be explicitly reserved within
+    the environment CIDR block for specific purposes (e.g., shared services, gateways).
+  EOT
+  type = map(map(map(object({
+    name          = string       # Display name for the environment pool
+    description   = string       # Detailed description of the environment pool
+    cidr          = list(string) # List containing single CIDR for this environment
+    reserved_cidr = string       # Optional CIDR to reserve within this environment
+  }))))
+  default = {}
+
+  validation {
+    condition = alltrue(flatten([
+      for region, bus in var.env_ipam_configs : [
+        for bu, envs in bus : [
+          for env, env_config in envs :
+          length(env_config.cidr) == 1 &&
+          can(cidrhost(env_config.cidr[0], 0)) &&
+          (env_config.reserved_cidr == "" || can(cidrhost(env_config.reserved_cidr, 0)))
+        ]
+      ]
+    ]))
+    error_message = "Each environment IPAM configuration must have exactly one valid CIDR block and an optional valid reserved CIDR."
+  }
+}
+
+variable "flat_bu_ipam_configs" {
+  description = <<-EOT
+    Business Unit IPAM pools pre-flattened by the IPAM Configurator (--layout flat),
+    as an alternative to bu_ipam_configs that the module consumes without nested lookups.
+    Keyed by the region-bu composite identifier, with the parent regional pool's key in parent_key.
+
+    Example:
+    {
+      "us-east-1-finance" = {
+        name        = "Finance BU"
+        description = "Finance Business Unit Pool"
+        cidr        = ["10.0.0.0/14"]
+        region      = "us-east-1"
+        bu          = "finance"
+        parent_key  = "us-east-1"
+      }
+    }
+  EOT
+  type = map(object({
+    name        = string       # Display name for the business unit pool
+    description = string       # Detailed description of the business unit pool's purpose
+    cidr        = list(string) # List containing single CIDR allocation for this business unit
+    region      = string       # Region identifier
+    bu          = string       # Business unit identifier
+    parent_key  = string       # Key of the parent regional pool
+  }))
+  default = {}
+
+  validation {
+    condition = alltrue([
+      for key, config in var.flat_bu_ipam_configs :
+      length(config.cidr) == 1 &&
+      can(cidrhost(config.cidr[0], 0))
+    ])
+    error_message = "Each business unit IPAM configuration must have exactly one valid CIDR block."
+  }
+}
+
+variable "flat_env_ipam_configs" {
+  description = <<-EOT
+    Environment IPAM pools pre-flattened by the IPAM Configurator (--layout flat),
+    as an alternative to env_ipam_configs that the module consumes without nested lookups.
+    Keyed by the region-bu-env composite identifier, with the parent BU pool's key
+    (or the regional pool's, without a BU level) in parent_key.
+
+    Example:
+    {
+      "us-east-1-finance-core" = {
+        name          = "Finance Core"
+        description   = "Finance Core Infrastructure"
+        cidr          = ["10.0.0.0/16"]
+        reserved_cidr = "10.0.0.0/24"
+        region        = "us-east-1"
+        bu            = "finance"
+        env           = "core"
+        parent_key    = "us-east-1-finance"
+      }
+    }
+  EOT
+  type = map(object({
+    name          = string       # Display name for the environment pool
+    description   = string       # Detailed description of the environment pool
+    cidr          = list(string) # List containing single CIDR for this environment
+    reserved_cidr = string       # Optional CIDR to reserve within this environment
+    region        = string       # Region identifier
+    bu            = string       # Business unit identifier
+    env           = string       # Environment identifier
+    parent_key    = string       # Key of the parent BU (or regional) pool
+  }))
+  default = {}
+
+  validation {
+    condition = alltrue([
+      for key, config in var.flat_env_ipam_configs :
+      length(config.cidr) == 1 &&
+      can(cidrhost(config.cidr[0], 0)) &&
+      (config.reserved_cidr == "" || can(cidrhost(config.reserved_cidr, 0)))
+    ])
+    error_message = "Each environment IPAM configuration must have exactly one valid CIDR block and an optional valid reserved CIDR."
+  }
+}
@@ -98,8 +98,22 @@ variable "top_cidr" {
   }
 
   validation {
-    condition     = alltrue([for cidr in var.top_cidr : can(regex("^(([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\\.){3}([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])(\\/([0-9]|[1-2][0-9]|3[0-2]))$", cidr))])
-    error_message = "Top-level CIDR must be a valid IPv4 CIDR block (e.g., 10.0.0.0/8)."
+    condition     = alltrue([for cidr in var.top_cidr : can(cidrhost(cidr, 0))])
+    error_message = "Top-level CIDR must be a valid IPv4 or IPv6 CIDR block (e.g., 10.0.0.0/8 or fd00:1::/48)."
+  }
+}
+
+variable "address_family" {
+  description = <<-EOT
+    IP address family of every pool in the hierarchy: "ipv4" or "ipv6".
+    Must match the top-level CIDR (e.g., "ipv6" for ["fd00:1::/48"]).
+  EOT
+  type        = string
+  default     = "ipv4"
+
+  validation {
+    condition     = contains(["ipv4", "ipv6"], var.address_family)
+    error_message = "Address family must be either \"ipv4\" or \"ipv6\"."
   }
 }
 
@@ -143,9 +157,9 @@ variable "reg_ipam_configs" {
     condition = alltrue([
       for k, v in var.reg_ipam_configs :
       length(v.cidr) == 1 &&
-      can(regex("^(([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\\.){3}([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])(\\/([0-9]|[1-2][0-9]|3[0-2]))$", v.cidr[0]))
+      can(cidrhost(v.cidr[0], 0))
     ])
-    error_message = "Each regional IPAM configuration must have exactly one valid IPv4 CIDR block."
+    error_message = "Each regional IPAM configuration must have exactly one valid CIDR block."
   }
 }
 
@@ -172,10 +186,16 @@ variable "bu_ipam_configs" {
     description = string       # Detailed description of the business unit pool's purpose
     cidr        = list(string) # List containing single CIDR allocation for this business unit
   })))
+  default = {}
 
+  # Hierarchies without a BU level place their environments directly under
+  # the regional pools, so an environment is enough
   validation {
-    condition     = length(var.bu_ipam_configs) > 0
-    error_message = "At least one business unit IPAM configuration must be specified."
+    condition = (
+      length(var.bu_ipam_configs) > 0 || length(var.flat_bu_ipam_configs) > 0 ||
+      length(var.env_ipam_configs) > 0 || length(var.flat_env_ipam_configs) > 0
+    )
+    error_message = "At least one business unit or environment IPAM configuration must be specified."
   }
 
   validation {
@@ -183,10 +203,10 @@ variable "bu_ipam_configs" {
       for region, bus in var.bu_ipam_configs : [
         for bu, config in bus :
         length(config.cidr) == 1 &&
-        can(regex("^(([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\\.){3}([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])(\\/([0-9]|[1-2][0-9]|3[0-2]))$", config.cidr[0]))
+        can(cidrhost(config.cidr[0], 0))
       ]
     ]))
-    error_message = "Each business unit IPAM configuration must have exactly one valid IPv4 CIDR block."
+    error_message = "Each business unit IPAM configuration must have exactly one valid CIDR block."
   }
 }
 
@@ -219,10 +239,15 @@ variable "env_ipam_configs" {
     cidr          = list(string) # List containing single CIDR for this environment
     reserved_cidr = string       # Optional CIDR to reserve within this environment
   }))))
+  default = {}
 
+  # Hierarchies without an environment level end at the BU pools
   validation {
-    condition     = length(var.env_ipam_configs) > 0
-    error_message = "At least one environment IPAM configuration must be specified."
+    condition = (
+      length(var.env_ipam_configs) > 0 || length(var.flat_env_ipam_configs) > 0 ||
+      length(var.bu_ipam_configs) > 0 || length(var.flat_bu_ipam_configs) > 0
+    )
+    error_message = "At least one business unit or environment IPAM configuration must be specified."
   }
 
   validation {
@@ -231,11 +256,93 @@ variable "env_ipam_configs" {
         for bu, envs in bus : [
           for env, env_config in envs :
           length(env_config.cidr) == 1 &&
-          can(regex("^(([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\\.){3}([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])(\\/([0-9]|[1-2][0-9]|3[0-2]))$", env_config.cidr[0])) &&
-          (env_config.reserved_cidr == "" || can(regex("^(([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\\.){3}([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])(\\/([0-9]|[1-2][0-9]|3[0-2]))$", env_config.reserved_cidr)))
+          can(cidrhost(env_config.cidr[0], 0)) &&
+          (env_config.reserved_cidr == "" || can(cidrhost(env_config.reserved_cidr, 0)))
         ]
       ]
     ]))
-    error_message = "Each environment IPAM configuration must have exactly one valid IPv4 CIDR block and an optional valid reserved CIDR."
+    error_message = "Each environment IPAM configuration must have exactly one valid CIDR block and an optional valid reserved CIDR."
+  }
+}
+
+variable "flat_bu_ipam_configs" {
+  description = <<-EOT
+    Business Unit IPAM pools pre-flattened by the IPAM Configurator (--layout flat),
+    as an alternative to bu_ipam_configs that the module consumes without nested lookups.
+    Keyed by the region-bu composite identifier, with the parent regional pool's key in parent_key.
+
+    Example:
+    {
+      "us-east-1-finance" = {
+        name        = "Finance BU"
+        description = "Finance Business Unit Pool"
+        cidr        = ["10.0.0.0/14"]
+        region      = "us-east-1"
+        bu          = "finance"
+        parent_key  = "us-east-1"
+      }
+    }
+  EOT
+  type = map(object({
+    name        = string       # Display name for the business unit pool
+    description = string       # Detailed description of the business unit pool's purpose
+    cidr        = list(string) # List containing single CIDR allocation for this business unit
+    region      = string       # Region identifier
+    bu          = string       # Business unit identifier
+    parent_key  = string       # Key of the parent regional pool
+  }))
+  default = {}
+
+  validation {
+    condition = alltrue([
+      for key, config in var.flat_bu_ipam_configs :
+      length(config.cidr) == 1 &&
+      can(cidrhost(config.cidr[0], 0))
+    ])
+    error_message = "Each business unit IPAM configuration must have exactly one valid CIDR block."
+  }
+}
+
+variable "flat_env_ipam_configs" {
+  description = <<-EOT
+    Environment IPAM pools pre-flattened by the IPAM Configurator (--layout flat),
+    as an alternative to env_ipam_configs that the module consumes without nested lookups.
+    Keyed by the region-bu-env composite identifier, with the parent BU pool's key
+    (or the regional pool's, without a BU level) in parent_key.
+
+    Example:
+    {
+      "us-east-1-finance-core" = {
+        name          = "Finance Core"
+        description   = "Finance Core Infrastructure"
+        cidr          = ["10.0.0.0/16"]
+        reserved_cidr = "10.0.0.0/24"
+        region        = "us-east-1"
+        bu            = "finance"
+        env           = "core"
+        parent_key    = "us-east-1-finance"
+      }
+    }
+  EOT
+  type = map(object({
+    name          = string       # Display name for the environment pool
+    description   = string       # Detailed description of the environment pool
+    cidr          = list(string) # List containing single CIDR for this environment
+    reserved_cidr = string       # Optional CIDR to reserve within this environment
+    region        = string       # Region identifier
+    bu            = string       # Business unit identifier
+    env           = string       # Environment identifier
+    parent_key    = string       # Key of the parent BU (or regional) pool
+  }))
+  default = {}
+
+  validation {
+    condition = alltrue([
+      for key, config in var.flat_env_ipam_configs :
+      length(config.cidr) == 1 &&
+      can(cidrhost(config.cidr[0], 0)) &&
+      (config.reserved_cidr == "" || can(cidrhost(config.reserved_cidr, 0)))
+    ])
+    error_message = "Each environment IPAM configuration must have exactly one valid CIDR block and an optional valid reserved CIDR."
   }
 }